@@ -1,14 +1,58 @@
 import asyncio
+import collections
+import enum
+import itertools
 import logging
-from typing import Optional
+import random
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Iterator, List, Optional
 from urllib.parse import quote as quote_url
 
 import aiohttp
 
-from .constants import Keys, URLs
+from .async_stats import AsyncStatsClient
+from .constants import API, Keys, URLs
 
 log = logging.getLogger(__name__)
 
+# Requests with these methods can be retried after server and connection errors without changing anything
+# twice. Requests refused with 429 Too Many Requests, or whose connection couldn't be made, weren't handled,
+# so they're retried whatever their method.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Retries are delayed by a random time of up to `RETRY_BASE_DELAY * 2 ** attempt` seconds, at most
+# `MAX_RETRY_DELAY` seconds. Requests asking to be retried later than that aren't retried.
+RETRY_BASE_DELAY = 0.5
+MAX_RETRY_DELAY = 30
+
+
+class Priority(enum.IntEnum):
+    """The priority classes of site API requests. Waiting requests of lower values are sent first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+# The priority of the requests sent by the current task.
+_priority: ContextVar[Priority] = ContextVar("priority", default=Priority.INTERACTIVE)
+
+
+@contextmanager
+def background_requests() -> Iterator[None]:
+    """
+    Send the site API requests made in the context as background requests.
+
+    Tasks created in the context send background requests too, since they copy it.
+    """
+    token = _priority.set(Priority.BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
 
 class ResponseCodeError(ValueError):
     """Raised when a non-OK HTTP response is received."""
@@ -29,15 +73,86 @@ class ResponseCodeError(ValueError):
         return f"Status: {self.status} Response: {response}"
 
 
+class RequestScheduler:
+    """
+    Limit the number of requests in flight, letting waiting interactive requests in before background ones.
+
+    At most `max_concurrency` requests are sent at once, and only `max_background` of them can be background
+    requests, so bursts of background requests always leave room for interactive ones.
+    """
+
+    def __init__(self, max_concurrency: int, max_background: int):
+        self.max_concurrency = max_concurrency
+        self.max_background = max_background
+
+        self._active = {priority: 0 for priority in Priority}
+        self._waiters = {priority: collections.deque() for priority in Priority}
+
+    def _can_send(self, priority: Priority) -> bool:
+        if sum(self._active.values()) >= self.max_concurrency:
+            return False
+        return priority is not Priority.BACKGROUND or self._active[priority] < self.max_background
+
+    def _wake_waiters(self) -> None:
+        """Let the waiting requests in, in order of priority, while there's room for them."""
+        for priority, waiters in self._waiters.items():
+            while waiters and self._can_send(priority):
+                waiter = waiters.popleft()
+                # Cancelled waiters are skipped.
+                if not waiter.done():
+                    self._active[priority] += 1
+                    waiter.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority) -> AsyncIterator[None]:
+        """Wait until a request of `priority` can be sent, and hold its slot in the context."""
+        waiting = any(self._waiters[other] for other in Priority if other <= priority)
+        if not waiting and self._can_send(priority):
+            self._active[priority] += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters[priority].append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.cancelled():
+                    if waiter in self._waiters[priority]:
+                        self._waiters[priority].remove(waiter)
+                else:
+                    # The slot was given to this request right before it was cancelled.
+                    self._release(priority)
+                raise
+
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    def _release(self, priority: Priority) -> None:
+        self._active[priority] -= 1
+        self._wake_waiters()
+
+
 class APIClient:
-    """Django Site API wrapper."""
+    """
+    Django Site API wrapper.
+
+    Requests are sent through a `RequestScheduler`, as interactive requests unless they're made in
+    `background_requests`. Requests failing with 429 Too Many Requests, server errors or connection errors
+    are retried up to `bot.constants.API.max_retries` times with a jittered exponential backoff, after the
+    delay asked for by the `Retry-After` header if there's one. Server and connection errors are only
+    retried for idempotent methods, unless the connection couldn't be made, so nothing is changed twice.
+
+    The latency of requests is sent to stats as `api.<endpoint>.<method>` timings, and their statuses as
+    `api.<endpoint>.<method>.<status>` counts, where the endpoint is the resource of the URL.
+    """
 
     # These are class attributes so they can be seen when being mocked for tests.
     # See commit 22a55534ef13990815a6f69d361e2a12693075d5 for details.
     session: Optional[aiohttp.ClientSession] = None
     loop: asyncio.AbstractEventLoop = None
 
-    def __init__(self, loop: asyncio.AbstractEventLoop, **kwargs):
+    def __init__(self, loop: asyncio.AbstractEventLoop, stats: Optional[AsyncStatsClient] = None, **kwargs):
         auth_headers = {
             'Authorization': f"Token {Keys.site_api}"
         }
@@ -47,8 +162,12 @@ class APIClient:
         else:
             kwargs['headers'] = auth_headers
 
+        kwargs.setdefault('timeout', aiohttp.ClientTimeout(total=API.request_timeout))
+
         self.session = None
         self.loop = loop
+        self.stats = stats
+        self.scheduler = RequestScheduler(API.max_concurrency, API.max_background_concurrency)
 
         self._ready = asyncio.Event(loop=loop)
         self._creation_task = None
@@ -60,6 +179,45 @@ class APIClient:
     def _url_for(endpoint: str) -> str:
         return f"{URLs.site_schema}{URLs.site_api}/{quote_url(endpoint)}"
 
+    @staticmethod
+    def create_connector(**kwargs) -> aiohttp.TCPConnector:
+        """Create a connector keeping alive as many connections as requests can be sent at once."""
+        return aiohttp.TCPConnector(
+            limit=API.max_concurrency,
+            keepalive_timeout=API.keepalive_timeout,
+            **kwargs,
+        )
+
+    @staticmethod
+    def _metric_for(method: str, endpoint: str) -> str:
+        """Return the stats name of requests to `endpoint`, leaving out the IDs and names of its objects."""
+        resource = endpoint.strip("/").split("/")
+        if len(resource) > 2:
+            resource = [*resource[:2], "detail"]
+        return f"api.{'.'.join(resource)}.{method.lower()}"
+
+    @staticmethod
+    def _retry_delay(response: aiohttp.ClientResponse, attempt: int) -> Optional[float]:
+        """Return the seconds to wait before retrying after `response`, or None if it shouldn't be retried."""
+        if attempt >= API.max_retries or response.status not in RETRY_STATUSES:
+            return None
+        if response.status != 429 and response.method not in IDEMPOTENT_METHODS:
+            return None
+
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is None:
+            return APIClient._backoff(attempt)
+
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            return APIClient._backoff(attempt)
+        return delay if delay <= MAX_RETRY_DELAY else None
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        return random.uniform(0, min(MAX_RETRY_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
     async def _create_session(self, **session_kwargs) -> None:
         """
         Create the aiohttp session with `session_kwargs` and set the ready event.
@@ -68,7 +226,11 @@ class APIClient:
         If an open session already exists, it will first be closed.
         """
         await self.close()
-        self.session = aiohttp.ClientSession(**{**self._default_session_kwargs, **session_kwargs})
+
+        session_kwargs = {**self._default_session_kwargs, **session_kwargs}
+        if "connector" not in session_kwargs:
+            session_kwargs["connector"] = self.create_connector()
+        self.session = aiohttp.ClientSession(**session_kwargs)
         self._ready.set()
 
     async def close(self) -> None:
@@ -106,18 +268,91 @@ class APIClient:
                 response_text = await response.text()
                 raise ResponseCodeError(response=response, response_text=response_text)
 
-    async def request(self, method: str, endpoint: str, *, raise_for_status: bool = True, **kwargs) -> dict:
-        """Send an HTTP request to the site API and return the JSON response."""
+    async def request(self, method: str, endpoint: str, *, raise_for_status: bool = True, **kwargs) -> Optional[dict]:
+        """Send an HTTP request to the site API and return the JSON response, or None if it has no content."""
         await self._ready.wait()
 
-        async with self.session.request(method.upper(), self._url_for(endpoint), **kwargs) as resp:
-            await self.maybe_raise_for_status(resp, raise_for_status)
-            return await resp.json()
+        method = method.upper()
+        url = self._url_for(endpoint)
+        metric = self._metric_for(method, endpoint)
+        priority = _priority.get()
+
+        for attempt in itertools.count():
+            queued = time.perf_counter()
+            async with self.scheduler.slot(priority):
+                start = time.perf_counter()
+                self._timing(f"api.queue.{priority.name.lower()}", start - queued)
+
+                try:
+                    async with self.session.request(method, url, **kwargs) as resp:
+                        self._timing(metric, time.perf_counter() - start)
+                        self._incr(f"{metric}.{resp.status}")
+
+                        delay = self._retry_delay(resp, attempt)
+                        if delay is None:
+                            if resp.status == 204:
+                                return None
+
+                            await self.maybe_raise_for_status(resp, raise_for_status)
+                            return await resp.json()
+                        reason = f"status {resp.status}"
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    self._incr(f"{metric}.errors")
+                    # Requests whose connection couldn't be made never reached the site, whatever their method.
+                    unsent = isinstance(e, aiohttp.ClientConnectorError)
+                    if attempt >= API.max_retries or not (unsent or method in IDEMPOTENT_METHODS):
+                        raise
+
+                    delay = self._backoff(attempt)
+                    reason = repr(e)
+
+            self._incr(f"{metric}.retries")
+            log.info(f"Retrying {method} {endpoint} in {delay:.1f} seconds after {reason}.")
+            await asyncio.sleep(delay)
+
+    def _timing(self, metric: str, seconds: float) -> None:
+        if self.stats is not None:
+            self.stats.timing(metric, seconds * 1000)
+
+    def _incr(self, metric: str) -> None:
+        if self.stats is not None:
+            self.stats.incr(metric)
 
     async def get(self, endpoint: str, *, raise_for_status: bool = True, **kwargs) -> dict:
         """Site API GET."""
         return await self.request("GET", endpoint, raise_for_status=raise_for_status, **kwargs)
 
+    async def get_pages(self, endpoint: str, *, params: Optional[dict] = None) -> AsyncIterator[List[dict]]:
+        """
+        Site API GET of every page of a paginated endpoint, yielding the results of one page at a time.
+
+        The next page is fetched while the current one is being processed, so at most two pages are
+        held in memory. Endpoints which aren't paginated return every result in a single page.
+        """
+        params = {**(params or {}), "page": 1}
+        response = await self.get(endpoint, params=params)
+        next_response = None
+
+        try:
+            while True:
+                if isinstance(response, list):
+                    yield response
+                    return
+
+                if response["next_page_no"] is not None:
+                    params = {**params, "page": response["next_page_no"]}
+                    next_response = asyncio.create_task(self.get(endpoint, params=params))
+
+                yield response["results"]
+
+                if next_response is None:
+                    return
+                response = await next_response
+                next_response = None
+        finally:
+            if next_response is not None:
+                next_response.cancel()
+
     async def patch(self, endpoint: str, *, raise_for_status: bool = True, **kwargs) -> dict:
         """Site API PATCH."""
         return await self.request("PATCH", endpoint, raise_for_status=raise_for_status, **kwargs)
@@ -132,14 +367,7 @@ class APIClient:
 
     async def delete(self, endpoint: str, *, raise_for_status: bool = True, **kwargs) -> Optional[dict]:
         """Site API DELETE."""
-        await self._ready.wait()
-
-        async with self.session.delete(self._url_for(endpoint), **kwargs) as resp:
-            if resp.status == 204:
-                return None
-
-            await self.maybe_raise_for_status(resp, raise_for_status)
-            return await resp.json()
+        return await self.request("DELETE", endpoint, raise_for_status=raise_for_status, **kwargs)
 
 
 def loop_is_running() -> bool:
@@ -1,18 +1,31 @@
 import asyncio
 import socket
+import typing as t
 
 from statsd.client.base import StatsClientBase
+from statsd.client.udp import Pipeline
 
 
 class AsyncStatsClient(StatsClientBase):
-    """An async transport method for statsd communication."""
+    """
+    An async transport method for statsd communication.
+
+    Metrics are buffered and sent as newline-separated lines in datagrams of at most `max_udp_size`
+    bytes. The buffer is flushed when the next metric wouldn't fit in it, or `flush_interval` seconds
+    after a metric was buffered. Counters at the full sample rate are summed per stat until the next
+    flush, so a frequently incremented counter only takes up a single line per flush.
+
+    Sending a metric never creates a task; flushes are scheduled with `loop.call_later`.
+    """
 
     def __init__(
         self,
         loop: asyncio.AbstractEventLoop,
         host: str = 'localhost',
         port: int = 8125,
-        prefix: str = None
+        prefix: str = None,
+        max_udp_size: int = 512,
+        flush_interval: float = 1,
     ):
         """Create a new client."""
         family, _, _, _, addr = socket.getaddrinfo(
@@ -22,6 +35,15 @@ class AsyncStatsClient(StatsClientBase):
         self._loop = loop
         self._transport = None
 
+        # `_maxudpsize` is the name statsd's `Pipeline` reads the limit from.
+        self._maxudpsize = max_udp_size
+        self._flush_interval = flush_interval
+        self._flush_handle: t.Optional[asyncio.TimerHandle] = None
+
+        self._buffer: t.List[str] = []
+        self._buffer_size = 0
+        self._counters: t.Dict[str, int] = {}
+
     async def create_socket(self) -> None:
         """Use the loop.create_datagram_endpoint method to create a socket."""
         self._transport, _ = await self._loop.create_datagram_endpoint(
@@ -30,10 +52,67 @@ class AsyncStatsClient(StatsClientBase):
             remote_addr=self._addr
         )
 
+    def close(self) -> None:
+        """Send the buffered metrics and close the socket."""
+        self.flush()
+        if self._transport:
+            self._transport.close()
+
+    def pipeline(self) -> Pipeline:
+        """Return a pipeline, which sends its metrics together when it's exited."""
+        return Pipeline(self)
+
+    def incr(self, stat: str, count: int = 1, rate: float = 1) -> None:
+        """Increment a stat by `count`, adding it to the other increments of the stat since the last flush."""
+        if rate != 1:
+            # Sampled counters are scaled up by statsd, so they can't be summed with the others.
+            super().incr(stat, count, rate)
+            return
+
+        if self._prefix:
+            stat = f"{self._prefix}.{stat}"
+
+        self._counters[stat] = self._counters.get(stat, 0) + count
+        self._schedule_flush()
+
     def _send(self, data: str) -> None:
-        """Start an async task to send data to statsd."""
-        self._loop.create_task(self._async_send(data))
+        """Buffer data to be sent to statsd with the next flush."""
+        self._buffer_line(data)
+        self._schedule_flush()
+
+    def _buffer_line(self, data: str) -> None:
+        """Add a line to the buffer, first sending the buffer if the line wouldn't fit in it."""
+        if self._buffer and self._buffer_size + len(data) > self._maxudpsize:
+            self._send_buffer()
+
+        self._buffer.append(data)
+        # Account for the newline separating this line from the next one.
+        self._buffer_size += len(data) + 1
+
+    def _send_buffer(self) -> None:
+        """Send the buffered lines to statsd in a single datagram."""
+        data = "\n".join(self._buffer)
+        self._buffer.clear()
+        self._buffer_size = 0
+
+        if self._transport:
+            self._transport.sendto(data.encode('ascii'), self._addr)
+
+    def _schedule_flush(self) -> None:
+        """Schedule a flush after the flush interval, unless one is already scheduled."""
+        if self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(self._flush_interval, self.flush)
+
+    def flush(self) -> None:
+        """Send the summed counters and all other buffered metrics to statsd."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        counters, self._counters = self._counters, {}
+        for stat, count in counters.items():
+            if count:
+                self._buffer_line(f"{stat}:{count}|c")
 
-    async def _async_send(self, data: str) -> None:
-        """Send data to the statsd server using the async transport."""
-        self._transport.sendto(data.encode('ascii'), self._addr)
+        if self._buffer:
+            self._send_buffer()
@@ -5,14 +5,14 @@ import warnings
 from typing import Optional
 
 import aiohttp
-import aioredis
 import discord
-import fakeredis.aioredis
 from discord.ext import commands
 from sentry_sdk import push_scope
 
 from bot import DEBUG_MODE, api, constants
 from bot.async_stats import AsyncStatsClient
+from bot.redis_session import RedisHealthCheck, RedisSession, create_redis_session
+from bot.timers import TimerQueue
 
 log = logging.getLogger('bot')
 
@@ -30,10 +30,12 @@ class Bot(commands.Bot):
         super().__init__(*args, **kwargs)
 
         self.http_session: Optional[aiohttp.ClientSession] = None
-        self.redis_session: Optional[aioredis.Redis] = None
+        self.redis_session: Optional[RedisSession] = None
         self.redis_ready = asyncio.Event()
         self.redis_closed = False
-        self.api_client = api.APIClient(loop=self.loop)
+        # True while Redis is unreachable, when caches with a near cache serve stale values.
+        self.redis_degraded = False
+        self._redis_health_check: Optional[asyncio.Task] = None
 
         self._connector = None
         self._resolver = None
@@ -47,11 +49,23 @@ class Bot(commands.Bot):
             # will effectively disable stats.
             statsd_url = "127.0.0.1"
 
-        self.stats = AsyncStatsClient(self.loop, statsd_url, 8125, prefix="bot")
+        self.stats = AsyncStatsClient(
+            self.loop,
+            statsd_url,
+            8125,
+            prefix="bot",
+            max_udp_size=constants.Stats.max_udp_size,
+            flush_interval=constants.Stats.flush_interval,
+        )
+
+        self.api_client = api.APIClient(loop=self.loop, stats=self.stats)
+
+        # The timers of the tasks scheduled by every cog.
+        self.timers = TimerQueue(self.loop, self.stats)
 
     async def _create_redis_session(self) -> None:
         """
-        Create the Redis connection pool, and then open the redis event gate.
+        Create the Redis connection pool, open the redis event gate, and start checking its health.
 
         If constants.Redis.use_fakeredis is True, we'll set up a fake redis pool instead
         of attempting to communicate with a real Redis server. This is useful because it
@@ -61,18 +75,14 @@ class Bot(commands.Bot):
         The fakeredis cache won't have persistence across restarts, but that
         usually won't matter for local bot testing.
         """
-        if constants.Redis.use_fakeredis:
-            log.info("Using fakeredis instead of communicating with a real Redis server.")
-            self.redis_session = await fakeredis.aioredis.create_redis_pool()
-        else:
-            self.redis_session = await aioredis.create_redis_pool(
-                address=(constants.Redis.host, constants.Redis.port),
-                password=constants.Redis.password,
-            )
+        self.redis_session = await create_redis_session(self.stats)
 
         self.redis_closed = False
+        self.redis_degraded = False
         self.redis_ready.set()
 
+        self._redis_health_check = self.loop.create_task(RedisHealthCheck(self).run())
+
     def add_cog(self, cog: commands.Cog) -> None:
         """Adds a "cog" to the bot and logs the operation."""
         super().add_cog(cog)
@@ -90,9 +100,11 @@ class Bot(commands.Bot):
         super().clear()
 
     async def close(self) -> None:
-        """Close the Discord connection and the aiohttp session, connector, statsd client, and resolver."""
+        """Close the Discord connection, the aiohttp session, connector, statsd client, resolver and timers."""
         await super().close()
 
+        self.timers.close()
+
         await self.api_client.close()
 
         if self.http_session:
@@ -104,8 +116,10 @@ class Bot(commands.Bot):
         if self._resolver:
             await self._resolver.close()
 
-        if self.stats._transport:
-            self.stats._transport.close()
+        self.stats.close()
+
+        if self._redis_health_check:
+            self._redis_health_check.cancel()
 
         if self.redis_session:
             self.redis_closed = True
@@ -157,7 +171,12 @@ class Bot(commands.Bot):
             )
 
         self.http_session = aiohttp.ClientSession(connector=self._connector)
-        self.api_client.recreate(force=True, connector=self._connector)
+
+        # The site API has its own connector, so the connections kept alive to the site aren't limited by Discord's.
+        self.api_client.recreate(
+            force=True,
+            connector=api.APIClient.create_connector(resolver=self._resolver, family=socket.AF_INET),
+        )
 
     async def on_guild_available(self, guild: discord.Guild) -> None:
         """
@@ -3,10 +3,11 @@ import logging
 from collections.abc import Mapping
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from operator import itemgetter
 from typing import Dict, Iterable, List, Set
 
-from discord import Colour, Member, Message, NotFound, Object, TextChannel
+from discord import (
+    Colour, Member, Message, NotFound, Object, RawBulkMessageDeleteEvent, RawMessageDeleteEvent, TextChannel
+)
 from discord.ext.commands import Cog
 
 from bot import rules
@@ -19,22 +20,24 @@ from bot.constants import (
     STAFF_ROLES,
 )
 from bot.converters import Duration
+from bot.rules import RuleWindow
+from bot.utils.message_cache import MessageWindowCache
 from bot.utils.messages import send_attachments
 
 
 log = logging.getLogger(__name__)
 
-RULE_FUNCTION_MAPPING = {
-    'attachments': rules.apply_attachments,
-    'burst': rules.apply_burst,
-    'burst_shared': rules.apply_burst_shared,
-    'chars': rules.apply_chars,
-    'discord_emojis': rules.apply_discord_emojis,
-    'duplicates': rules.apply_duplicates,
-    'links': rules.apply_links,
-    'mentions': rules.apply_mentions,
-    'newlines': rules.apply_newlines,
-    'role_mentions': rules.apply_role_mentions
+RULE_MAPPING = {
+    'attachments': rules.attachments_rule,
+    'burst': rules.burst_rule,
+    'burst_shared': rules.burst_shared_rule,
+    'chars': rules.chars_rule,
+    'discord_emojis': rules.discord_emojis_rule,
+    'duplicates': rules.duplicates_rule,
+    'links': rules.links_rule,
+    'mentions': rules.mentions_rule,
+    'newlines': rules.newlines_rule,
+    'role_mentions': rules.role_mentions_rule
 }
 
 
@@ -114,6 +117,16 @@ class AntiSpam(Cog):
 
         self.message_deletion_queue = dict()
 
+        # Only keep messages for as long as the rule with the highest interval cares about them.
+        self.max_interval = max(
+            (rule_config.get('interval', 0) for rule_config in AntiSpamConfig.rules.values()),
+            default=0
+        )
+        self.message_cache = MessageWindowCache(max_age=self.max_interval)
+
+        # The running totals of every rule, per channel.
+        self.rule_windows: Dict[int, Dict[str, RuleWindow]] = {}
+
         self.bot.loop.create_task(self.alert_on_validation_error())
 
     @property
@@ -140,6 +153,76 @@ class AntiSpam(Cog):
             self.bot.remove_cog(self.__class__.__name__)
             return
 
+    @Cog.listener()
+    async def on_ready(self) -> None:
+        """Drop the cached message windows, since messages may have been missed before a new session started."""
+        self.message_cache.clear()
+        self.rule_windows.clear()
+
+    @Cog.listener()
+    async def on_raw_message_delete(self, payload: RawMessageDeleteEvent) -> None:
+        """Remove deleted messages from the message window of their channel."""
+        self.forget_messages(payload.channel_id, (payload.message_id,))
+
+    @Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: RawBulkMessageDeleteEvent) -> None:
+        """Remove bulk deleted messages from the message window of their channel."""
+        self.forget_messages(payload.channel_id, payload.message_ids)
+
+    @Cog.listener()
+    async def on_message_edit(self, before: Message, after: Message) -> None:
+        """Update the rule totals of edited messages."""
+        for window in self.rule_windows.get(after.channel.id, {}).values():
+            window.update(after)
+
+    def forget_messages(self, channel_id: int, message_ids: Iterable[int]) -> None:
+        """Remove the messages with the given `message_ids` from the message and rule windows of `channel_id`."""
+        message_ids = set(message_ids)
+        self.message_cache.remove(channel_id, message_ids)
+        for window in self.rule_windows.get(channel_id, {}).values():
+            window.remove(message_ids)
+
+    def get_rule_windows(self, channel_id: int) -> Dict[str, RuleWindow]:
+        """Return the rule windows of `channel_id`, creating them if necessary."""
+        windows = self.rule_windows.get(channel_id)
+        if windows is None:
+            windows = self.rule_windows[channel_id] = {
+                rule_name: RuleWindow(RULE_MAPPING[rule_name], rule_config)
+                for rule_name, rule_config in AntiSpamConfig.rules.items()
+            }
+        return windows
+
+    async def cache_message(self, message: Message) -> None:
+        """
+        Add `message` to the message window of its channel and to the totals of every rule.
+
+        If the channel is cold, for example right after startup or a reconnect, its window is
+        first primed with a single history fetch covering the highest rule interval.
+        """
+        channel = message.channel
+        rule_windows = self.get_rule_windows(channel.id).values()
+
+        if not self.message_cache.is_warm(channel.id):
+            log.trace(f"Priming antispam message window for channel `{channel.id}` from history.")
+            earliest_relevant_at = datetime.utcnow() - timedelta(seconds=self.max_interval)
+            history = [
+                msg async for msg in channel.history(after=earliest_relevant_at)
+                if not msg.author.bot
+            ]
+            self.message_cache.prime(channel.id, history)
+            for window in rule_windows:
+                for msg in history:
+                    window.insert(msg, evict=False)
+            self.bot.stats.incr("anti_spam.message_cache.history_fetches")
+
+        for window in rule_windows:
+            window.insert(message)
+
+        evicted = self.message_cache.append(message)
+        if evicted:
+            self.bot.stats.incr("anti_spam.message_cache.evictions", evicted)
+        self.bot.stats.gauge("anti_spam.message_cache.size", len(self.message_cache))
+
     @Cog.listener()
     async def on_message(self, message: Message) -> None:
         """Applies the antispam rules to each received message."""
@@ -148,34 +231,18 @@ class AntiSpam(Cog):
             or message.guild.id != GuildConfig.id
             or message.author.bot
             or (message.channel.id in Filter.channel_whitelist and not DEBUG_MODE)
-            or (any(role.id in STAFF_ROLES for role in message.author.roles) and not DEBUG_MODE)
         ):
             return
 
-        # Fetch the rule configuration with the highest rule interval.
-        max_interval_config = max(
-            AntiSpamConfig.rules.values(),
-            key=itemgetter('interval')
-        )
-        max_interval = max_interval_config['interval']
-
-        # Store history messages since `interval` seconds ago in a list to prevent unnecessary API calls.
-        earliest_relevant_at = datetime.utcnow() - timedelta(seconds=max_interval)
-        relevant_messages = [
-            msg async for msg in message.channel.history(after=earliest_relevant_at, oldest_first=False)
-            if not msg.author.bot
-        ]
-
-        for rule_name in AntiSpamConfig.rules:
-            rule_config = AntiSpamConfig.rules[rule_name]
-            rule_function = RULE_FUNCTION_MAPPING[rule_name]
-
-            # Create a list of messages that were sent in the interval that the rule cares about.
-            latest_interesting_stamp = datetime.utcnow() - timedelta(seconds=rule_config['interval'])
-            messages_for_rule = [
-                msg for msg in relevant_messages if msg.created_at > latest_interesting_stamp
-            ]
-            result = await rule_function(message, messages_for_rule, rule_config)
+        # Staff messages still count towards rules such as `burst_shared`, so cache them before bailing out.
+        await self.cache_message(message)
+
+        if any(role.id in STAFF_ROLES for role in message.author.roles) and not DEBUG_MODE:
+            return
+
+        for rule_name, window in self.get_rule_windows(message.channel.id).items():
+            # The window only holds the totals of the messages sent in the interval that the rule cares about.
+            result = window.evaluate(message)
 
             # If the rule returns `None`, that means the message didn't violate it.
             # If it doesn't, it returns a tuple in the form `(str, Iterable[discord.Member])`
@@ -233,6 +300,9 @@ class AntiSpam(Cog):
     async def maybe_delete_messages(self, channel: TextChannel, messages: List[Message]) -> None:
         """Cleans the messages if cleaning is configured."""
         if AntiSpamConfig.clean_offending:
+            # Forget about the messages right away so they can't trigger rules again before the deletion is confirmed.
+            self.forget_messages(channel.id, (message.id for message in messages))
+
             # If we have more than one message, we can use bulk delete.
             if len(messages) > 1:
                 message_ids = [message.id for message in messages]
@@ -265,10 +335,10 @@ def validate_config(rules_: Mapping = AntiSpamConfig.rules) -> Dict[str, str]:
     """Validates the antispam configs."""
     validation_errors = {}
     for name, config in rules_.items():
-        if name not in RULE_FUNCTION_MAPPING:
+        if name not in RULE_MAPPING:
             log.error(
                 f"Unrecognized antispam rule `{name}`. "
-                f"Valid rules are: {', '.join(RULE_FUNCTION_MAPPING)}"
+                f"Valid rules are: {', '.join(RULE_MAPPING)}"
             )
             validation_errors[name] = f"`{name}` is not recognized as an antispam rule."
             continue
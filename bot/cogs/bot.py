@@ -11,6 +11,7 @@ from bot.bot import Bot
 from bot.cogs.token_remover import TokenRemover
 from bot.constants import Categories, Channels, DEBUG_MODE, Guild, MODERATION_ROLES, Roles, URLs
 from bot.decorators import with_role
+from bot.utils.message_analysis import analyse
 from bot.utils.messages import wait_for_deletion
 
 log = logging.getLogger(__name__)
@@ -234,7 +235,7 @@ class BotCog(Cog, name="Bot"):
                 or msg.channel.id in self.channel_whitelist
             )
             and not msg.author.bot
-            and len(msg.content.splitlines()) > 3
+            and analyse(msg.content).line_count > 3
             and not TokenRemover.find_token_in_message(msg)
         )
 
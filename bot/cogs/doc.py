@@ -1,28 +1,38 @@
 import asyncio
-import functools
+import base64
+import io
+import itertools
+import json
 import logging
+import posixpath
 import re
 import textwrap
-from collections import OrderedDict
+import time
+import zlib
+from collections import OrderedDict, defaultdict
 from contextlib import suppress
 from types import SimpleNamespace
-from typing import Any, Callable, Optional, Tuple
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
 
+import aiohttp
 import discord
 from bs4 import BeautifulSoup
 from bs4.element import PageElement, Tag
 from discord.errors import NotFound
 from discord.ext import commands
 from markdownify import MarkdownConverter
-from requests import ConnectTimeout, ConnectionError, HTTPError
+from requests import ConnectionError
 from sphinx.ext import intersphinx
-from urllib3.exceptions import ProtocolError
+from sphinx.util.inventory import InventoryFile
 
 from bot.bot import Bot
 from bot.constants import MODERATION_ROLES, RedirectOutput
 from bot.converters import ValidPythonIdentifier, ValidURL
 from bot.decorators import with_role
 from bot.pagination import LinePaginator
+from bot.utils.cache import async_cache
+from bot.utils.redis_cache import RedisCache
+from bot.utils.symbol_index import SymbolIndex
 
 
 log = logging.getLogger(__name__)
@@ -63,36 +73,54 @@ UNWANTED_SIGNATURE_SYMBOLS_RE = re.compile(r"\[source]|\\\\|¶")
 WHITESPACE_AFTER_NEWLINES_RE = re.compile(r"(?<=\n\n)(\s+)")
 
 FAILED_REQUEST_RETRY_AMOUNT = 3
+INVENTORY_TIMEOUT = aiohttp.ClientTimeout(
+    sock_connect=SPHINX_MOCK_APP.config.intersphinx_timeout,
+    sock_read=SPHINX_MOCK_APP.config.intersphinx_timeout,
+)
 NOT_FOUND_DELETE_DELAY = RedirectOutput.delete_delay
+SUGGESTION_AMOUNT = 5
 
+# Limits of the cache of parsed documentation pages.
+PAGE_CACHE_MAX_SIZE = 16 * 2 ** 20  # Total length of the cached signatures and descriptions.
+PAGE_CACHE_TTL = 60 * 60
 
-def async_cache(max_size: int = 128, arg_offset: int = 0) -> Callable:
-    """
-    LRU cache implementation for coroutines.
+# The signatures and description of a symbol, as returned by `Doc.get_symbol_html`.
+SymbolHTML = Tuple[Optional[List[str]], str]
 
-    Once the cache exceeds the maximum size, keys are deleted in FIFO order.
 
-    An offset may be optionally provided to be applied to the coroutine's arguments when creating the cache key.
-    """
-    # Assign the cache to the function itself so we can clear it from outside.
-    async_cache.cache = OrderedDict()
+class Inventory(NamedTuple):
+    """An intersphinx inventory of a package, along with the validators of the response it was downloaded from."""
+
+    url: str
+    base_url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    project: str
+    groups: Dict[str, Dict[str, str]]  # Maps each group to its symbols, mapped to their relative URLs.
+
+
+def parse_inventory(data: bytes) -> Tuple[str, Dict[str, Dict[str, str]]]:
+    """Parse the intersphinx inventory `data` and return its project name and groups of symbols."""
+    inventory = InventoryFile.load(io.BytesIO(data), '', posixpath.join)
+
+    # Every symbol has the project name from the inventory's header.
+    project = next((entry[0] for symbols in inventory.values() for entry in symbols.values()), "")
+    groups = {
+        group: {symbol: relative_doc_url for symbol, (_, _, relative_doc_url, _) in symbols.items()}
+        for group, symbols in inventory.items()
+    }
 
-    def decorator(function: Callable) -> Callable:
-        """Define the async_cache decorator."""
-        @functools.wraps(function)
-        async def wrapper(*args) -> Any:
-            """Decorator wrapper for the caching logic."""
-            key = ':'.join(args[arg_offset:])
+    return project, groups
 
-            value = async_cache.cache.get(key)
-            if value is None:
-                if len(async_cache.cache) > max_size:
-                    async_cache.cache.popitem(last=False)
 
-                async_cache.cache[key] = await function(*args)
-            return async_cache.cache[key]
-        return wrapper
-    return decorator
+def encode_inventory(inventory: Inventory) -> str:
+    """Serialise the `inventory` to a compressed string which can be stored in Redis."""
+    return base64.b85encode(zlib.compress(json.dumps(inventory).encode())).decode()
+
+
+def decode_inventory(data: str) -> Inventory:
+    """Deserialise an inventory serialised with `encode_inventory`."""
+    return Inventory(*json.loads(zlib.decompress(base64.b85decode(data))))
 
 
 class DocMarkdownConverter(MarkdownConverter):
@@ -113,6 +141,133 @@ def markdownify(html: str) -> DocMarkdownConverter:
     return DocMarkdownConverter(bullets='•').convert(html)
 
 
+def _match_end_tag(tag: Tag) -> bool:
+    """Matches `tag` if its class value is in `SEARCH_END_TAG_ATTRS` or the tag is table."""
+    for attr in SEARCH_END_TAG_ATTRS:
+        if attr in tag.get("class", ()):
+            return True
+
+    return tag.name == "table"
+
+
+def parse_page(html: str, symbol_ids: Iterable[str]) -> Dict[str, Optional[SymbolHTML]]:
+    """
+    Parse a documentation page and extract the signatures and description of every symbol in `symbol_ids`.
+
+    A symbol ID maps to None if it isn't on the page. This is CPU bound, so it should be run in an executor.
+    """
+    soup = BeautifulSoup(html, 'lxml')
+    search_html = None
+    symbols = {}
+
+    # Finding every symbol by its ID would scan the whole page once per symbol, so the tags are mapped at once.
+    # The first tag with an ID is kept, like `soup.find` returns.
+    tags_by_id = {}
+    for tag in soup.find_all(id=True):
+        tags_by_id.setdefault(tag["id"], tag)
+
+    for symbol_id in symbol_ids:
+        symbol_heading = tags_by_id.get(symbol_id)
+        if symbol_heading is None:
+            symbols[symbol_id] = None
+
+        elif symbol_id.startswith("module-"):
+            # Get page content from the module headerlink to the
+            # first tag that has its class in `SEARCH_END_TAG_ATTRS`
+            start_tag = symbol_heading.find("a", attrs={"class": "headerlink"})
+            end_tag = start_tag and start_tag.find_next(_match_end_tag)
+            if end_tag is None:
+                symbols[symbol_id] = [], ""
+                continue
+
+            # Modules are rare, so the page is only serialised if it has one.
+            if search_html is None:
+                search_html = str(soup)
+
+            description_start_index = search_html.find(str(start_tag.parent)) + len(str(start_tag.parent))
+            description_end_index = search_html.find(str(end_tag))
+            description = search_html[description_start_index:description_end_index]
+            symbols[symbol_id] = None, description.replace('¶', '')
+
+        else:
+            signatures = []
+            description = None
+            # Get text of up to 3 signatures preceding the description, remove unwanted symbols
+            siblings = (sibling for sibling in symbol_heading.next_siblings if sibling.name in ("dt", "dd"))
+            for element in itertools.chain((symbol_heading,), siblings):
+                if element.name == "dd":
+                    description = element
+                    break
+                if len(signatures) < 3:
+                    signature = UNWANTED_SIGNATURE_SYMBOLS_RE.sub("", element.text)
+                    if signature:
+                        signatures.append(signature)
+            else:
+                # Without a description there's nothing to show for the symbol.
+                signatures = []
+
+            symbols[symbol_id] = signatures, str(description).replace('¶', '')
+
+    return symbols
+
+
+class PageCache:
+    """
+    Cache of the symbols parsed from documentation pages, keyed by the URLs of the pages.
+
+    Pages expire `ttl` seconds after being cached. A page's size is the number of characters of the
+    signatures and description HTML extracted for its symbols, not of the whole page. Once the total
+    size of the cached pages exceeds `max_size`, the least recently used pages are evicted.
+    """
+
+    def __init__(self, max_size: int = PAGE_CACHE_MAX_SIZE, ttl: float = PAGE_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.size = 0
+        self._pages: Dict[str, Tuple[float, int, Dict[str, Optional[SymbolHTML]]]] = OrderedDict()
+
+    def get(self, url: str) -> Optional[Dict[str, Optional[SymbolHTML]]]:
+        """Return the symbols of the page at `url`, or None if the page isn't cached or has expired."""
+        page = self._pages.get(url)
+        if page is None:
+            return None
+
+        expires_at, _, symbols = page
+        if expires_at <= time.monotonic():
+            self._evict(url)
+            return None
+
+        self._pages.move_to_end(url)
+        return symbols
+
+    def set(self, url: str, symbols: Dict[str, Optional[SymbolHTML]]) -> None:
+        """Cache the `symbols` of the page at `url`, evicting the least recently used pages if it's full."""
+        if url in self._pages:
+            self._evict(url)
+
+        size = sum(
+            len(description) + sum(map(len, signatures or ()))
+            for signatures, description in filter(None, symbols.values())
+        )
+        self._pages[url] = (time.monotonic() + self.ttl, size, symbols)
+        self.size += size
+
+        while self.size > self.max_size and len(self._pages) > 1:
+            self._evict(next(iter(self._pages)))
+
+    def clear(self) -> None:
+        """Remove every page from the cache."""
+        self._pages.clear()
+        self.size = 0
+
+    def _evict(self, url: str) -> None:
+        _, size, _ = self._pages.pop(url)
+        self.size -= size
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+
 class InventoryURL(commands.Converter):
     """
     Represents an Intersphinx inventory URL.
@@ -147,41 +302,60 @@ class InventoryURL(commands.Converter):
 class Doc(commands.Cog):
     """A set of commands for querying & displaying documentation."""
 
+    # RedisCache[package_name: str, inventory: str], where the inventory is an `Inventory` serialised
+    # with `encode_inventory`. These are loaded on startup so symbols can be looked up right away,
+    # and revalidated with conditional requests.
+    inventory_cache = RedisCache()
+
     def __init__(self, bot: Bot):
         self.base_urls = {}
         self.bot = bot
         self.inventories = {}
         self.renamed_symbols = set()
+        self.symbol_index = SymbolIndex(())
+
+        # Maps the name of a package to its latest intersphinx inventory.
+        self.package_inventories: Dict[str, Inventory] = {}
+
+        # Maps the URL of a documentation page to the IDs of the symbols on it.
+        self.page_symbols: Dict[str, Set[str]] = defaultdict(set)
+        self.page_cache = PageCache()
+        self.page_requests: Dict[str, asyncio.Future] = {}
 
         self.bot.loop.create_task(self.init_refresh_inventory())
 
     async def init_refresh_inventory(self) -> None:
-        """Refresh documentation inventory on cog initialization."""
+        """Load the cached inventories and then refresh them on cog initialization."""
         await self.bot.wait_until_guild_available()
+        await self.load_inventory_cache()
         await self.refresh_inventory()
 
-    async def update_single(
-        self, package_name: str, base_url: str, inventory_url: str
-    ) -> None:
+    async def load_inventory_cache(self) -> None:
+        """Build the documentation inventory from the inventories persisted in Redis."""
+        cached = await self.inventory_cache.to_dict()
+        inventories = await self.bot.loop.run_in_executor(
+            None, lambda: {package: decode_inventory(data) for package, data in cached.items()}
+        )
+
+        self.build_inventory(inventories)
+        await self.build_symbol_index()
+        log.debug(f"Loaded {len(inventories)} cached documentation inventories.")
+
+    def update_single(self, package_name: str, inventory: Inventory) -> None:
         """
-        Rebuild the inventory for a single package.
+        Add the symbols of a single package to the inventory.
 
         Where:
             * `package_name` is the package name to use, appears in the log
-            * `base_url` is the root documentation URL for the specified package, used to build
-                absolute paths that link to specific symbols
-            * `inventory_url` is the absolute URL to the intersphinx inventory, fetched by running
-                `intersphinx.fetch_inventory` in an executor on the bot's event loop
+            * `inventory` is the package's intersphinx inventory; its `base_url` is the root documentation URL
+                for the package, used to build absolute paths that link to specific symbols
         """
-        self.base_urls[package_name] = base_url
+        self.base_urls[package_name] = inventory.base_url
+        package_name = inventory.project
 
-        package = await self._fetch_inventory(inventory_url)
-        if not package:
-            return None
-
-        for group, value in package.items():
-            for symbol, (package_name, _version, relative_doc_url, _) in value.items():
-                absolute_doc_url = base_url + relative_doc_url
+        for group, value in inventory.groups.items():
+            for symbol, relative_doc_url in value.items():
+                absolute_doc_url = inventory.base_url + relative_doc_url
 
                 if symbol in self.inventories:
                     group_name = group.split(":")[1]
@@ -199,32 +373,69 @@ class Doc(commands.Cog):
 
                         self.inventories[symbol] = absolute_doc_url
                         self.renamed_symbols.add(symbol)
+                        self._add_page_symbol(absolute_doc_url)
                         continue
 
                 self.inventories[symbol] = absolute_doc_url
+                self._add_page_symbol(absolute_doc_url)
 
-        log.trace(f"Fetched inventory for {package_name}.")
+        log.trace(f"Added inventory for {package_name}.")
 
-    async def refresh_inventory(self) -> None:
-        """Refresh internal documentation inventory."""
-        log.debug("Refreshing documentation inventory...")
+    def build_inventory(self, inventories: Dict[str, Inventory]) -> None:
+        """
+        Rebuild the documentation inventory from the `inventories` of the packages.
 
+        This doesn't await anything, so symbols are never looked up in a partially built inventory.
+        """
         # Clear the old base URLS and inventories to ensure
         # that we start from a fresh local dataset.
         # Also, reset the cache used for fetching documentation.
         self.base_urls.clear()
         self.inventories.clear()
         self.renamed_symbols.clear()
-        async_cache.cache = OrderedDict()
+        self.page_symbols.clear()
+        self.page_cache.clear()
+        self.get_symbol_embed.clear()
+
+        self.package_inventories = inventories
+        for package_name, inventory in inventories.items():
+            self.update_single(package_name, inventory)
+
+    async def build_symbol_index(self) -> None:
+        """
+        Build the index used to suggest symbols in an executor.
+
+        Until it's built, suggestions are made with the previous index.
+        """
+        symbols = tuple(self.inventories)
+        self.symbol_index = await self.bot.loop.run_in_executor(None, SymbolIndex, symbols)
+
+    async def refresh_inventory(self) -> None:
+        """Refresh internal documentation inventory."""
+        log.debug("Refreshing documentation inventory...")
+        packages = await self.bot.api_client.get('bot/documentation-links')
 
         # Run all coroutines concurrently - since each of them performs a HTTP
         # request, this speeds up fetching the inventory data heavily.
         coros = [
-            self.update_single(
+            self._fetch_inventory(
                 package["package"], package["base_url"], package["inventory_url"]
-            ) for package in await self.bot.api_client.get('bot/documentation-links')
+            ) for package in packages
         ]
-        await asyncio.gather(*coros)
+        inventories = {
+            package["package"]: inventory
+            for package, inventory in zip(packages, await asyncio.gather(*coros))
+            if inventory is not None
+        }
+        self.build_inventory(inventories)
+        await self.build_symbol_index()
+
+        # The base URLs of packages which couldn't be fetched are still listed.
+        for package in packages:
+            self.base_urls.setdefault(package["package"], package["base_url"])
+
+        stale_packages = set(await self.inventory_cache.keys()) - inventories.keys()
+        await self.inventory_cache.delete_many(stale_packages)
 
     async def get_symbol_html(self, symbol: str) -> Optional[Tuple[list, str]]:
         """
@@ -237,50 +448,47 @@ class Doc(commands.Cog):
         else if the symbol could not be found, returns `None`.
         """
         url = self.inventories.get(symbol)
-        if url is None:
+        if url is None or '#' not in url:
             return None
 
-        async with self.bot.http_session.get(url) as response:
-            html = await response.text(encoding='utf-8')
-
-        # Find the signature header and parse the relevant parts.
-        symbol_id = url.split('#')[-1]
-        soup = BeautifulSoup(html, 'lxml')
-        symbol_heading = soup.find(id=symbol_id)
-        search_html = str(soup)
-
-        if symbol_heading is None:
-            return None
+        page_url, _, symbol_id = url.partition('#')
+        symbols = await self.get_page_symbols(page_url)
+        return symbols.get(symbol_id)
 
-        if symbol_id == f"module-{symbol}":
-            # Get page content from the module headerlink to the
-            # first tag that has its class in `SEARCH_END_TAG_ATTRS`
-            start_tag = symbol_heading.find("a", attrs={"class": "headerlink"})
-            if start_tag is None:
-                return [], ""
-
-            end_tag = start_tag.find_next(self._match_end_tag)
-            if end_tag is None:
-                return [], ""
-
-            description_start_index = search_html.find(str(start_tag.parent)) + len(str(start_tag.parent))
-            description_end_index = search_html.find(str(end_tag))
-            description = search_html[description_start_index:description_end_index]
-            signatures = None
-
-        else:
-            signatures = []
-            description = str(symbol_heading.find_next_sibling("dd"))
-            description_pos = search_html.find(description)
-            # Get text of up to 3 signatures, remove unwanted symbols
-            for element in [symbol_heading] + symbol_heading.find_next_siblings("dt", limit=2):
-                signature = UNWANTED_SIGNATURE_SYMBOLS_RE.sub("", element.text)
-                if signature and search_html.find(str(element)) < description_pos:
-                    signatures.append(signature)
+    async def get_page_symbols(self, url: str) -> Dict[str, Optional[SymbolHTML]]:
+        """
+        Return the symbols on the documentation page at `url`, mapped to their signatures and descriptions.
 
-        return signatures, description.replace('¶', '')
+        The page is downloaded and parsed only if it isn't cached yet, and only once for concurrent lookups.
+        """
+        symbols = self.page_cache.get(url)
+        if symbols is not None:
+            self.bot.stats.incr("doc.page_cache.hits")
+            return symbols
+
+        self.bot.stats.incr("doc.page_cache.misses")
+        request = self.page_requests.get(url)
+        if request is None:
+            request = self.page_requests[url] = asyncio.ensure_future(self._parse_page(url))
+            request.add_done_callback(lambda _: self.page_requests.pop(url, None))
+
+        return await asyncio.shield(request)
+
+    async def _parse_page(self, url: str) -> Dict[str, Optional[SymbolHTML]]:
+        """Download and parse the page at `url` in an executor, then cache its symbols."""
+        html = await self._fetch_page(url)
+        symbols = await self.bot.loop.run_in_executor(None, parse_page, html, tuple(self.page_symbols[url]))
+
+        self.page_cache.set(url, symbols)
+        log.trace(f"Parsed {len(symbols)} symbols from {url}.")
+        return symbols
+
+    async def _fetch_page(self, url: str) -> str:
+        """Download the documentation page at `url`."""
+        async with self.bot.http_session.get(url) as response:
+            return await response.text(encoding='utf-8')
 
-    @async_cache(arg_offset=1)
+    @async_cache()
     async def get_symbol_embed(self, symbol: str) -> Optional[discord.Embed]:
         """
         Attempt to scrape and fetch the data for the given `symbol`, and build an embed from its contents.
@@ -382,10 +590,12 @@ class Doc(commands.Cog):
                 doc_embed = await self.get_symbol_embed(symbol)
 
             if doc_embed is None:
-                error_embed = discord.Embed(
-                    description=f"Sorry, I could not find any documentation for `{symbol}`.",
-                    colour=discord.Colour.red()
-                )
+                description = f"Sorry, I could not find any documentation for `{symbol}`."
+                suggestions = self.symbol_index.suggest(symbol, limit=SUGGESTION_AMOUNT)
+                if suggestions:
+                    description += "\nDid you mean " + ", ".join(f"`{suggestion}`" for suggestion in suggestions) + "?"
+
+                error_embed = discord.Embed(description=description, colour=discord.Colour.red())
                 error_message = await ctx.send(embed=error_embed)
                 with suppress(NotFound):
                     await error_message.delete(delay=NOT_FOUND_DELETE_DELAY)
@@ -469,41 +679,82 @@ class Doc(commands.Cog):
         )
         await ctx.send(embed=embed)
 
-    async def _fetch_inventory(self, inventory_url: str) -> Optional[dict]:
-        """Get and return inventory from `inventory_url`. If fetching fails, return None."""
-        fetch_func = functools.partial(intersphinx.fetch_inventory, SPHINX_MOCK_APP, '', inventory_url)
+    async def _fetch_inventory(self, package_name: str, base_url: str, inventory_url: str) -> Optional[Inventory]:
+        """
+        Get and return the inventory of the package from `inventory_url`.
+
+        If the package's current inventory is from the same URL, it's only downloaded again if it has changed.
+        If fetching fails, the current inventory is returned, or None if there isn't one.
+        """
+        current = self.package_inventories.get(package_name)
+        if current is not None and current.url != inventory_url:
+            current = None
+
+        headers = {}
+        if current is not None and current.etag:
+            headers["If-None-Match"] = current.etag
+        if current is not None and current.last_modified:
+            headers["If-Modified-Since"] = current.last_modified
+
         for retry in range(1, FAILED_REQUEST_RETRY_AMOUNT+1):
             try:
-                package = await self.bot.loop.run_in_executor(None, fetch_func)
-            except ConnectTimeout:
+                async with self.bot.http_session.get(
+                    inventory_url, headers=headers, timeout=INVENTORY_TIMEOUT, raise_for_status=True
+                ) as response:
+                    if response.status == 304:
+                        log.trace(f"Inventory {inventory_url} is unchanged.")
+                        self.bot.stats.incr("doc.inventories.unchanged")
+                        if current.base_url != base_url:
+                            current = current._replace(base_url=base_url)
+                            await self._cache_inventory(package_name, current)
+                        return current
+
+                    data = await response.read()
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+            except asyncio.TimeoutError:
                 log.error(
                     f"Fetching of inventory {inventory_url} timed out,"
                     f" trying again. ({retry}/{FAILED_REQUEST_RETRY_AMOUNT})"
                 )
-            except ProtocolError:
+            except (aiohttp.ServerDisconnectedError, aiohttp.ClientPayloadError):
                 log.error(
                     f"Connection lost while fetching inventory {inventory_url},"
                     f" trying again. ({retry}/{FAILED_REQUEST_RETRY_AMOUNT})"
                 )
-            except HTTPError as e:
-                log.error(f"Fetching of inventory {inventory_url} failed with status code {e.response.status_code}.")
-                return None
-            except ConnectionError:
+            except aiohttp.ClientResponseError as e:
+                log.error(f"Fetching of inventory {inventory_url} failed with status code {e.status}.")
+                return current
+            except aiohttp.ClientError:
                 log.error(f"Couldn't establish connection to inventory {inventory_url}.")
-                return None
+                return current
             else:
-                return package
-        log.error(f"Fetching of inventory {inventory_url} failed.")
-        return None
-
-    @staticmethod
-    def _match_end_tag(tag: Tag) -> bool:
-        """Matches `tag` if its class value is in `SEARCH_END_TAG_ATTRS` or the tag is table."""
-        for attr in SEARCH_END_TAG_ATTRS:
-            if attr in tag.get("class", ()):
-                return True
+                break
+        else:
+            log.error(f"Fetching of inventory {inventory_url} failed.")
+            return current
 
-        return tag.name == "table"
+        try:
+            project, groups = await self.bot.loop.run_in_executor(None, parse_inventory, data)
+        except ValueError:
+            log.error(f"Failed to read inventory {inventory_url}.")
+            return current
+
+        self.bot.stats.incr("doc.inventories.downloaded")
+        inventory = Inventory(inventory_url, base_url, etag, last_modified, project, groups)
+        await self._cache_inventory(package_name, inventory)
+        return inventory
+
+    async def _cache_inventory(self, package_name: str, inventory: Inventory) -> None:
+        """Persist the `inventory` of the package in Redis."""
+        data = await self.bot.loop.run_in_executor(None, encode_inventory, inventory)
+        await self.inventory_cache.set(package_name, data)
+
+    def _add_page_symbol(self, url: str) -> None:
+        """Add the symbol the `url` links to to the symbols of its page."""
+        page_url, _, symbol_id = url.partition('#')
+        if symbol_id:
+            self.page_symbols[page_url].add(symbol_id)
 
 
 def setup(bot: Bot) -> None:
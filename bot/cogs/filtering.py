@@ -1,8 +1,9 @@
 import asyncio
+import json
 import logging
-import re
+import time
 from datetime import datetime, timedelta
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import discord.errors
 from dateutil.relativedelta import relativedelta
@@ -16,54 +17,42 @@ from bot.constants import (
     Channels, Colours,
     Filter, Icons, URLs
 )
+from bot.utils.message_analysis import MessageAnalysis, analyse
 from bot.utils.redis_cache import RedisCache
+from bot.utils.watchlist import WatchlistMatch, WatchlistMatcher
 
 log = logging.getLogger(__name__)
 
-INVITE_RE = re.compile(
-    r"(?:discord(?:[\.,]|dot)gg|"                     # Could be discord.gg/
-    r"discord(?:[\.,]|dot)com(?:\/|slash)invite|"     # or discord.com/invite/
-    r"discordapp(?:[\.,]|dot)com(?:\/|slash)invite|"  # or discordapp.com/invite/
-    r"discord(?:[\.,]|dot)me|"                        # or discord.me
-    r"discord(?:[\.,]|dot)io"                         # or discord.io.
-    r")(?:[\/]|slash)"                                # / or 'slash'
-    r"([a-zA-Z0-9]+)",                                # the invite code itself
-    flags=re.IGNORECASE
-)
-
-SPOILER_RE = re.compile(r"(\|\|.+?\|\|)", re.DOTALL)
-URL_RE = re.compile(r"(https?://[^\s]+)", flags=re.IGNORECASE)
-ZALGO_RE = re.compile(r"[\u0300-\u036F\u0489]")
-
-WORD_WATCHLIST_PATTERNS = [
-    re.compile(fr'\b{expression}\b', flags=re.IGNORECASE) for expression in Filter.word_watchlist
-]
-TOKEN_WATCHLIST_PATTERNS = [
-    re.compile(fr'{expression}', flags=re.IGNORECASE) for expression in Filter.token_watchlist
-]
-WATCHLIST_PATTERNS = WORD_WATCHLIST_PATTERNS + TOKEN_WATCHLIST_PATTERNS
+# `word_watchlist`'s entries are matched between word boundaries, `token_watchlist`'s as-is.
+WATCHLIST = WatchlistMatcher(Filter.word_watchlist, Filter.token_watchlist)
 
 DAYS_BETWEEN_ALERTS = 3
 
-
-def expand_spoilers(text: str) -> str:
-    """Return a string containing all interpretations of a spoilered message."""
-    split_text = SPOILER_RE.split(text)
-    return ''.join(
-        split_text[0::2] + split_text[1::2] + split_text
-    )
+# The maximum number of resolved invites kept in memory.
+INVITE_CACHE_SIZE = 2048
+# The JSON error code of invites Discord doesn't know, as opposed to other errors on the invites endpoint.
+UNKNOWN_INVITE = 10006
 
 
 class Filtering(Cog):
     """Filtering out invites, blacklisting domains, and warning us of certain regular expressions."""
 
-    # Redis cache mapping a user ID to the last timestamp a bad nickname alert was sent
-    name_alerts = RedisCache()
+    # Redis cache mapping a user ID to the last timestamp a bad nickname alert was sent.
+    # It is read for every message, so recently read alerts are kept in memory too.
+    # Alerts expire once they no longer prevent sending another one.
+    name_alerts = RedisCache(ttl=DAYS_BETWEEN_ALERTS * 24 * 60 * 60, near_cache_size=10_000)
+
+    # Redis cache mapping an invite code to a JSON object with its guild and the time it expires at
+    invite_cache = RedisCache(ttl=Filter.invite_cache_ttl)
 
     def __init__(self, bot: Bot):
         self.bot = bot
         self.name_lock = asyncio.Lock()
 
+        # Invite code -> (expiry timestamp, guild of the invite or None if it's invalid)
+        self.invites: Dict[str, Tuple[float, Optional[dict]]] = {}
+        self.invite_lookups: Dict[str, asyncio.Future] = {}
+
         staff_mistake_str = "If you believe this was a mistake, please let staff know!"
         self.filters = {
             "filter_zalgo": {
@@ -137,13 +126,9 @@ class Filtering(Cog):
         await self._filter_message(after, delta)
 
     @staticmethod
-    def get_name_matches(name: str) -> List[re.Match]:
+    def get_name_matches(name: str) -> List[WatchlistMatch]:
         """Check bad words from passed string (name). Return list of matches."""
-        matches = []
-        for pattern in WATCHLIST_PATTERNS:
-            if match := pattern.search(name):
-                matches.append(match)
-        return matches
+        return WATCHLIST.findall(name)
 
     async def check_send_alert(self, member: Member) -> bool:
         """When there is less than 3 days after last alert, return `False`, otherwise `True`."""
@@ -170,7 +155,7 @@ class Filtering(Cog):
             log_string = (
                 f"**User:** {member.mention} (`{member.id}`)\n"
                 f"**Display Name:** {member.display_name}\n"
-                f"**Bad Matches:** {', '.join(match.group() for match in matches)}"
+                f"**Bad Matches:** {', '.join(match.text for match in matches)}"
             )
 
             await self.mod_log.send_log_message(
@@ -213,9 +198,9 @@ class Filtering(Cog):
                         if delta is not None and delta < 100:
                             continue
 
-                    # Does the filter only need the message content or the full message?
+                    # Does the filter only need the analysed message content or the full message?
                     if _filter["content_only"]:
-                        match = await _filter["function"](msg.content)
+                        match = await _filter["function"](analyse(msg.content))
                     else:
                         match = await _filter["function"](msg)
 
@@ -249,9 +234,9 @@ class Filtering(Cog):
 
                         # Word and match stats for watch_regex
                         if filter_name == "watch_regex":
-                            surroundings = match.string[max(match.start() - 10, 0): match.end() + 10]
+                            surroundings = match.string[max(match.start - 10, 0): match.end + 10]
                             message_content = (
-                                f"**Match:** '{match[0]}'\n"
+                                f"**Match:** '{match.text}'\n"
                                 f"**Location:** '...{escape_markdown(surroundings)}...'\n"
                                 f"\n**Original Message:**\n{escape_markdown(msg.content)}"
                             )
@@ -308,32 +293,26 @@ class Filtering(Cog):
                         break  # We don't want multiple filters to trigger
 
     @staticmethod
-    async def _has_watch_regex_match(text: str) -> Union[bool, re.Match]:
+    async def _has_watch_regex_match(analysis: MessageAnalysis) -> Union[bool, WatchlistMatch]:
         """
-        Return True if `text` matches any regex from `word_watchlist` or `token_watchlist` configs.
+        Return True if the content matches any regex from `word_watchlist` or `token_watchlist` configs.
 
         `word_watchlist`'s patterns are placed between word boundaries while `token_watchlist` is
         matched as-is. Spoilers are expanded, if any, and URLs are ignored.
         """
-        if SPOILER_RE.search(text):
-            text = expand_spoilers(text)
-
         # Make sure it's not a URL
-        if URL_RE.search(text):
+        if analysis.urls:
             return False
 
-        for pattern in WATCHLIST_PATTERNS:
-            match = pattern.search(text)
-            if match:
-                return match
+        return WATCHLIST.search(analysis.expanded_content)
 
     @staticmethod
-    async def _has_urls(text: str) -> bool:
-        """Returns True if the text contains one of the blacklisted URLs from the config file."""
-        if not URL_RE.search(text):
+    async def _has_urls(analysis: MessageAnalysis) -> bool:
+        """Returns True if the content contains one of the blacklisted URLs from the config file."""
+        if not analysis.urls:
             return False
 
-        text = text.lower()
+        text = analysis.lowered_content
 
         for url in Filter.domain_blacklist:
             if url.lower() in text:
@@ -342,15 +321,15 @@ class Filtering(Cog):
         return False
 
     @staticmethod
-    async def _has_zalgo(text: str) -> bool:
+    async def _has_zalgo(analysis: MessageAnalysis) -> bool:
         """
-        Returns True if the text contains zalgo characters.
+        Returns True if the content contains zalgo characters.
 
         Zalgo range is \u0300 – \u036F and \u0489.
         """
-        return bool(ZALGO_RE.search(text))
+        return analysis.has_zalgo
 
-    async def _has_invites(self, text: str) -> Union[dict, bool]:
+    async def _has_invites(self, analysis: MessageAnalysis) -> Union[dict, bool]:
         """
         Checks if there's any invites in the text content that aren't in the guild whitelist.
 
@@ -359,52 +338,123 @@ class Filtering(Cog):
 
         Attempts to catch some of common ways to try to cheat the system.
         """
-        # Remove backslashes to prevent escape character aroundfuckery like
-        # discord\.gg/gdudes-pony-farm
-        text = text.replace("\\", "")
+        invites = list(dict.fromkeys(analysis.invite_codes))
+        guilds = await asyncio.gather(*(self.resolve_invite(invite) for invite in invites))
 
-        invites = INVITE_RE.findall(text)
         invite_data = dict()
-        for invite in invites:
-            if invite in invite_data:
-                continue
-
-            response = await self.bot.http_session.get(
-                f"{URLs.discord_invite_api}/{invite}", params={"with_counts": "true"}
-            )
-            response = await response.json()
-            guild = response.get("guild")
+        for invite, guild in zip(invites, guilds):
             if guild is None:
                 # Lack of a "guild" key in the JSON response indicates either an group DM invite, an
                 # expired invite, or an invalid invite. The API does not currently differentiate
                 # between invalid and expired invites
                 return True
 
-            guild_id = int(guild.get("id"))
-
-            if guild_id not in Filter.guild_invite_whitelist:
-                guild_icon_hash = guild["icon"]
-                guild_icon = (
-                    "https://cdn.discordapp.com/icons/"
-                    f"{guild_id}/{guild_icon_hash}.png?size=512"
-                )
-
+            if guild["id"] not in Filter.guild_invite_whitelist:
                 invite_data[invite] = {
                     "name": guild["name"],
-                    "icon": guild_icon,
-                    "members": response["approximate_member_count"],
-                    "active": response["approximate_presence_count"]
+                    "icon": guild["icon"],
+                    "members": guild["members"],
+                    "active": guild["active"]
                 }
 
         return invite_data if invite_data else False
 
+    async def resolve_invite(self, invite: str) -> Optional[dict]:
+        """
+        Return the guild `invite` leads to, or None if it's invalid or expired.
+
+        Resolved invites are cached, and concurrent lookups of the same invite share one request.
+        """
+        cached = self.invites.get(invite)
+        if cached is not None and cached[0] > time.time():
+            self.bot.stats.incr("filters.invite_cache.hits")
+            return cached[1]
+
+        lookup = self.invite_lookups.get(invite)
+        if lookup is None:
+            self.bot.stats.incr("filters.invite_cache.misses")
+            lookup = asyncio.ensure_future(self._fetch_invite(invite))
+            lookup.add_done_callback(lambda _: self.invite_lookups.pop(invite, None))
+            self.invite_lookups[invite] = lookup
+        else:
+            self.bot.stats.incr("filters.invite_cache.coalesced")
+
+        # Shield the lookup so a cancelled filter doesn't cancel it for everyone else waiting for it.
+        return await asyncio.shield(lookup)
+
+    async def _fetch_invite(self, invite: str) -> Optional[dict]:
+        """Resolve `invite` from Redis if it's persisted there, otherwise from the Discord API, and cache it."""
+        if Filter.persist_invite_cache:
+            persisted = await self.invite_cache.get(invite)
+            if persisted is not None:
+                persisted = json.loads(persisted)
+                if persisted["expires"] > time.time():
+                    self._cache_invite(invite, persisted["expires"], persisted["guild"])
+                    return persisted["guild"]
+                await self.invite_cache.delete(invite)
+
+        log.trace(f"Resolving invite {invite} from the Discord API.")
+        response = await self.bot.http_session.get(
+            f"{URLs.discord_invite_api}/{invite}", params={"with_counts": "true"}
+        )
+        status = response.status
+        if status not in (200, 404):
+            # Rate limits and server errors say nothing about the invite, so it's treated as invalid
+            # like it was before invites were cached, but it isn't cached, so it's resolved again next time.
+            log.warning(f"Failed to resolve invite {invite}: the Discord API responded with status {status}.")
+            self.bot.stats.incr("filters.invite_cache.errors")
+            response.release()
+            return None
+
+        response = await response.json()
+
+        guild = response.get("guild")
+        # Only unknown invites are cached as invalid, and invites of group DMs, which have no guild.
+        if status == 404 and response.get("code") != UNKNOWN_INVITE:
+            log.warning(f"Failed to resolve invite {invite}: unexpected response {response}.")
+            self.bot.stats.incr("filters.invite_cache.errors")
+            return None
+
+        if guild is None:
+            ttl = Filter.invite_negative_cache_ttl
+        else:
+            ttl = Filter.invite_cache_ttl
+            guild_id = int(guild.get("id"))
+            guild = {
+                "id": guild_id,
+                "name": guild["name"],
+                "icon": f"https://cdn.discordapp.com/icons/{guild_id}/{guild['icon']}.png?size=512",
+                "members": response["approximate_member_count"],
+                "active": response["approximate_presence_count"]
+            }
+
+        expires = time.time() + ttl
+        self._cache_invite(invite, expires, guild)
+        if Filter.persist_invite_cache:
+            await self.invite_cache.set(invite, json.dumps({"expires": expires, "guild": guild}), ttl=ttl)
+
+        return guild
+
+    def _cache_invite(self, invite: str, expires: float, guild: Optional[dict]) -> None:
+        """Cache the `guild` of `invite` in memory, evicting expired invites and then the oldest ones when full."""
+        self.invites.pop(invite, None)
+        self.invites[invite] = (expires, guild)
+
+        if len(self.invites) > INVITE_CACHE_SIZE:
+            now = time.time()
+            for code in [code for code, (expiry, _) in self.invites.items() if expiry <= now]:
+                del self.invites[code]
+
+            while len(self.invites) > INVITE_CACHE_SIZE:
+                del self.invites[next(iter(self.invites))]
+
     @staticmethod
     async def _has_rich_embed(msg: Message) -> bool:
         """Determines if `msg` contains any rich embeds not auto-generated from a URL."""
         if msg.embeds:
             for embed in msg.embeds:
                 if embed.type == "rich":
-                    urls = URL_RE.findall(msg.content)
+                    urls = analyse(msg.content).urls
                     if not embed.url or embed.url not in urls:
                         # If `embed.url` does not exist or if `embed.url` is not part of the content
                         # of the message, it's unlikely to be an auto-generated embed by Discord.
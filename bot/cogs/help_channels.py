@@ -1,12 +1,13 @@
 import asyncio
-import inspect
 import json
 import logging
 import random
+import time
 import typing as t
 from collections import deque
 from contextlib import suppress
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
 
 import discord
@@ -15,7 +16,9 @@ from discord.ext import commands
 
 from bot import constants
 from bot.bot import Bot
+from bot.redis_session import CONNECTION_ERRORS
 from bot.utils.checks import with_role_check
+from bot.utils.redis_cache import RedisCache
 from bot.utils.scheduling import Scheduler
 
 log = logging.getLogger(__name__)
@@ -23,6 +26,8 @@ log = logging.getLogger(__name__)
 ASKING_GUIDE_URL = "https://pythondiscord.com/pages/asking-good-questions/"
 MAX_CHANNELS_PER_CATEGORY = 50
 EXCLUDED_CHANNELS = (constants.Channels.how_to_get_help, constants.Channels.cooldown)
+# Seconds the last message of a channel is persisted for, so the ones of deleted channels don't stay forever.
+LAST_MESSAGE_TTL = 30 * 24 * 60 * 60
 
 HELP_CHANNEL_TOPIC = """
 This is a Python help channel. You can claim your own help channel in the Python Help: Available category.
@@ -60,8 +65,17 @@ CoroutineFunc = t.Callable[..., t.Coroutine]
 class TaskData(t.NamedTuple):
     """Data for a scheduled task."""
 
-    wait_time: int
-    callback: t.Awaitable
+    wait_time: float
+    callback: t.Callable[[], t.Awaitable]
+
+
+class LastMessage(t.NamedTuple):
+    """What the help channel system needs to know about the last message in a help channel."""
+
+    id: int
+    created_at: float  # A POSIX timestamp
+    author_id: int
+    embed: t.Optional[str]  # "available" or "dormant" if the message is the bot's embed for that state
 
 
 class HelpChannels(Scheduler, commands.Cog):
@@ -97,8 +111,18 @@ class HelpChannels(Scheduler, commands.Cog):
     * Channels are used to refill the Available category
 
     Help channels are named after the chemical elements in `bot/resources/elements.json`.
+
+    The last message of every help channel is tracked from message events, so checking whether a
+    channel is idle or empty doesn't need to fetch the channel's history.
+
+    Scheduled tasks are persisted, so the cooldowns of claimants survive restarts.
     """
 
+    persist_tasks = True
+
+    # RedisCache[channel_id: int, last_message: str], where the last message is a JSON `LastMessage`
+    last_message_cache = RedisCache(ttl=LAST_MESSAGE_TTL)
+
     def __init__(self, bot: Bot):
         super().__init__()
 
@@ -119,6 +143,9 @@ class HelpChannels(Scheduler, commands.Cog):
         self.name_positions = self.get_names()
         self.last_notification: t.Optional[datetime] = None
 
+        # Maps a help channel's ID to its last message, or to None if the channel has no messages.
+        self.last_messages: t.Dict[int, t.Optional[LastMessage]] = {}
+
         # Asyncio stuff
         self.queue_tasks: t.List[asyncio.Task] = []
         self.ready = asyncio.Event()
@@ -323,8 +350,7 @@ class HelpChannels(Scheduler, commands.Cog):
         log.trace(f"Got {len(names)} used names: {names}")
         return names
 
-    @classmethod
-    async def get_idle_time(cls, channel: discord.TextChannel) -> t.Optional[int]:
+    async def get_idle_time(self, channel: discord.TextChannel) -> t.Optional[int]:
         """
         Return the time elapsed, in seconds, since the last message sent in the `channel`.
 
@@ -332,27 +358,92 @@ class HelpChannels(Scheduler, commands.Cog):
         """
         log.trace(f"Getting the idle time for #{channel} ({channel.id}).")
 
-        msg = await cls.get_last_message(channel)
+        msg = await self.get_last_message(channel)
         if not msg:
             log.debug(f"No idle time available; #{channel} ({channel.id}) has no messages.")
             return None
 
-        idle_time = (datetime.utcnow() - msg.created_at).seconds
+        idle_time = int(time.time() - msg.created_at)
 
         log.trace(f"#{channel} ({channel.id}) has been idle for {idle_time} seconds.")
         return idle_time
 
-    @staticmethod
-    async def get_last_message(channel: discord.TextChannel) -> t.Optional[discord.Message]:
-        """Return the last message sent in the channel or None if no messages exist."""
-        log.trace(f"Getting the last message in #{channel} ({channel.id}).")
+    async def get_last_message(self, channel: discord.TextChannel) -> t.Optional[LastMessage]:
+        """
+        Return the last message sent in the channel or None if no messages exist.
+
+        The channel's history is only fetched if its last message isn't already known.
+        """
+        if channel.id in self.last_messages:
+            self.bot.stats.incr("help.last_message.hits")
+            return self.last_messages[channel.id]
+
+        self.bot.stats.incr("help.last_message.misses")
+        log.trace(f"Fetching the last message in #{channel} ({channel.id}).")
 
         try:
-            return await channel.history(limit=1).next()  # noqa: B305
+            message = await channel.history(limit=1).next()  # noqa: B305
         except discord.NoMoreItems:
             log.debug(f"No last message available; #{channel} ({channel.id}) has no messages.")
+            self.last_messages[channel.id] = None
             return None
 
+        return await self.record_last_message(message)
+
+    async def record_last_message(self, message: discord.Message) -> LastMessage:
+        """Remember `message` as the last message in its channel, unless a newer one is already known."""
+        last_message = self.last_messages.get(message.channel.id)
+        if last_message is not None and last_message.id > message.id:
+            return last_message
+
+        embed = None
+        if self.match_bot_embed(message, AVAILABLE_MSG):
+            embed = "available"
+        elif self.match_bot_embed(message, DORMANT_MSG):
+            embed = "dormant"
+
+        last_message = LastMessage(
+            id=message.id,
+            created_at=message.created_at.replace(tzinfo=timezone.utc).timestamp(),
+            author_id=message.author.id,
+            embed=embed,
+        )
+        self.last_messages[message.channel.id] = last_message
+        await self.last_message_cache.set(message.channel.id, json.dumps(last_message))
+
+        return last_message
+
+    async def forget_last_message(self, channel_id: int, message_ids: t.Container[int]) -> None:
+        """Forget the last message of the channel if it's one of the deleted `message_ids`."""
+        last_message = self.last_messages.get(channel_id)
+        if last_message is None or last_message.id not in message_ids:
+            return
+
+        # The previous message is unknown; it'll be fetched from the channel's history when needed.
+        del self.last_messages[channel_id]
+        await self.last_message_cache.delete(channel_id)
+
+    async def init_last_messages(self) -> None:
+        """
+        Load the last messages of the help channels persisted in Redis.
+
+        A persisted message is only used if it's still the last message of its channel according to
+        Discord; otherwise messages were sent while the bot was offline and it's fetched when needed.
+        """
+        log.trace("Loading the last messages of the help channels.")
+        persisted = await self.last_message_cache.to_dict()
+
+        for category in (self.available_category, self.in_use_category, self.dormant_category):
+            for channel in self.get_category_channels(category):
+                if channel.id not in persisted:
+                    continue
+
+                last_message = LastMessage(*json.loads(persisted[channel.id]))
+                if last_message.id == channel.last_message_id:
+                    self.last_messages[channel.id] = last_message
+
+        log.trace(f"Loaded the last messages of {len(self.last_messages)} help channels.")
+
     async def init_available(self) -> None:
         """Initialise the Available category with channels."""
         log.trace("Initialising the Available category with channels.")
@@ -386,11 +477,13 @@ class HelpChannels(Scheduler, commands.Cog):
 
         log.trace("Initialising the cog.")
         await self.init_categories()
-        await self.reset_send_permissions()
+        await self.init_cooldowns()
 
         self.channel_queue = self.create_channel_queue()
         self.name_queue = self.create_name_queue()
 
+        await self.init_last_messages()
+
         log.trace("Moving or rescheduling in-use channels.")
         for channel in self.get_category_channels(self.in_use_category):
             await self.move_idle_channel(channel, has_task=False)
@@ -429,7 +522,19 @@ class HelpChannels(Scheduler, commands.Cog):
             return False
 
         embed = message.embeds[0]
-        return message.author == self.bot.user and embed.description.strip() == description.strip()
+        return message.author == self.bot.user and str(embed.description).strip() == description.strip()
+
+    @classmethod
+    def is_help_channel(cls, channel: discord.abc.GuildChannel) -> bool:
+        """Return True if `channel` is a help channel in any of the help categories."""
+        return not cls.is_excluded_channel(channel) and any(
+            cls.is_in_category(channel, category_id)
+            for category_id in (
+                constants.Categories.help_available,
+                constants.Categories.help_in_use,
+                constants.Categories.help_dormant,
+            )
+        )
 
     @staticmethod
     def is_in_category(channel: discord.TextChannel, category_id: int) -> bool:
@@ -465,7 +570,7 @@ class HelpChannels(Scheduler, commands.Cog):
             if has_task:
                 self.cancel_task(channel.id)
 
-            data = TaskData(idle_seconds - time_elapsed, self.move_idle_channel(channel))
+            data = TaskData(idle_seconds - time_elapsed, partial(self.move_idle_channel, channel))
 
             log.info(
                 f"#{channel} ({channel.id}) is still active; "
@@ -561,7 +666,8 @@ class HelpChannels(Scheduler, commands.Cog):
 
         log.trace(f"Sending dormant message for #{channel} ({channel.id}).")
         embed = discord.Embed(description=DORMANT_MSG)
-        await channel.send(embed=embed)
+        message = await channel.send(embed=embed)
+        await self.record_last_message(message)
 
         log.trace(f"Pushing #{channel} ({channel.id}) into the channel queue.")
         self.channel_queue.put_nowait(channel)
@@ -579,7 +685,7 @@ class HelpChannels(Scheduler, commands.Cog):
         timeout = constants.HelpChannels.idle_minutes * 60
 
         log.trace(f"Scheduling #{channel} ({channel.id}) to become dormant in {timeout} sec.")
-        data = TaskData(timeout, self.move_idle_channel(channel))
+        data = TaskData(timeout, partial(self.move_idle_channel, channel))
         self.schedule_task(channel.id, data)
         self.report_stats()
 
@@ -652,6 +758,9 @@ class HelpChannels(Scheduler, commands.Cog):
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message) -> None:
         """Move an available channel to the In Use category and replace it with a dormant one."""
+        if self.is_help_channel(message.channel):
+            await self.record_last_message(message)
+
         if message.author.bot:
             return  # Ignore messages sent by bots.
 
@@ -712,22 +821,64 @@ class HelpChannels(Scheduler, commands.Cog):
         # Cancel existing dormant task before scheduling new.
         self.cancel_task(msg.channel.id)
 
-        task = TaskData(constants.HelpChannels.deleted_idle_minutes * 60, self.move_idle_channel(msg.channel))
+        task = TaskData(constants.HelpChannels.deleted_idle_minutes * 60, partial(self.move_idle_channel, msg.channel))
         self.schedule_task(msg.channel.id, task)
 
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent) -> None:
+        """Forget the last message of a help channel if it was deleted."""
+        await self.forget_last_message(payload.channel_id, {payload.message_id})
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent) -> None:
+        """Forget the last message of a help channel if it was deleted."""
+        await self.forget_last_message(payload.channel_id, payload.message_ids)
+
     async def is_empty(self, channel: discord.TextChannel) -> bool:
         """Return True if the most recent message in `channel` is the bot's `AVAILABLE_MSG`."""
         msg = await self.get_last_message(channel)
-        return self.match_bot_embed(msg, AVAILABLE_MSG)
+        return msg is not None and msg.embed == "available"
 
-    async def reset_send_permissions(self) -> None:
-        """Reset send permissions in the Available category for claimants."""
-        log.trace("Resetting send permissions in the Available category.")
+    async def init_cooldowns(self) -> None:
+        """
+        Reschedule the removal of the cooldown role from claimants using the persisted scheduled tasks.
+
+        The role is removed straight away if a claimant's cooldown ended while the bot was offline, or if
+        the claimant has no persisted task. Persisted tasks of in-use channels are left alone, since
+        those channels are rescheduled from their last messages. If the persisted tasks can't be got,
+        the role is removed from every claimant.
+        """
+        log.trace("Rescheduling the cooldowns of claimants.")
         guild = self.bot.get_guild(constants.Guild.id)
+        in_use = {channel.id for channel in self.get_category_channels(self.in_use_category)}
 
-        # TODO: replace with a persistent cache cause checking every member is quite slow
-        for member in guild.members:
-            if self.is_claimant(member):
+        # Without the persisted tasks, it's unknown whose cooldowns are over, so they're all ended rather
+        # than leaving claimants unable to claim a channel until the next restart.
+        try:
+            persisted = await self.get_persisted_tasks()
+        except CONNECTION_ERRORS:
+            log.exception("Failed to get the persisted cooldowns of claimants; ending all their cooldowns.")
+            persisted = {}
+
+        for task_id, due in persisted.items():
+            if task_id in in_use:
+                continue
+
+            member = guild.get_member(task_id)
+            if member is None or not self.is_claimant(member):
+                self.discard_persisted_task(task_id)
+                continue
+
+            log.trace(f"Rescheduling the cooldown of {member} ({member.id}).")
+            callback = partial(self.remove_cooldown_role, member)
+            self.schedule_task(member.id, TaskData(due - time.time(), callback))
+
+        role = guild.get_role(constants.Roles.help_cooldown)
+        if role is None:
+            return
+
+        for member in role.members:
+            if member.id not in persisted:
                 await self.remove_cooldown_role(member)
 
     async def add_cooldown_role(self, member: discord.Member) -> None:
@@ -782,7 +933,7 @@ class HelpChannels(Scheduler, commands.Cog):
         self.cancel_task(member.id, ignore_missing=True)
 
         timeout = constants.HelpChannels.claim_minutes * 60
-        callback = self.remove_cooldown_role(member)
+        callback = partial(self.remove_cooldown_role, member)
 
         log.trace(f"Scheduling {member}'s ({member.id}) send message permissions to be reinstated.")
         self.schedule_task(member.id, TaskData(timeout, callback))
@@ -795,12 +946,22 @@ class HelpChannels(Scheduler, commands.Cog):
         embed = discord.Embed(description=AVAILABLE_MSG)
 
         msg = await self.get_last_message(channel)
-        if self.match_bot_embed(msg, DORMANT_MSG):
+        if msg is not None and msg.embed == "dormant":
             log.trace(f"Found dormant message {msg.id} in {channel_info}; editing it.")
-            await msg.edit(embed=embed)
+            try:
+                message = await channel.fetch_message(msg.id)
+            except discord.NotFound:
+                log.debug(f"Dormant message {msg.id} in {channel_info} was deleted; sending a new message.")
+            else:
+                await message.edit(embed=embed)
+                self.last_messages[channel.id] = msg._replace(embed="available")
+                await self.last_message_cache.set(channel.id, json.dumps(self.last_messages[channel.id]))
+                return
         else:
             log.trace(f"Dormant message not found in {channel_info}; sending a new message.")
-            await channel.send(embed=embed)
+
+        message = await channel.send(embed=embed)
+        await self.record_last_message(message)
 
     async def try_get_channel(self, channel_id: int) -> discord.abc.GuildChannel:
         """Attempt to get or fetch a channel and return it."""
@@ -827,20 +988,16 @@ class HelpChannels(Scheduler, commands.Cog):
 
         return channel
 
+    def _task_delay(self, data: TaskData) -> float:
+        """Return `data.wait_time`, the number of seconds to wait before awaiting the callback."""
+        return data.wait_time
+
     async def _scheduled_task(self, data: TaskData) -> None:
-        """Await the `data.callback` coroutine after waiting for `data.wait_time` seconds."""
-        try:
-            log.trace(f"Waiting {data.wait_time} seconds before awaiting callback.")
-            await asyncio.sleep(data.wait_time)
-
-            # Use asyncio.shield to prevent callback from cancelling itself.
-            # The parent task (_scheduled_task) will still get cancelled.
-            log.trace("Done waiting; now awaiting the callback.")
-            await asyncio.shield(data.callback)
-        finally:
-            if inspect.iscoroutine(data.callback):
-                log.trace("Explicitly closing coroutine.")
-                data.callback.close()
+        """Await the coroutine returned by `data.callback` once `data.wait_time` seconds have passed."""
+        # Use asyncio.shield to prevent callback from cancelling itself.
+        # The parent task (_scheduled_task) will still get cancelled.
+        log.trace("Done waiting; now awaiting the callback.")
+        await asyncio.shield(data.callback())
 
 
 def validate_config() -> None:
@@ -0,0 +1,103 @@
+import logging
+import typing as t
+
+from . import utils
+
+log = logging.getLogger(__name__)
+
+IndexKey = t.Tuple[int, str]
+
+
+class ActiveInfractionIndex:
+    """
+    An in-memory index of active infractions, keyed by the infracted user's ID and the infraction type.
+
+    The index is loaded from a snapshot of the active infractions on the site and then kept current
+    with `add` and `remove` as infractions are applied and deactivated. Changes made while a new
+    snapshot is being fetched are replayed on top of it when it's loaded, so they aren't lost.
+
+    Until the first snapshot is loaded, the index is not `warm` and can't be used for lookups.
+    """
+
+    def __init__(self, supported_infractions: t.Container[str]):
+        self.supported_infractions = supported_infractions
+        self.warm = False
+
+        self._infractions: t.Dict[IndexKey, t.Dict[int, utils.Infraction]] = {}
+        self._pending_changes: t.Optional[t.List[t.Tuple[utils.Infraction, bool]]] = None
+
+    def __len__(self) -> int:
+        return sum(len(infractions) for infractions in self._infractions.values())
+
+    def _supports(self, infraction: utils.Infraction) -> bool:
+        return infraction["type"] in self.supported_infractions
+
+    def get(self, user_id: int, infr_type: str) -> t.Optional[utils.Infraction]:
+        """Return the most recent active infraction of `infr_type` for the user, or None if there isn't one."""
+        infractions = self._infractions.get((user_id, infr_type))
+        if not infractions:
+            return None
+        return infractions[max(infractions)]
+
+    def add(self, infraction: utils.Infraction) -> None:
+        """Index an active infraction, replacing its previous version if it was already indexed."""
+        if not self._supports(infraction):
+            return
+
+        if self._pending_changes is not None:
+            self._pending_changes.append((infraction, True))
+
+        key = (infraction["user"], infraction["type"])
+        self._infractions.setdefault(key, {})[infraction["id"]] = infraction
+
+    def remove(self, infraction: utils.Infraction) -> None:
+        """Remove an infraction which is no longer active from the index."""
+        if not self._supports(infraction):
+            return
+
+        if self._pending_changes is not None:
+            self._pending_changes.append((infraction, False))
+
+        key = (infraction["user"], infraction["type"])
+        infractions = self._infractions.get(key, {})
+        infractions.pop(infraction["id"], None)
+        if not infractions:
+            self._infractions.pop(key, None)
+
+    def begin_snapshot(self) -> None:
+        """Start recording changes, which will be replayed on top of the snapshot being fetched."""
+        self._pending_changes = []
+
+    def abort_snapshot(self) -> None:
+        """Stop recording changes because fetching the snapshot failed."""
+        self._pending_changes = None
+
+    def load_snapshot(self, infractions: t.Iterable[utils.Infraction]) -> int:
+        """
+        Replace the index with the active `infractions` and replay the changes recorded since `begin_snapshot`.
+
+        Return how many indexed infractions were missing, stale or superfluous compared to the snapshot.
+        """
+        pending_changes = self._pending_changes or []
+        self._pending_changes = None
+
+        old_infractions = self._infractions
+        self._infractions = {}
+        for infraction in infractions:
+            if infraction["active"]:
+                self.add(infraction)
+
+        for infraction, active in pending_changes:
+            if active:
+                self.add(infraction)
+            else:
+                self.remove(infraction)
+
+        drift = 0
+        if self.warm:
+            for key in old_infractions.keys() | self._infractions.keys():
+                old, new = old_infractions.get(key, {}), self._infractions.get(key, {})
+                drift += sum(old.get(id_) != new.get(id_) for id_ in old.keys() | new.keys())
+
+        self.warm = True
+        return drift
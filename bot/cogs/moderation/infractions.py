@@ -35,20 +35,13 @@ class Infractions(InfractionScheduler, commands.Cog):
     @commands.Cog.listener()
     async def on_member_join(self, member: Member) -> None:
         """Reapply active mute infractions for returning members."""
-        active_mutes = await self.bot.api_client.get(
-            "bot/infractions",
-            params={
-                "active": "true",
-                "type": "mute",
-                "user__id": member.id
-            }
-        )
-
-        if active_mutes:
-            reason = f"Re-applying active mute: {active_mutes[0]['id']}"
+        active_mute = await self.get_active_infraction(member.id, "mute")
+
+        if active_mute is not None:
+            reason = f"Re-applying active mute: {active_mute['id']}"
             action = member.add_roles(self._muted_role, reason=reason)
 
-            await self.reapply_infraction(active_mutes[0], action)
+            await self.reapply_infraction(active_mute, action)
 
     # region: Permanent infractions
 
@@ -16,6 +16,7 @@ from bot.utils.checks import in_whitelist_check, with_role_check
 from . import utils
 from .infractions import Infractions
 from .modlog import ModLog
+from .scheduler import InfractionScheduler
 
 log = logging.getLogger(__name__)
 
@@ -38,6 +39,13 @@ class ModManagement(commands.Cog):
         """Get currently loaded Infractions cog instance."""
         return self.bot.get_cog("Infractions")
 
+    def get_infraction_scheduler(self, infr_type: str) -> InfractionScheduler:
+        """Get the loaded cog which schedules infractions of `infr_type`, or the Infractions cog if there's none."""
+        for cog in self.bot.cogs.values():
+            if isinstance(cog, InfractionScheduler) and infr_type in cog.active_infractions.supported_infractions:
+                return cog
+        return self.infractions_cog
+
     # region: Edit infraction commands
 
     @commands.group(name='infraction', aliases=('infr', 'infractions', 'inf'), invoke_without_command=True)
@@ -130,16 +138,19 @@ class ModManagement(commands.Cog):
             f'bot/infractions/{infraction_id}',
             json=request_data,
         )
+        scheduler = self.get_infraction_scheduler(new_infraction['type'])
+        if new_infraction['active']:
+            scheduler.active_infractions.add(new_infraction)
 
         # Re-schedule infraction if the expiration has been updated
         if 'expires_at' in request_data:
-            # A scheduled task should only exist if the old infraction wasn't permanent
+            # A scheduled task should only exist if the old infraction wasn't permanent and expires soon
             if old_infraction['expires_at']:
-                self.infractions_cog.cancel_task(new_infraction['id'])
+                scheduler.cancel_task(new_infraction['id'], ignore_missing=True)
 
             # If the infraction was not marked as permanent, schedule a new expiration task
             if request_data['expires_at']:
-                self.infractions_cog.schedule_task(new_infraction['id'], new_infraction)
+                scheduler.schedule_task(new_infraction['id'], new_infraction)
 
             log_text += f"""
                 Previous expiry: {old_infraction['expires_at'] or "Permanent"}
@@ -14,6 +14,7 @@ from discord.abc import GuildChannel
 from discord.ext.commands import Cog, Context
 from discord.utils import escape_markdown
 
+from bot.api import background_requests
 from bot.bot import Bot
 from bot.constants import Categories, Channels, Colours, Emojis, Event, Guild as GuildConstant, Icons, URLs
 from bot.utils.time import humanize_delta
@@ -54,24 +55,26 @@ class ModLog(Cog, name="ModLog"):
         if attachments is None:
             attachments = []
 
-        response = await self.bot.api_client.post(
-            'bot/deleted-messages',
-            json={
-                'actor': actor_id,
-                'creation': datetime.utcnow().isoformat(),
-                'deletedmessage_set': [
-                    {
-                        'id': message.id,
-                        'author': message.author.id,
-                        'channel_id': message.channel.id,
-                        'content': message.content,
-                        'embeds': [embed.to_dict() for embed in message.embeds],
-                        'attachments': attachment,
-                    }
-                    for message, attachment in zip_longest(messages, attachments, fillvalue=[])
-                ]
-            }
-        )
+        # Logs are uploaded in bursts by antispam and clean, so they wait behind moderation commands.
+        with background_requests():
+            response = await self.bot.api_client.post(
+                'bot/deleted-messages',
+                json={
+                    'actor': actor_id,
+                    'creation': datetime.utcnow().isoformat(),
+                    'deletedmessage_set': [
+                        {
+                            'id': message.id,
+                            'author': message.author.id,
+                            'channel_id': message.channel.id,
+                            'content': message.content,
+                            'embeds': [embed.to_dict() for embed in message.embeds],
+                            'attachments': attachment,
+                        }
+                        for message, attachment in zip_longest(messages, attachments, fillvalue=[])
+                    ]
+                }
+            )
 
         return f"{URLs.site_logs_view}/{response['id']}"
 
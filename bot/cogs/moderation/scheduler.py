@@ -1,4 +1,5 @@
 import asyncio
+import contextlib
 import logging
 import textwrap
 import typing as t
@@ -6,23 +7,141 @@ from abc import abstractmethod
 from datetime import datetime
 from gettext import ngettext
 
+import aiohttp
 import dateutil.parser
 import discord
 from discord.ext.commands import Context
 
 from bot import constants
-from bot.api import ResponseCodeError
+from bot.api import ResponseCodeError, background_requests
 from bot.bot import Bot
 from bot.constants import Colours, STAFF_CHANNELS
 from bot.utils import time
-from bot.utils.scheduling import Scheduler
+from bot.utils.scheduling import SWEEP_INTERVAL, ScheduleWindow, Scheduler
 from . import utils
+from .infraction_index import ActiveInfractionIndex
 from .modlog import ModLog
 from .utils import UserSnowflake
 
 log = logging.getLogger(__name__)
 
 
+class ActiveInfractionLoader:
+    """
+    Loads the active infractions from the site for every `InfractionScheduler` of a bot.
+
+    The active infractions are fetched a page at a time, once for all the schedulers, when the guild
+    becomes available and then every `SWEEP_INTERVAL` seconds, or as soon as a scheduler registers.
+    Each sweep reloads the schedulers' indices of active infractions, which also corrects changes made
+    outside of the bot, and schedules the expiration of the infractions in their next `ScheduleWindow`.
+    """
+
+    # Maps bots to their loaders, so every scheduler of a bot shares the same loader.
+    _loaders: t.Dict[Bot, "ActiveInfractionLoader"] = {}
+
+    def __init__(self, bot: Bot):
+        self.bot = bot
+
+        # Maps the registered schedulers to the window of their last successful sweep.
+        self._windows: t.Dict["InfractionScheduler", t.Optional[ScheduleWindow]] = {}
+        self._registered = asyncio.Event()
+        self._sweep_task: t.Optional[asyncio.Task] = None
+
+    @classmethod
+    def for_bot(cls, bot: Bot) -> "ActiveInfractionLoader":
+        """Return the loader of the `bot`, creating it if it doesn't have one yet."""
+        if bot not in cls._loaders:
+            cls._loaders[bot] = cls(bot)
+        return cls._loaders[bot]
+
+    def register(self, scheduler: "InfractionScheduler") -> None:
+        """Load the active infractions of the `scheduler` in a sweep which starts as soon as possible."""
+        self._windows[scheduler] = None
+        self._registered.set()
+
+        if self._sweep_task is None:
+            self._sweep_task = self.bot.loop.create_task(self.sweep_periodically())
+
+    def unregister(self, scheduler: "InfractionScheduler") -> None:
+        """Stop loading the active infractions of the `scheduler`, and stop sweeping if it was the last one."""
+        self._windows.pop(scheduler, None)
+
+        if not self._windows and self._sweep_task is not None:
+            self._sweep_task.cancel()
+            self._sweep_task = None
+            self._loaders.pop(self.bot, None)
+
+    async def sweep_periodically(self) -> None:
+        """Sweep the active infractions every `SWEEP_INTERVAL` seconds, and whenever a scheduler registers."""
+        await self.bot.wait_until_guild_available()
+
+        while True:
+            self._registered.clear()
+            try:
+                with background_requests():
+                    await self.sweep()
+            except Exception:
+                # Keep sweeping, or infractions expiring after the current window would never be scheduled.
+                log.exception("Unexpected error while sweeping the active infractions.")
+
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._registered.wait(), SWEEP_INTERVAL)
+
+    async def sweep(self) -> None:
+        """
+        Reload the active infractions of every registered scheduler, and schedule the ones which are due soon.
+
+        Only the supported active infractions of the schedulers and the infractions due in their windows
+        are kept while the pages are fetched. If fetching fails, nothing is scheduled or reloaded, and
+        the windows aren't moved, so the next sweep covers this one's.
+        """
+        schedulers = list(self._windows)
+        windows = {scheduler: ScheduleWindow.after(self._windows[scheduler]) for scheduler in schedulers}
+        snapshots = {scheduler: [] for scheduler in schedulers}
+        due = {scheduler: [] for scheduler in schedulers}
+
+        log.trace(f"Loading the active infractions for {len(schedulers)} infraction schedulers.")
+        for scheduler in schedulers:
+            scheduler.active_infractions.begin_snapshot()
+
+        try:
+            async for page in self.bot.api_client.get_pages("bot/infractions", params={"active": "true"}):
+                for infraction in page:
+                    for scheduler in schedulers:
+                        if infraction["type"] not in scheduler.active_infractions.supported_infractions:
+                            continue
+
+                        snapshots[scheduler].append(infraction)
+                        if infraction["expires_at"] is not None:
+                            expiry = dateutil.parser.isoparse(infraction["expires_at"]).replace(tzinfo=None)
+                            if windows[scheduler].includes(expiry):
+                                due[scheduler].append(infraction)
+        except (ResponseCodeError, aiohttp.ClientError, asyncio.TimeoutError):
+            log.exception("Failed to load the active infractions.")
+        else:
+            for scheduler in schedulers:
+                if scheduler not in self._windows:
+                    # The scheduler was unregistered while the infractions were being fetched.
+                    continue
+
+                drift = scheduler.active_infractions.load_snapshot(snapshots[scheduler])
+                stat_prefix = f"infractions.index.{scheduler.cog_name}"
+                if drift:
+                    log.info(f"Corrected {drift} out of date entries in the active infractions index.")
+                    self.bot.stats.incr(f"{stat_prefix}.drift", drift)
+                self.bot.stats.gauge(f"{stat_prefix}.size", len(scheduler.active_infractions))
+
+                for infraction in due[scheduler]:
+                    scheduler.schedule_task(infraction["id"], infraction)
+                self._windows[scheduler] = windows[scheduler]
+
+                log.trace(f"Scheduled {len(due[scheduler])} infractions for {scheduler.cog_name}.")
+        finally:
+            # Stop recording the changes of the indices whose snapshot wasn't loaded, whatever the reason.
+            for scheduler in schedulers:
+                scheduler.active_infractions.abort_snapshot()
+
+
 class InfractionScheduler(Scheduler):
     """Handles the application, pardoning, and expiration of infractions."""
 
@@ -30,26 +149,41 @@ class InfractionScheduler(Scheduler):
         super().__init__()
 
         self.bot = bot
-        self.bot.loop.create_task(self.reschedule_infractions(supported_infractions))
+        self.active_infractions = ActiveInfractionIndex(supported_infractions)
+
+        self.infraction_loader = ActiveInfractionLoader.for_bot(bot)
+        self.infraction_loader.register(self)
+
+    def cog_unload(self) -> None:
+        """Stop loading the active infractions when the cog is unloaded."""
+        self.infraction_loader.unregister(self)
 
     @property
     def mod_log(self) -> ModLog:
         """Get the currently loaded ModLog cog instance."""
         return self.bot.get_cog("ModLog")
 
-    async def reschedule_infractions(self, supported_infractions: t.Container[str]) -> None:
-        """Schedule expiration for previous infractions."""
-        await self.bot.wait_until_guild_available()
+    async def get_active_infraction(self, user_id: int, infr_type: str) -> t.Optional[utils.Infraction]:
+        """
+        Return the user's active infraction of `infr_type`, or None if they don't have one.
 
-        log.trace(f"Rescheduling infractions for {self.__class__.__name__}.")
+        The infraction is looked up in the index of active infractions once it's been loaded,
+        and fetched from the site before then.
+        """
+        if self.active_infractions.warm:
+            self.bot.stats.incr(f"infractions.index.{infr_type}.hits")
+            return self.active_infractions.get(user_id, infr_type)
 
-        infractions = await self.bot.api_client.get(
-            'bot/infractions',
-            params={'active': 'true'}
+        self.bot.stats.incr(f"infractions.index.{infr_type}.misses")
+        active_infractions = await self.bot.api_client.get(
+            "bot/infractions",
+            params={
+                "active": "true",
+                "type": infr_type,
+                "user__id": str(user_id)
+            }
         )
-        for infraction in infractions:
-            if infraction["expires_at"] is not None and infraction["type"] in supported_infractions:
-                self.schedule_task(infraction["id"], infraction)
+        return active_infractions[0] if active_infractions else None
 
     async def reapply_infraction(
         self,
@@ -182,6 +316,8 @@ class InfractionScheduler(Scheduler):
             infr_message = ""
         else:
             infr_message = f" **{infr_type}** to {user.mention}{expiry_msg}{end_msg}"
+            if infraction["active"]:
+                self.active_infractions.add(infraction)
 
         # Send a confirmation message to the invoking context.
         log.trace(f"Sending infraction #{id_} confirmation message.")
@@ -272,14 +408,15 @@ class InfractionScheduler(Scheduler):
                         f"bot/infractions/{id_}",
                         json={"active": False}
                     )
+                    self.active_infractions.remove(infraction)
                 except ResponseCodeError:
                     log.exception(f"Failed to deactivate infraction #{id_} ({infr_type})")
                     # This is simpler and cleaner than trying to concatenate all the errors.
                     log_text["Failure"] = "See bot's logs for details."
 
-                # Cancel pending expiration task.
+                # Cancel pending expiration task. It's only scheduled if it expires within the schedule window.
                 if infraction["expires_at"] is not None:
-                    self.cancel_task(infraction["id"])
+                    self.cancel_task(infraction["id"], ignore_missing=True)
 
         # Accordingly display whether the user was successfully notified via DM.
         dm_emoji = ""
@@ -403,6 +540,7 @@ class InfractionScheduler(Scheduler):
                 f"bot/infractions/{id_}",
                 json={"active": False}
             )
+            self.active_infractions.remove(infraction)
         except ResponseCodeError as e:
             log.exception(f"Failed to deactivate infraction #{id_} ({type_})")
             log_line = f"API request failed with code {e.status}."
@@ -414,9 +552,9 @@ class InfractionScheduler(Scheduler):
             else:
                 log_text["Failure"] = log_line
 
-        # Cancel the expiration task.
+        # Cancel the expiration task, if it expires within the schedule window.
         if infraction["expires_at"] is not None:
-            self.cancel_task(infraction["id"])
+            self.cancel_task(infraction["id"], ignore_missing=True)
 
         # Send a log message to the mod log.
         if send_log:
@@ -450,16 +588,18 @@ class InfractionScheduler(Scheduler):
         """
         raise NotImplementedError
 
+    def _task_delay(self, infraction: utils.Infraction) -> float:
+        """Return the number of seconds until the infraction expires."""
+        expiry = dateutil.parser.isoparse(infraction["expires_at"]).replace(tzinfo=None)
+        return (expiry - datetime.utcnow()).total_seconds()
+
     async def _scheduled_task(self, infraction: utils.Infraction) -> None:
         """
-        Marks an infraction expired after the delay from time of scheduling to time of expiration.
+        Marks an infraction expired once the time of expiration is reached.
 
         At the time of expiration, the infraction is marked as inactive on the website and the
         expiration task is cancelled.
         """
-        expiry = dateutil.parser.isoparse(infraction["expires_at"]).replace(tzinfo=None)
-        await time.wait_until(expiry)
-
         # Because deactivate_infraction() explicitly cancels this scheduled task, it is shielded
         # to avoid prematurely cancelling itself.
         await asyncio.shield(self.deactivate_infraction(infraction))
@@ -1,7 +1,8 @@
 import asyncio
 import logging
+import time
 from contextlib import suppress
-from typing import Optional
+from typing import NamedTuple, Optional
 
 from discord import TextChannel
 from discord.ext import commands, tasks
@@ -10,11 +11,20 @@ from discord.ext.commands import Context
 from bot.bot import Bot
 from bot.constants import Channels, Emojis, Guild, MODERATION_ROLES, Roles
 from bot.converters import HushDurationConverter
+from bot.redis_session import CONNECTION_ERRORS
 from bot.utils.checks import with_role_check
+from bot.utils.scheduling import Scheduler
 
 log = logging.getLogger(__name__)
 
 
+class UnsilenceTask(NamedTuple):
+    """Data for the scheduled unsilencing of a channel."""
+
+    channel: TextChannel
+    delay: float
+
+
 class SilenceNotifier(tasks.Loop):
     """Loop notifier for posting notices to `alert_channel` containing added channels."""
 
@@ -53,10 +63,18 @@ class SilenceNotifier(tasks.Loop):
             await self._alert_channel.send(f"<@&{Roles.moderators}> currently silenced channels: {channels_text}")
 
 
-class Silence(commands.Cog):
-    """Commands for stopping channel messages for `verified` role in a channel."""
+class Silence(Scheduler, commands.Cog):
+    """
+    Commands for stopping channel messages for `verified` role in a channel.
+
+    Unsilencing channels is scheduled with persisted tasks, so it still happens after a restart.
+    """
+
+    persist_tasks = True
 
     def __init__(self, bot: Bot):
+        super().__init__()
+
         self.bot = bot
         self.muted_channels = set()
         self._get_instance_vars_task = self.bot.loop.create_task(self._get_instance_vars())
@@ -70,7 +88,26 @@ class Silence(commands.Cog):
         self._mod_alerts_channel = self.bot.get_channel(Channels.mod_alerts)
         self._mod_log_channel = self.bot.get_channel(Channels.mod_log)
         self.notifier = SilenceNotifier(self._mod_log_channel)
-        self._get_instance_vars_event.set()
+
+        # The commands wait for the event, so it's set even if the silenced channels can't be read from Redis.
+        try:
+            await self._reschedule_unsilences()
+        except CONNECTION_ERRORS:
+            log.exception("Failed to reschedule unsilencing the channels silenced before a restart.")
+        finally:
+            self._get_instance_vars_event.set()
+
+    async def _reschedule_unsilences(self) -> None:
+        """Reschedule unsilencing the channels silenced before a restart, from the persisted tasks."""
+        for channel_id, due in (await self.get_persisted_tasks()).items():
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                self.discard_persisted_task(channel_id)
+                continue
+
+            log.info(f"Rescheduling unsilencing #{channel} ({channel.id}).")
+            self.muted_channels.add(channel)
+            self.schedule_task(channel.id, UnsilenceTask(channel, due - time.time()))
 
     @commands.command(aliases=("hush",))
     async def silence(self, ctx: Context, duration: HushDurationConverter = 10) -> None:
@@ -90,9 +127,7 @@ class Silence(commands.Cog):
             return
 
         await ctx.send(f"{Emojis.check_mark} silenced current channel for {duration} minute(s).")
-        await asyncio.sleep(duration*60)
-        log.info("Unsilencing channel after set delay.")
-        await ctx.invoke(self.unsilence)
+        self.schedule_task(ctx.channel.id, UnsilenceTask(ctx.channel, duration*60))
 
     @commands.command(aliases=("unhush",))
     async def unsilence(self, ctx: Context) -> None:
@@ -103,6 +138,7 @@ class Silence(commands.Cog):
         """
         await self._get_instance_vars_event.wait()
         log.debug(f"Unsilencing channel #{ctx.channel} from {ctx.author}'s command.")
+        self.cancel_task(ctx.channel.id, ignore_missing=True)
         if await self._unsilence(ctx.channel):
             await ctx.send(f"{Emojis.check_mark} unsilenced current channel.")
 
@@ -146,8 +182,19 @@ class Silence(commands.Cog):
         log.info(f"Tried to unsilence channel #{channel} ({channel.id}) but the channel was not silenced.")
         return False
 
+    def _task_delay(self, task: UnsilenceTask) -> float:
+        """Return the number of seconds to wait before unsilencing the channel."""
+        return task.delay
+
+    async def _scheduled_task(self, task: UnsilenceTask) -> None:
+        """Unsilence the channel once its silence ends."""
+        log.info("Unsilencing channel after set delay.")
+        if await self._unsilence(task.channel):
+            await task.channel.send(f"{Emojis.check_mark} unsilenced current channel.")
+
     def cog_unload(self) -> None:
-        """Send alert with silenced channels on unload."""
+        """Send alert with silenced channels on unload, and stop the scheduled unsilencing until the cog is reloaded."""
+        self.cancel_all()
         if self.muted_channels:
             channels_string = ''.join(channel.mention for channel in self.muted_channels)
             message = f"<@&{Roles.moderators}> channels left silenced on cog unload: {channels_string}"
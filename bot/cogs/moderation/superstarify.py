@@ -40,20 +40,11 @@ class Superstarify(InfractionScheduler, Cog):
             f"{after.display_name}. Checking if the user is in superstar-prison..."
         )
 
-        active_superstarifies = await self.bot.api_client.get(
-            "bot/infractions",
-            params={
-                "active": "true",
-                "type": "superstar",
-                "user__id": str(before.id)
-            }
-        )
-
-        if not active_superstarifies:
+        infraction = await self.get_active_infraction(before.id, "superstar")
+        if infraction is None:
             log.trace(f"{before} has no active superstar infractions.")
             return
 
-        infraction = active_superstarifies[0]
         forced_nick = self.get_nick(infraction["id"], before.id)
         if after.display_name == forced_nick:
             return  # Nick change was triggered by this event. Ignore.
@@ -85,17 +76,9 @@ class Superstarify(InfractionScheduler, Cog):
     @Cog.listener()
     async def on_member_join(self, member: Member) -> None:
         """Reapply active superstar infractions for returning members."""
-        active_superstarifies = await self.bot.api_client.get(
-            "bot/infractions",
-            params={
-                "active": "true",
-                "type": "superstar",
-                "user__id": member.id
-            }
-        )
+        infraction = await self.get_active_infraction(member.id, "superstar")
 
-        if active_superstarifies:
-            infraction = active_superstarifies[0]
+        if infraction is not None:
             action = member.edit(
                 nick=self.get_nick(infraction["id"], member.id),
                 reason=f"Superstarified member tried to escape the prison: {infraction['id']}"
@@ -145,6 +128,7 @@ class Superstarify(InfractionScheduler, Cog):
         # Apply the infraction and schedule the expiration task.
         log.debug(f"Changing nickname of {member} to {forced_nick}.")
         self.mod_log.ignore(constants.Event.member_update, member.id)
+        self.active_infractions.add(infraction)
         await member.edit(nick=forced_nick, reason=reason)
         self.schedule_task(id_, infraction)
 
@@ -4,7 +4,7 @@ import random
 import textwrap
 from collections import namedtuple
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional
 
 from aiohttp import BasicAuth, ClientError
 from discord import Colour, Embed, TextChannel
@@ -16,6 +16,7 @@ from bot.constants import Channels, ERROR_REPLIES, Emojis, Reddit as RedditConfi
 from bot.converters import Subreddit
 from bot.decorators import with_role
 from bot.pagination import LinePaginator
+from bot.utils.cache import async_cache
 
 log = logging.getLogger(__name__)
 
@@ -118,8 +119,13 @@ class Reddit(Cog):
         else:
             log.warning(f"Unable to revoke access token: status {response.status}.")
 
-    async def fetch_posts(self, route: str, *, amount: int = 25, params: dict = None) -> List[dict]:
-        """A helper method to fetch a certain amount of Reddit posts at a given route."""
+    @async_cache(ttl=5 * 60)
+    async def fetch_posts(self, route: str, *, amount: int = 25, params: dict = None) -> Optional[List[dict]]:
+        """
+        A helper method to fetch a certain amount of Reddit posts at a given route.
+
+        The posts are cached for 5 minutes. None is returned if the posts couldn't be fetched.
+        """
         # Reddit's JSON responses only provide 25 posts at most.
         if not 25 >= amount > 0:
             raise ValueError("Invalid amount of subreddit posts requested.")
@@ -144,7 +150,7 @@ class Reddit(Cog):
             await asyncio.sleep(3)
 
         log.debug(f"Invalid response from: {url} - status code {response.status}, mimetype {response.content_type}")
-        return list()  # Failed to get appropriate response within allowed number of retries.
+        return None  # Failed to get appropriate response within allowed number of retries.
 
     async def get_top_posts(self, subreddit: Subreddit, time: str = "all", amount: int = 5) -> Embed:
         """
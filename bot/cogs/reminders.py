@@ -6,18 +6,20 @@ import typing as t
 from datetime import datetime, timedelta
 from operator import itemgetter
 
+import aiohttp
 import discord
 from dateutil.parser import isoparse
 from dateutil.relativedelta import relativedelta
 from discord.ext.commands import Cog, Context, group
 
+from bot.api import ResponseCodeError, background_requests
 from bot.bot import Bot
 from bot.constants import Guild, Icons, NEGATIVE_REPLIES, POSITIVE_REPLIES, STAFF_ROLES
 from bot.converters import Duration
 from bot.pagination import LinePaginator
 from bot.utils.checks import without_role_check
-from bot.utils.scheduling import Scheduler
-from bot.utils.time import humanize_delta, wait_until
+from bot.utils.scheduling import SWEEP_INTERVAL, ScheduleWindow, Scheduler
+from bot.utils.time import humanize_delta
 
 log = logging.getLogger(__name__)
 
@@ -32,25 +34,55 @@ class Reminders(Scheduler, Cog):
         self.bot = bot
         super().__init__()
 
-        self.bot.loop.create_task(self.reschedule_reminders())
+        # The window of the last successful sweep of the reminders.
+        self.schedule_window: t.Optional[ScheduleWindow] = None
+        self._sweep_task = self.bot.loop.create_task(self.sweep_reminders_periodically())
 
-    async def reschedule_reminders(self) -> None:
-        """Get all current reminders from the API and reschedule them."""
+    def cog_unload(self) -> None:
+        """Stop sweeping the reminders when the cog is unloaded."""
+        self._sweep_task.cancel()
+
+    async def sweep_reminders_periodically(self) -> None:
+        """Sweep the reminders once the guild is available, and then every `SWEEP_INTERVAL` seconds."""
         await self.bot.wait_until_guild_available()
-        response = await self.bot.api_client.get(
-            'bot/reminders',
-            params={'active': 'true'}
-        )
 
+        while True:
+            try:
+                with background_requests():
+                    await self.sweep_reminders()
+            except Exception:
+                # Keep sweeping, or reminders due after the current window would never be scheduled.
+                log.exception("Unexpected error while sweeping the reminders.")
+            await asyncio.sleep(SWEEP_INTERVAL)
+
+    async def sweep_reminders(self) -> None:
+        """
+        Get the active reminders from the API a page at a time, and schedule the ones due in the next window.
+
+        Reminders which are already overdue are sent straight away.
+        """
+        window = ScheduleWindow.after(self.schedule_window)
+        due = []
+
+        try:
+            async for page in self.bot.api_client.get_pages('bot/reminders', params={'active': 'true'}):
+                for reminder in page:
+                    remind_at = isoparse(reminder['expiration']).replace(tzinfo=None)
+                    if window.includes(remind_at):
+                        due.append((remind_at, reminder))
+        except (ResponseCodeError, aiohttp.ClientError, asyncio.TimeoutError):
+            log.exception("Failed to sweep the reminders.")
+            return
+
+        self.schedule_window = window
+        log.trace(f"Scheduling {len(due)} reminders due by {window.end}.")
         now = datetime.utcnow()
 
-        for reminder in response:
+        for remind_at, reminder in due:
             is_valid, *_ = self.ensure_valid_reminder(reminder, cancel_task=False)
             if not is_valid:
                 continue
 
-            remind_at = isoparse(reminder['expiration']).replace(tzinfo=None)
-
             # If the reminder is already overdue ...
             if remind_at < now:
                 late = relativedelta(now, remind_at)
@@ -99,13 +131,16 @@ class Reminders(Scheduler, Cog):
 
         await ctx.send(embed=embed)
 
+    def _task_delay(self, reminder: dict) -> float:
+        """Return the number of seconds until the reminder expires."""
+        reminder_datetime = isoparse(reminder['expiration']).replace(tzinfo=None)
+        return (reminder_datetime - datetime.utcnow()).total_seconds()
+
     async def _scheduled_task(self, reminder: dict) -> None:
         """A coroutine which sends the reminder once the time is reached, and cancels the running task."""
         reminder_id = reminder["id"]
-        reminder_datetime = isoparse(reminder['expiration']).replace(tzinfo=None)
 
-        # Send the reminder message once the desired duration has passed
-        await wait_until(reminder_datetime)
+        # The desired duration has passed, so send the reminder message
         await self.send_reminder(reminder)
 
         log.debug(f"Deleting reminder {reminder_id} (the user has been reminded).")
@@ -116,13 +151,13 @@ class Reminders(Scheduler, Cog):
         await self.bot.api_client.delete('bot/reminders/' + str(reminder_id))
 
         if cancel_task:
-            # Now we can remove it from the schedule list
-            self.cancel_task(reminder_id)
+            # Now we can remove it from the schedule list, if it's due within the schedule window
+            self.cancel_task(reminder_id, ignore_missing=True)
 
     async def _reschedule_reminder(self, reminder: dict) -> None:
         """Reschedule a reminder object."""
         log.trace(f"Cancelling old task #{reminder['id']}")
-        self.cancel_task(reminder["id"])
+        self.cancel_task(reminder["id"], ignore_missing=True)
 
         log.trace(f"Scheduling new task #{reminder['id']}")
         self.schedule_task(reminder["id"], reminder)
@@ -6,7 +6,7 @@ from discord.ext import commands
 from discord.ext.commands import Cog, Context
 
 from bot import constants
-from bot.api import ResponseCodeError
+from bot.api import ResponseCodeError, background_requests
 from bot.bot import Bot
 from bot.cogs.sync import syncers
 
@@ -31,8 +31,9 @@ class Sync(Cog):
         if guild is None:
             return
 
-        for syncer in (self.role_syncer, self.user_syncer):
-            await syncer.sync(guild)
+        with background_requests():
+            for syncer in (self.role_syncer, self.user_syncer):
+                await syncer.sync(guild)
 
     async def patch_user(self, user_id: int, updated_information: Dict[str, Any]) -> None:
         """Send a PATCH request to partially update a user in the database."""
@@ -20,6 +20,39 @@ _Role = namedtuple('Role', ('id', 'name', 'colour', 'permissions', 'position'))
 _User = namedtuple('User', ('id', 'name', 'discriminator', 'roles', 'in_guild'))
 _Diff = namedtuple('Diff', ('created', 'updated', 'deleted'))
 
+# A request to the site API; `size` is the number of objects it synchronises.
+_Request = namedtuple('Request', ('method', 'endpoint', 'json', 'size'))
+
+# Seconds between edits of the confirmation message with the progress of a sync.
+PROGRESS_INTERVAL = 5
+
+# The number of users compared between yields to the event loop while diffing users.
+DIFF_CHUNK_SIZE = 1000
+
+
+class _GuildUser:
+    """A compact record of a guild member's synchronised attributes, used while diffing users."""
+
+    __slots__ = ('name', 'discriminator', 'roles')
+
+    def __init__(self, name: str, discriminator: int, roles: t.Tuple[int, ...]):
+        self.name = name
+        self.discriminator = discriminator
+        self.roles = roles
+
+    def matches(self, db_user: t.Dict[str, t.Any]) -> bool:
+        """Return True if the `db_user` from the site API is in the guild and identical to this member."""
+        return (
+            db_user['in_guild']
+            and db_user['name'] == self.name
+            and db_user['discriminator'] == self.discriminator
+            and tuple(sorted(db_user['roles'])) == self.roles
+        )
+
+    def to_user(self, user_id: int) -> _User:
+        """Return the `_User` the member with `user_id` is synchronised as."""
+        return _User(user_id, self.name, self.discriminator, self.roles, True)
+
 
 class Syncer(abc.ABC):
     """Base class for synchronising the database with objects in the Discord cache."""
@@ -29,6 +62,7 @@ class Syncer(abc.ABC):
 
     def __init__(self, bot: Bot) -> None:
         self.bot = bot
+        self._synced = 0
 
     @property
     @abc.abstractmethod
@@ -148,6 +182,58 @@ class Syncer(abc.ABC):
         """Perform the API calls for synchronisation."""
         raise NotImplementedError  # pragma: no cover
 
+    @staticmethod
+    def _chunk(items: t.Iterable, size: int) -> t.Iterator[t.List]:
+        """Yield lists of at most `size` of the `items`."""
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) == size:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+
+    async def _send_request(self, request: _Request) -> None:
+        """
+        Send the `request` to the site API.
+
+        The API client retries requests which failed in ways retrying can fix and which are safe to
+        send again, so any error it raises aborts the sync.
+        """
+        send = getattr(self.bot.api_client, request.method)
+        kwargs = {} if request.json is None else {"json": request.json}
+        await send(request.endpoint, **kwargs)
+
+        self._synced += request.size
+
+    async def _send_requests(self, requests: t.Iterable[_Request]) -> None:
+        """
+        Send the `requests` to the site API, at most `bot.constants.Sync.max_concurrency` at a time.
+
+        If a request fails, the pending requests are cancelled and the error is raised.
+        """
+        semaphore = asyncio.Semaphore(constants.Sync.max_concurrency)
+
+        async def send(request: _Request) -> None:
+            async with semaphore:
+                await self._send_request(request)
+
+        tasks = [asyncio.create_task(send(request)) for request in requests]
+        try:
+            await asyncio.gather(*tasks)
+        except Exception:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def _report_progress(self, message: Message, total: int, mention: str) -> None:
+        """Periodically edit `message` to show how many of the `total` changes have been synchronised."""
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            await message.edit(content=f"📊 {mention}Synchronising {self.name}s: `{self._synced}/{total}`.")
+
     async def _get_confirmation_result(
         self,
         diff_size: int,
@@ -205,6 +291,11 @@ class Syncer(abc.ABC):
         # where notifications came from.
         mention = self._CORE_DEV_MENTION if author.bot else ""
 
+        self._synced = 0
+        progress = None
+        if message:
+            progress = asyncio.create_task(self._report_progress(message, diff_size, mention))
+
         try:
             await self._sync(diff)
         except ResponseCodeError as e:
@@ -217,6 +308,9 @@ class Syncer(abc.ABC):
             results = ", ".join(f"{name} `{total}`" for name, total in totals.items())
             log.info(f"{self.name} syncer finished: {results}.")
             content = f":ok_hand: {mention}Synchronisation of {self.name}s complete: {results}"
+        finally:
+            if progress:
+                progress.cancel()
 
         if message:
             await message.edit(content=content)
@@ -261,17 +355,13 @@ class RoleSyncer(Syncer):
 
     async def _sync(self, diff: _Diff) -> None:
         """Synchronise the database with the role cache of `guild`."""
-        log.trace("Syncing created roles...")
-        for role in diff.created:
-            await self.bot.api_client.post('bot/roles', json=role._asdict())
-
-        log.trace("Syncing updated roles...")
-        for role in diff.updated:
-            await self.bot.api_client.put(f'bot/roles/{role.id}', json=role._asdict())
+        # The site has no bulk endpoints for roles, but there are few enough that it doesn't matter.
+        log.trace("Syncing created, updated and deleted roles...")
+        requests = [_Request('post', 'bot/roles', role._asdict(), 1) for role in diff.created]
+        requests += [_Request('put', f'bot/roles/{role.id}', role._asdict(), 1) for role in diff.updated]
+        requests += [_Request('delete', f'bot/roles/{role.id}', None, 1) for role in diff.deleted]
 
-        log.trace("Syncing deleted roles...")
-        for role in diff.deleted:
-            await self.bot.api_client.delete(f'bot/roles/{role.id}')
+        await self._send_requests(requests)
 
 
 class UserSyncer(Syncer):
@@ -279,64 +369,88 @@ class UserSyncer(Syncer):
 
     name = "user"
 
+    @staticmethod
+    async def _get_guild_snapshot(guild: Guild) -> t.Dict[int, _GuildUser]:
+        """Return a compact snapshot of the members of `guild`, indexed by their IDs."""
+        snapshot = {}
+        for index, member in enumerate(guild.members, start=1):
+            snapshot[member.id] = _GuildUser(
+                member.name,
+                int(member.discriminator),
+                tuple(sorted(role.id for role in member.roles))
+            )
+            if index % DIFF_CHUNK_SIZE == 0:
+                await asyncio.sleep(0)
+
+        return snapshot
+
     async def _get_diff(self, guild: Guild) -> _Diff:
-        """Return the difference of users between the cache of `guild` and the database."""
-        log.trace("Getting the diff for users.")
-        users = await self.bot.api_client.get('bot/users')
+        """
+        Return the difference of users between the cache of `guild` and the database.
 
-        # Pack DB roles and guild roles into one common, hashable format.
-        # They're hashable so that they're easily comparable with sets later.
-        db_users = {
-            user_dict['id']: _User(
-                roles=tuple(sorted(user_dict.pop('roles'))),
-                **user_dict
-            )
-            for user_dict in users
-        }
-        guild_users = {
-            member.id: _User(
-                id=member.id,
-                name=member.name,
-                discriminator=int(member.discriminator),
-                roles=tuple(sorted(role.id for role in member.roles)),
-                in_guild=True
-            )
-            for member in guild.members
-        }
+        Users are fetched from the database one page at a time and compared to a snapshot of the
+        guild's members, yielding to the event loop regularly so large guilds don't block it.
+        Only users which changed are turned into `_User` objects.
+        """
+        log.trace("Getting the diff for users.")
+        guild_users = await self._get_guild_snapshot(guild)
 
         users_to_create = set()
         users_to_update = set()
 
-        for db_user in db_users.values():
-            guild_user = guild_users.get(db_user.id)
-            if guild_user is not None:
-                if db_user != guild_user:
-                    users_to_update.add(guild_user)
-
-            elif db_user.in_guild:
-                # The user is known in the DB but not the guild, and the
-                # DB currently specifies that the user is a member of the guild.
-                # This means that the user has left since the last sync.
-                # Update the `in_guild` attribute of the user on the site
-                # to signify that the user left.
-                new_api_user = db_user._replace(in_guild=False)
-                users_to_update.add(new_api_user)
-
-        new_user_ids = set(guild_users.keys()) - set(db_users.keys())
-        for user_id in new_user_ids:
-            # The user is known on the guild but not on the API. This means
-            # that the user has joined since the last sync. Create it.
-            new_user = guild_users[user_id]
-            users_to_create.add(new_user)
+        response = await self.bot.api_client.get('bot/users', params={'page': 1})
+        while response is not None:
+            # Fetch the next page while the current one is being compared.
+            next_response = None
+            if response['next_page_no'] is not None:
+                next_response = asyncio.create_task(
+                    self.bot.api_client.get('bot/users', params={'page': response['next_page_no']})
+                )
+
+            for index, db_user in enumerate(response['results'], start=1):
+                guild_user = guild_users.pop(db_user['id'], None)
+                if guild_user is not None:
+                    if not guild_user.matches(db_user):
+                        users_to_update.add(guild_user.to_user(db_user['id']))
+
+                elif db_user['in_guild']:
+                    # The user is known in the DB but not the guild, and the
+                    # DB currently specifies that the user is a member of the guild.
+                    # This means that the user has left since the last sync.
+                    # Update the `in_guild` attribute of the user on the site
+                    # to signify that the user left.
+                    users_to_update.add(_User(
+                        id=db_user['id'],
+                        name=db_user['name'],
+                        discriminator=db_user['discriminator'],
+                        roles=tuple(sorted(db_user['roles'])),
+                        in_guild=False
+                    ))
+
+                if index % DIFF_CHUNK_SIZE == 0:
+                    await asyncio.sleep(0)
+
+            response = await next_response if next_response else None
+
+        # The users left in the snapshot are known on the guild but not on the API.
+        # This means that they have joined since the last sync. Create them.
+        for user_id, guild_user in guild_users.items():
+            users_to_create.add(guild_user.to_user(user_id))
 
         return _Diff(users_to_create, users_to_update, None)
 
     async def _sync(self, diff: _Diff) -> None:
-        """Synchronise the database with the user cache of `guild`."""
-        log.trace("Syncing created users...")
-        for user in diff.created:
-            await self.bot.api_client.post('bot/users', json=user._asdict())
-
-        log.trace("Syncing updated users...")
-        for user in diff.updated:
-            await self.bot.api_client.put(f'bot/users/{user.id}', json=user._asdict())
+        """Synchronise the database with the user cache of `guild`, using the bulk user endpoints."""
+        log.trace("Syncing created and updated users...")
+        chunk_size = constants.Sync.chunk_size
+
+        requests = [
+            _Request('post', 'bot/users', [user._asdict() for user in chunk], len(chunk))
+            for chunk in self._chunk(diff.created, chunk_size)
+        ]
+        requests += [
+            _Request('patch', 'bot/users/bulk_patch', [user._asdict() for user in chunk], len(chunk))
+            for chunk in self._chunk(diff.updated, chunk_size)
+        ]
+
+        await self._send_requests(requests)
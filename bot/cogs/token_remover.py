@@ -1,7 +1,6 @@
 import base64
 import binascii
 import logging
-import re
 import struct
 import typing as t
 from datetime import datetime
@@ -13,6 +12,7 @@ from discord.utils import snowflake_time
 from bot.bot import Bot
 from bot.cogs.moderation import ModLog
 from bot.constants import Channels, Colours, Event, Icons
+from bot.utils.message_analysis import analyse
 
 log = logging.getLogger(__name__)
 
@@ -27,13 +27,6 @@ DELETION_MESSAGE_TEMPLATE = (
 )
 DISCORD_EPOCH_TIMESTAMP = datetime(2017, 1, 1)
 TOKEN_EPOCH = 1_293_840_000
-TOKEN_RE = re.compile(
-    r"[^\s\.()\"']+"  # Matches token part 1: The user ID string, encoded as base64
-    r"\."             # Matches a literal dot between the token parts
-    r"[^\s\.()\"']+"  # Matches token part 2: The creation timestamp, as an integer
-    r"\."             # Matches a literal dot between the token parts
-    r"[^\s\.()\"']+"  # Matches token part 3: The HMAC, unused by us, but check that it isn't empty
-)
 
 
 class TokenRemover(Cog):
@@ -101,10 +94,7 @@ class TokenRemover(Cog):
         if msg.author.bot:
             return
 
-        # Use findall rather than search to guard against method calls prematurely returning the
-        # token check (e.g. `message.channel.send` also matches our token pattern)
-        maybe_matches = TOKEN_RE.findall(msg.content)
-        for substr in maybe_matches:
+        for substr in analyse(msg.content).token_candidates:
             if cls.is_maybe_token(substr):
                 # Short-circuit on first match
                 return substr
@@ -4,7 +4,7 @@ import re
 import unicodedata
 from email.parser import HeaderParser
 from io import StringIO
-from typing import Tuple, Union
+from typing import Optional, Tuple, Union
 
 from discord import Colour, Embed
 from discord.ext.commands import BadArgument, Cog, Context, command
@@ -12,6 +12,7 @@ from discord.ext.commands import BadArgument, Cog, Context, command
 from bot.bot import Bot
 from bot.constants import Channels, MODERATION_ROLES, STAFF_ROLES
 from bot.decorators import in_whitelist, with_role
+from bot.utils.cache import async_cache
 
 log = logging.getLogger(__name__)
 
@@ -62,6 +63,21 @@ class Utils(Cog):
         if pep_number == 0:
             return await self.send_pep_zero(ctx)
 
+        pep_embed = await self.get_pep_embed(pep_number)
+        if pep_embed is None:
+            error_message = "Unexpected HTTP error during PEP search. Please let us know."
+            pep_embed = Embed(title="Unexpected error", description=error_message)
+            pep_embed.colour = Colour.red()
+
+        await ctx.message.channel.send(embed=pep_embed)
+
+    @async_cache(max_size=64, ttl=60 * 60)
+    async def get_pep_embed(self, pep_number: int) -> Optional[Embed]:
+        """
+        Fetch information about a PEP and return it in an embed.
+
+        The embed is cached for an hour. None is returned if the PEP couldn't be fetched.
+        """
         possible_extensions = ['.txt', '.rst']
         found_pep = False
         for extension in possible_extensions:
@@ -97,14 +113,9 @@ class Utils(Cog):
 
             elif response.status != 404:
                 # any response except 200 and 404 is expected
-                found_pep = True  # actually not, but it's easier to display this way
                 log.trace(f"The user requested PEP {pep_number}, but the response had an unexpected status code: "
                           f"{response.status}.\n{response.text}")
-
-                error_message = "Unexpected HTTP error during PEP search. Please let us know."
-                pep_embed = Embed(title="Unexpected error", description=error_message)
-                pep_embed.colour = Colour.red()
-                break
+                return None
 
         if not found_pep:
             log.trace("PEP was not found")
@@ -112,7 +123,7 @@ class Utils(Cog):
             pep_embed = Embed(title="PEP not found", description=not_found)
             pep_embed.colour = Colour.red()
 
-        await ctx.message.channel.send(embed=pep_embed)
+        return pep_embed
 
     @command()
     @in_whitelist(channels=(Channels.bot_commands,), roles=STAFF_ROLES)
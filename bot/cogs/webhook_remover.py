@@ -1,5 +1,4 @@
 import logging
-import re
 
 from discord import Colour, Message
 from discord.ext.commands import Cog
@@ -7,8 +6,7 @@ from discord.ext.commands import Cog
 from bot.bot import Bot
 from bot.cogs.moderation.modlog import ModLog
 from bot.constants import Channels, Colours, Event, Icons
-
-WEBHOOK_URL_RE = re.compile(r"((?:https?://)?discordapp\.com/api/webhooks/\d+/)\S+/?", re.I)
+from bot.utils.message_analysis import analyse
 
 ALERT_MESSAGE_TEMPLATE = (
     "{user}, looks like you posted a Discord webhook URL. Therefore, your "
@@ -59,7 +57,7 @@ class WebhookRemover(Cog):
     @Cog.listener()
     async def on_message(self, msg: Message) -> None:
         """Check if a Discord webhook URL is in `message`."""
-        matches = WEBHOOK_URL_RE.search(msg.content)
+        matches = analyse(msg.content).webhook_url
         if matches:
             await self.delete_and_respond(msg, matches[1] + "xxx")
 
@@ -209,6 +209,10 @@ class Redis(metaclass=YAMLGetter):
     port: int
     password: Optional[str]
     use_fakeredis: bool  # If this is True, Bot will use fakeredis.aioredis
+    min_connections: int
+    max_connections: int
+    command_timeout: float
+    health_check_interval: float
 
 
 class Filter(metaclass=YAMLGetter):
@@ -226,6 +230,9 @@ class Filter(metaclass=YAMLGetter):
     notify_user_domains: bool
 
     ping_everyone: bool
+    invite_cache_ttl: int
+    invite_negative_cache_ttl: int
+    persist_invite_cache: bool
     guild_invite_whitelist: List[int]
     domain_blacklist: List[str]
     word_watchlist: List[str]
@@ -361,12 +368,26 @@ class CleanMessages(metaclass=YAMLGetter):
 
     message_limit: int
 
+
+class API(metaclass=YAMLGetter):
+    section = "bot"
+    subsection = "api"
+
+    max_concurrency: int
+    max_background_concurrency: int
+    keepalive_timeout: float
+    request_timeout: float
+    max_retries: int
+
+
 class Stats(metaclass=YAMLGetter):
     section = "bot"
     subsection = "stats"
 
     presence_update_timeout: int
     statsd_host: str
+    max_udp_size: int
+    flush_interval: float
 
 
 class Categories(metaclass=YAMLGetter):
@@ -577,6 +598,8 @@ class Sync(metaclass=YAMLGetter):
 
     confirm_timeout: int
     max_diff: int
+    chunk_size: int
+    max_concurrency: int
 
 
 class PythonNews(metaclass=YAMLGetter):
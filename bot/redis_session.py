@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import time
+import typing as t
+
+import aioredis
+import fakeredis.aioredis
+from aioredis.abc import AbcConnection
+from aioredis.errors import RedisError
+
+from bot import constants
+from bot.async_stats import AsyncStatsClient
+
+if t.TYPE_CHECKING:
+    from bot.bot import Bot
+
+log = logging.getLogger(__name__)
+
+# Failed connections and health pings are retried after these many seconds, doubled after every failure.
+MIN_BACKOFF = 1
+MAX_BACKOFF = 60
+
+# The errors of commands sent while Redis is unreachable.
+CONNECTION_ERRORS = (RedisError, OSError, asyncio.TimeoutError)
+
+
+class RedisSession(aioredis.Redis):
+    """
+    A Redis client which times out its commands and sends their latency to statsd.
+
+    Commands taking longer than `command_timeout` seconds raise `asyncio.TimeoutError`, so callers don't
+    wait on a connection which is down until the OS notices. Pub/sub isn't timed out, and neither are
+    the commands of pipelines and transactions, which are only queued until the pipeline is executed.
+    """
+
+    command_timeout: t.Optional[float] = None
+    stats: t.Optional[AsyncStatsClient] = None
+
+    def execute(self, command: t.Union[str, bytes], *args, **kwargs) -> t.Awaitable:
+        """Send a `command` and return an awaitable of its reply."""
+        # Pipelines and transactions create sessions of their own around a buffer instead of a connection.
+        buffered = not isinstance(self.connection, AbcConnection)
+        if buffered or (self.command_timeout is None and self.stats is None):
+            return super().execute(command, *args, **kwargs)
+        return self._timed(command, super().execute(command, *args, **kwargs))
+
+    async def _timed(self, command: t.Union[str, bytes], reply: t.Awaitable) -> t.Any:
+        start = time.perf_counter()
+        try:
+            return await asyncio.wait_for(reply, self.command_timeout)
+        finally:
+            if self.stats is not None:
+                if isinstance(command, bytes):
+                    command = command.decode()
+                self.stats.timing(f"redis.commands.{command.lower()}", (time.perf_counter() - start) * 1000)
+
+
+async def create_redis_session(stats: t.Optional[AsyncStatsClient] = None) -> RedisSession:
+    """
+    Create a pool of connections to the Redis server of the config and return a session using it.
+
+    Connecting is retried with an exponential backoff until it succeeds. If `constants.Redis.use_fakeredis`
+    is True, a fakeredis pool is created instead.
+    """
+    options = dict(
+        minsize=constants.Redis.min_connections,
+        maxsize=constants.Redis.max_connections,
+        commands_factory=RedisSession,
+    )
+
+    if constants.Redis.use_fakeredis:
+        log.info("Using fakeredis instead of communicating with a real Redis server.")
+        session = await fakeredis.aioredis.create_redis_pool(**options)
+    else:
+        backoff = MIN_BACKOFF
+        while True:
+            try:
+                session = await aioredis.create_redis_pool(
+                    address=(constants.Redis.host, constants.Redis.port),
+                    password=constants.Redis.password,
+                    timeout=constants.Redis.command_timeout,
+                    **options,
+                )
+            except CONNECTION_ERRORS as e:
+                log.warning(f"Failed to connect to Redis, retrying in {backoff} seconds: {e!r}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+            else:
+                break
+
+    session.command_timeout = constants.Redis.command_timeout
+    session.stats = stats
+    return session
+
+
+class RedisHealthCheck:
+    """
+    Periodically ping the Redis server of a bot and send the utilisation of its pool to statsd.
+
+    While pings fail, `bot.redis_degraded` is True and the pings are retried with an exponential backoff;
+    the pool reconnects when they succeed again. Caches with a near cache serve their stale values meanwhile.
+    """
+
+    def __init__(self, bot: "Bot", interval: t.Optional[float] = None):
+        self.bot = bot
+        self.interval = constants.Redis.health_check_interval if interval is None else interval
+
+    def _send_pool_stats(self) -> None:
+        pool = self.bot.redis_session.connection
+        self.bot.stats.gauge("redis.pool.size", pool.size)
+        self.bot.stats.gauge("redis.pool.free", pool.freesize)
+        self.bot.stats.gauge("redis.pool.max", pool.maxsize)
+
+    async def run(self) -> None:
+        """Ping Redis until the session is closed."""
+        backoff = MIN_BACKOFF
+        while not self.bot.redis_closed:
+            self._send_pool_stats()
+            try:
+                await self.bot.redis_session.ping()
+            except CONNECTION_ERRORS as e:
+                if not self.bot.redis_degraded:
+                    log.warning(f"Redis is unreachable, near caches serve stale values until it's back: {e!r}")
+                self.bot.redis_degraded = True
+                self.bot.stats.incr("redis.health_check.failures")
+
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+            else:
+                if self.bot.redis_degraded:
+                    log.info("Redis is reachable again.")
+                self.bot.redis_degraded = False
+                backoff = MIN_BACKOFF
+
+                await asyncio.sleep(self.interval)
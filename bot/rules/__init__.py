@@ -1,12 +1,13 @@
 # flake8: noqa
 
-from .attachments import apply as apply_attachments
-from .burst import apply as apply_burst
-from .burst_shared import apply as apply_burst_shared
-from .chars import apply as apply_chars
-from .discord_emojis import apply as apply_discord_emojis
-from .duplicates import apply as apply_duplicates
-from .links import apply as apply_links
-from .mentions import apply as apply_mentions
-from .newlines import apply as apply_newlines
-from .role_mentions import apply as apply_role_mentions
+from .attachments import apply as apply_attachments, rule as attachments_rule
+from .burst import apply as apply_burst, rule as burst_rule
+from .burst_shared import apply as apply_burst_shared, rule as burst_shared_rule
+from .chars import apply as apply_chars, rule as chars_rule
+from .discord_emojis import apply as apply_discord_emojis, rule as discord_emojis_rule
+from .duplicates import apply as apply_duplicates, rule as duplicates_rule
+from .incremental import IncrementalRule, RuleWindow
+from .links import apply as apply_links, rule as links_rule
+from .mentions import apply as apply_mentions, rule as mentions_rule
+from .newlines import apply as apply_newlines, rule as newlines_rule
+from .role_mentions import apply as apply_role_mentions, rule as role_mentions_rule
@@ -1,26 +1,29 @@
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, Sequence, Tuple
 
-from discord import Member, Message
+from discord import Message
 
+from bot.rules.incremental import IncrementalRule
 
-async def apply(
-    last_message: Message, recent_messages: List[Message], config: Dict[str, int]
-) -> Optional[Tuple[str, Iterable[Member], Iterable[Message]]]:
+
+class Attachments(IncrementalRule):
     """Detects total attachments exceeding the limit sent by a single user."""
-    relevant_messages = tuple(
-        msg
-        for msg in recent_messages
-        if (
-            msg.author == last_message.author
-            and len(msg.attachments) > 0
-        )
-    )
-    total_recent_attachments = sum(len(msg.attachments) for msg in relevant_messages)
-
-    if total_recent_attachments > config['max']:
-        return (
-            f"sent {total_recent_attachments} attachments in {config['interval']}s",
-            (last_message.author,),
-            relevant_messages
-        )
-    return None
+
+    def measure(self, message: Message, config: Dict[str, int]) -> Tuple[int]:
+        """Count the attachments of `message`."""
+        return (len(message.attachments),)
+
+    def check(self, totals: Sequence[int], config: Dict[str, int]) -> bool:
+        """Check whether the total amount of attachments exceeds the limit."""
+        return totals[0] > config['max']
+
+    def report(self, totals: Sequence[int], config: Dict[str, int], relevant_messages: Sequence[Message]) -> str:
+        """Report the total amount of attachments."""
+        return f"sent {totals[0]} attachments in {config['interval']}s"
+
+    def relevant_messages(self, messages: Sequence[Message]) -> Iterable[Message]:
+        """Only messages which have attachments are relevant."""
+        return tuple(msg for msg in messages if len(msg.attachments) > 0)
+
+
+rule = Attachments()
+apply = rule.apply
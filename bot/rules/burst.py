@@ -1,23 +1,25 @@
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Sequence, Tuple
 
-from discord import Member, Message
+from discord import Message
 
+from bot.rules.incremental import IncrementalRule
 
-async def apply(
-    last_message: Message, recent_messages: List[Message], config: Dict[str, int]
-) -> Optional[Tuple[str, Iterable[Member], Iterable[Message]]]:
+
+class Burst(IncrementalRule):
     """Detects repeated messages sent by a single user."""
-    relevant_messages = tuple(
-        msg
-        for msg in recent_messages
-        if msg.author == last_message.author
-    )
-    total_relevant = len(relevant_messages)
-
-    if total_relevant > config['max']:
-        return (
-            f"sent {total_relevant} messages in {config['interval']}s",
-            (last_message.author,),
-            relevant_messages
-        )
-    return None
+
+    def measure(self, message: Message, config: Dict[str, int]) -> Tuple[int]:
+        """Count `message` once."""
+        return (1,)
+
+    def check(self, totals: Sequence[int], config: Dict[str, int]) -> bool:
+        """Check whether the amount of messages exceeds the limit."""
+        return totals[0] > config['max']
+
+    def report(self, totals: Sequence[int], config: Dict[str, int], relevant_messages: Sequence[Message]) -> str:
+        """Report the amount of messages."""
+        return f"sent {totals[0]} messages in {config['interval']}s"
+
+
+rule = Burst()
+apply = rule.apply
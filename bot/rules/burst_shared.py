@@ -1,18 +1,37 @@
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Hashable, Iterable, Sequence, Tuple
 
 from discord import Member, Message
 
+from bot.rules.incremental import IncrementalRule
 
-async def apply(
-    last_message: Message, recent_messages: List[Message], config: Dict[str, int]
-) -> Optional[Tuple[str, Iterable[Member], Iterable[Message]]]:
+
+class BurstShared(IncrementalRule):
     """Detects repeated messages sent by multiple users."""
-    total_recent = len(recent_messages)
-
-    if total_recent > config['max']:
-        return (
-            f"sent {total_recent} messages in {config['interval']}s",
-            set(msg.author for msg in recent_messages),
-            recent_messages
-        )
-    return None
+
+    def group(self, message: Message) -> Hashable:
+        """All messages in the channel count towards the same totals."""
+        return None
+
+    def measure(self, message: Message, config: Dict[str, int]) -> Tuple[int]:
+        """Count `message` once."""
+        return (1,)
+
+    def check(self, totals: Sequence[int], config: Dict[str, int]) -> bool:
+        """Check whether the amount of messages exceeds the limit."""
+        return totals[0] > config['max']
+
+    def report(self, totals: Sequence[int], config: Dict[str, int], relevant_messages: Sequence[Message]) -> str:
+        """Report the amount of messages."""
+        return f"sent {totals[0]} messages in {config['interval']}s"
+
+    def relevant_messages(self, messages: Sequence[Message]) -> Iterable[Message]:
+        """All messages in the channel are relevant."""
+        return list(messages)
+
+    def culprits(self, last_message: Message, relevant_messages: Iterable[Message]) -> Iterable[Member]:
+        """Every author of a relevant message is a culprit."""
+        return set(msg.author for msg in relevant_messages)
+
+
+rule = BurstShared()
+apply = rule.apply
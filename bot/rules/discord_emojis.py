@@ -1,31 +1,26 @@
-import re
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Sequence, Tuple
 
-from discord import Member, Message
+from discord import Message
 
+from bot.rules.incremental import IncrementalRule
+from bot.utils.message_analysis import analyse
 
-DISCORD_EMOJI_RE = re.compile(r"<:\w+:\d+>")
 
-
-async def apply(
-    last_message: Message, recent_messages: List[Message], config: Dict[str, int]
-) -> Optional[Tuple[str, Iterable[Member], Iterable[Message]]]:
+class DiscordEmojis(IncrementalRule):
     """Detects total Discord emojis (excluding Unicode emojis) exceeding the limit sent by a single user."""
-    relevant_messages = tuple(
-        msg
-        for msg in recent_messages
-        if msg.author == last_message.author
-    )
-
-    total_emojis = sum(
-        len(DISCORD_EMOJI_RE.findall(msg.content))
-        for msg in relevant_messages
-    )
-
-    if total_emojis > config['max']:
-        return (
-            f"sent {total_emojis} emojis in {config['interval']}s",
-            (last_message.author,),
-            relevant_messages
-        )
-    return None
+
+    def measure(self, message: Message, config: Dict[str, int]) -> Tuple[int]:
+        """Count the Discord emojis in `message`."""
+        return (analyse(message.content).discord_emoji_count,)
+
+    def check(self, totals: Sequence[int], config: Dict[str, int]) -> bool:
+        """Check whether the total amount of emojis exceeds the limit."""
+        return totals[0] > config['max']
+
+    def report(self, totals: Sequence[int], config: Dict[str, int], relevant_messages: Sequence[Message]) -> str:
+        """Report the total amount of emojis."""
+        return f"sent {totals[0]} emojis in {config['interval']}s"
+
+
+rule = DiscordEmojis()
+apply = rule.apply
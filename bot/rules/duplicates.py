@@ -1,27 +1,29 @@
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Hashable, Sequence, Tuple
 
-from discord import Member, Message
+from discord import Message
 
+from bot.rules.incremental import IncrementalRule
 
-async def apply(
-    last_message: Message, recent_messages: List[Message], config: Dict[str, int]
-) -> Optional[Tuple[str, Iterable[Member], Iterable[Message]]]:
+
+class Duplicates(IncrementalRule):
     """Detects duplicated messages sent by a single user."""
-    relevant_messages = tuple(
-        msg
-        for msg in recent_messages
-        if (
-            msg.author == last_message.author
-            and msg.content == last_message.content
-        )
-    )
-
-    total_duplicated = len(relevant_messages)
-
-    if total_duplicated > config['max']:
-        return (
-            f"sent {total_duplicated} duplicated messages in {config['interval']}s",
-            (last_message.author,),
-            relevant_messages
-        )
-    return None
+
+    def group(self, message: Message) -> Hashable:
+        """Only messages with the same author and content count towards the same totals."""
+        return message.author, message.content
+
+    def measure(self, message: Message, config: Dict[str, int]) -> Tuple[int]:
+        """Count `message` once."""
+        return (1,)
+
+    def check(self, totals: Sequence[int], config: Dict[str, int]) -> bool:
+        """Check whether the amount of duplicated messages exceeds the limit."""
+        return totals[0] > config['max']
+
+    def report(self, totals: Sequence[int], config: Dict[str, int], relevant_messages: Sequence[Message]) -> str:
+        """Report the amount of duplicated messages."""
+        return f"sent {totals[0]} duplicated messages in {config['interval']}s"
+
+
+rule = Duplicates()
+apply = rule.apply
@@ -0,0 +1,176 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+from discord import Member, Message
+
+RuleResult = Optional[Tuple[str, Iterable[Member], Iterable[Message]]]
+
+
+class IncrementalRule(ABC):
+    """
+    Base class for antispam rules which are evaluated from running aggregates.
+
+    Every message is measured exactly once, when it enters a `RuleWindow`, and its measurements
+    are added to the totals of the message's group (by default, its author). When the message
+    expires, its measurements are subtracted again. Checking whether a message violates the rule
+    is therefore a constant time lookup of the totals of its group, and the relevant messages are
+    only collected once the rule has actually been violated.
+    """
+
+    def group(self, message: Message) -> Hashable:
+        """Return the key of the group whose totals `message` counts towards."""
+        return message.author
+
+    @abstractmethod
+    def measure(self, message: Message, config: Dict[str, int]) -> Tuple[int, ...]:
+        """Return the quantities that `message` adds to the totals of its group."""
+
+    @abstractmethod
+    def check(self, totals: Sequence[int], config: Dict[str, int]) -> bool:
+        """Return True if the `totals` of a group violate the rule."""
+
+    @abstractmethod
+    def report(self, totals: Sequence[int], config: Dict[str, int], relevant_messages: Sequence[Message]) -> str:
+        """Return the reason why the rule was violated."""
+
+    def relevant_messages(self, messages: Sequence[Message]) -> Iterable[Message]:
+        """Return which of the group's `messages`, ordered newest first, are relevant to the violation."""
+        return tuple(messages)
+
+    def culprits(self, last_message: Message, relevant_messages: Iterable[Message]) -> Iterable[Member]:
+        """Return the members responsible for the violation."""
+        return (last_message.author,)
+
+    async def apply(self, last_message: Message, recent_messages: List[Message], config: Dict[str, int]) -> RuleResult:
+        """
+        Apply the rule to `recent_messages`, ordered newest first, like a stateless rule function.
+
+        This adapter keeps the `apply(last_message, recent_messages, config)` interface of the rules
+        working by feeding the messages into a throwaway `RuleWindow`.
+        """
+        window = RuleWindow(self, config)
+        for message in reversed(recent_messages):
+            window.insert(message, evict=False)
+        return window.evaluate(last_message)
+
+
+class RuleWindow:
+    """The running totals of one `IncrementalRule` over the messages of a single channel."""
+
+    def __init__(self, rule: IncrementalRule, config: Dict[str, int]) -> None:
+        self.rule = rule
+        self.config = config
+        self.interval = timedelta(seconds=config['interval'])
+
+        self._entries: Deque[Tuple[Message, Hashable, Tuple[int, ...]]] = deque()
+        self._message_ids: Set[int] = set()
+        self._totals: Dict[Hashable, List[int]] = {}
+        self._sizes: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _add(self, group: Hashable, measurements: Tuple[int, ...]) -> None:
+        """Add `measurements` to the totals of `group`."""
+        totals = self._totals.get(group)
+        if totals is None:
+            self._totals[group] = list(measurements)
+            self._sizes[group] = 1
+        else:
+            for i, value in enumerate(measurements):
+                totals[i] += value
+            self._sizes[group] += 1
+
+    def _subtract(self, group: Hashable, measurements: Tuple[int, ...]) -> None:
+        """Subtract `measurements` from the totals of `group`, dropping the group once it's empty."""
+        self._sizes[group] -= 1
+        if not self._sizes[group]:
+            del self._sizes[group]
+            del self._totals[group]
+            return
+
+        totals = self._totals[group]
+        for i, value in enumerate(measurements):
+            totals[i] -= value
+
+    def insert(self, message: Message, evict: bool = True) -> None:
+        """Measure `message`, add it to the window and, if `evict` is True, drop expired messages."""
+        if message.id not in self._message_ids:
+            group = self.rule.group(message)
+            measurements = self.rule.measure(message, self.config)
+
+            self._entries.append((message, group, measurements))
+            self._message_ids.add(message.id)
+            self._add(group, measurements)
+
+        if evict:
+            self.evict()
+
+    def evict(self, now: Optional[datetime] = None) -> int:
+        """Drop messages older than the rule's interval and return how many were dropped."""
+        cutoff = (now or datetime.utcnow()) - self.interval
+        evicted = 0
+
+        while self._entries and self._entries[0][0].created_at <= cutoff:
+            message, group, measurements = self._entries.popleft()
+            self._message_ids.discard(message.id)
+            self._subtract(group, measurements)
+            evicted += 1
+
+        return evicted
+
+    def remove(self, message_ids: Iterable[int]) -> None:
+        """Drop the messages with the given `message_ids`, for example because they were deleted."""
+        message_ids = self._message_ids.intersection(message_ids)
+        if not message_ids:
+            return
+
+        kept = deque()
+        for entry in self._entries:
+            message, group, measurements = entry
+            if message.id in message_ids:
+                self._subtract(group, measurements)
+            else:
+                kept.append(entry)
+
+        self._entries = kept
+        self._message_ids -= message_ids
+
+    def update(self, message: Message) -> None:
+        """Measure `message` again, for example because it was edited."""
+        if message.id not in self._message_ids:
+            return
+
+        for i, (cached, group, measurements) in enumerate(self._entries):
+            if cached.id == message.id:
+                self._subtract(group, measurements)
+
+                group = self.rule.group(message)
+                measurements = self.rule.measure(message, self.config)
+                self._entries[i] = (message, group, measurements)
+                self._add(group, measurements)
+                return
+
+    def evaluate(self, last_message: Message) -> RuleResult:
+        """
+        Check whether `last_message` violates the rule.
+
+        If it doesn't, None is returned. Otherwise, a tuple in the form of
+        `(reason, culprits, relevant_messages)` is returned.
+        """
+        group = self.rule.group(last_message)
+        totals = self._totals.get(group)
+
+        if totals is None or not self.rule.check(totals, self.config):
+            return None
+
+        group_messages = [message for message, message_group, _ in reversed(self._entries) if message_group == group]
+        relevant_messages = self.rule.relevant_messages(group_messages)
+
+        return (
+            self.rule.report(totals, self.config, relevant_messages),
+            self.rule.culprits(last_message, relevant_messages),
+            relevant_messages,
+        )
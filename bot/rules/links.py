@@ -1,37 +1,32 @@
-import re
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Sequence, Tuple
 
-from discord import Member, Message
+from discord import Message
 
+from bot.rules.incremental import IncrementalRule
+from bot.utils.message_analysis import analyse
 
-LINK_RE = re.compile(r"(https?://[^\s]+)")
 
-
-async def apply(
-    last_message: Message, recent_messages: List[Message], config: Dict[str, int]
-) -> Optional[Tuple[str, Iterable[Member], Iterable[Message]]]:
+class Links(IncrementalRule):
     """Detects total links exceeding the limit sent by a single user."""
-    relevant_messages = tuple(
-        msg
-        for msg in recent_messages
-        if msg.author == last_message.author
-    )
-    total_links = 0
-    messages_with_links = 0
-
-    for msg in relevant_messages:
-        total_matches = len(LINK_RE.findall(msg.content))
-        if total_matches:
-            messages_with_links += 1
-            total_links += total_matches
-
-    # Only apply the filter if we found more than one message with
-    # links to prevent wrongfully firing the rule on users posting
-    # e.g. an installation log of pip packages from GitHub.
-    if total_links > config['max'] and messages_with_links > 1:
-        return (
-            f"sent {total_links} links in {config['interval']}s",
-            (last_message.author,),
-            relevant_messages
-        )
-    return None
+
+    def measure(self, message: Message, config: Dict[str, int]) -> Tuple[int, int]:
+        """Count the links in `message` and whether it contains any links at all."""
+        total_matches = len(analyse(message.content).links)
+        return total_matches, int(total_matches > 0)
+
+    def check(self, totals: Sequence[int], config: Dict[str, int]) -> bool:
+        """Check whether the total amount of links exceeds the limit."""
+        total_links, messages_with_links = totals
+
+        # Only apply the filter if we found more than one message with
+        # links to prevent wrongfully firing the rule on users posting
+        # e.g. an installation log of pip packages from GitHub.
+        return total_links > config['max'] and messages_with_links > 1
+
+    def report(self, totals: Sequence[int], config: Dict[str, int], relevant_messages: Sequence[Message]) -> str:
+        """Report the total amount of links."""
+        return f"sent {totals[0]} links in {config['interval']}s"
+
+
+rule = Links()
+apply = rule.apply
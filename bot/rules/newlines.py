@@ -1,45 +1,37 @@
-import re
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Sequence, Tuple
 
-from discord import Member, Message
+from discord import Message
 
+from bot.rules.incremental import IncrementalRule
+from bot.utils.message_analysis import analyse
 
-async def apply(
-    last_message: Message, recent_messages: List[Message], config: Dict[str, int]
-) -> Optional[Tuple[str, Iterable[Member], Iterable[Message]]]:
+
+class Newlines(IncrementalRule):
     """Detects total newlines exceeding the set limit sent by a single user."""
-    relevant_messages = tuple(
-        msg
-        for msg in recent_messages
-        if msg.author == last_message.author
-    )
-
-    # Identify groups of newline characters and get group & total counts
-    exp = r"(\n+)"
-    newline_counts = []
-    for msg in relevant_messages:
-        newline_counts += [len(group) for group in re.findall(exp, msg.content)]
-    total_recent_newlines = sum(newline_counts)
-
-    # Get maximum newline group size
-    if newline_counts:
-        max_newline_group = max(newline_counts)
-    else:
-        # If no newlines are found, newline_counts will be an empty list, which will error out max()
-        max_newline_group = 0
-
-    # Check first for total newlines, if this passes then check for large groupings
-    if total_recent_newlines > config['max']:
-        return (
-            f"sent {total_recent_newlines} newlines in {config['interval']}s",
-            (last_message.author,),
-            relevant_messages
-        )
-    elif max_newline_group > config['max_consecutive']:
-        return (
-            f"sent {max_newline_group} consecutive newlines in {config['interval']}s",
-            (last_message.author,),
-            relevant_messages
-        )
-
-    return None
+
+    def measure(self, message: Message, config: Dict[str, int]) -> Tuple[int, int]:
+        """Count the newlines in `message` and whether any group of them is too large."""
+        newline_counts = analyse(message.content).newline_groups
+        # If no newlines are found, newline_counts will be an empty list, which would error out max()
+        max_newline_group = max(newline_counts, default=0)
+        return sum(newline_counts), int(max_newline_group > config['max_consecutive'])
+
+    def check(self, totals: Sequence[int], config: Dict[str, int]) -> bool:
+        """Check whether there are too many newlines in total or in a single group."""
+        total_recent_newlines, messages_with_large_groups = totals
+        return total_recent_newlines > config['max'] or messages_with_large_groups > 0
+
+    def report(self, totals: Sequence[int], config: Dict[str, int], relevant_messages: Sequence[Message]) -> str:
+        """Report the total amount of newlines, or the largest group of consecutive newlines."""
+        total_recent_newlines = totals[0]
+
+        # Check first for total newlines, if this passes then report the large groupings
+        if total_recent_newlines > config['max']:
+            return f"sent {total_recent_newlines} newlines in {config['interval']}s"
+
+        max_newline_group = max(max(analyse(msg.content).newline_groups, default=0) for msg in relevant_messages)
+        return f"sent {max_newline_group} consecutive newlines in {config['interval']}s"
+
+
+rule = Newlines()
+apply = rule.apply
@@ -1,24 +1,25 @@
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Sequence, Tuple
 
-from discord import Member, Message
+from discord import Message
 
+from bot.rules.incremental import IncrementalRule
 
-async def apply(
-    last_message: Message, recent_messages: List[Message], config: Dict[str, int]
-) -> Optional[Tuple[str, Iterable[Member], Iterable[Message]]]:
+
+class RoleMentions(IncrementalRule):
     """Detects total role mentions exceeding the limit sent by a single user."""
-    relevant_messages = tuple(
-        msg
-        for msg in recent_messages
-        if msg.author == last_message.author
-    )
-
-    total_recent_mentions = sum(len(msg.role_mentions) for msg in relevant_messages)
-
-    if total_recent_mentions > config['max']:
-        return (
-            f"sent {total_recent_mentions} role mentions in {config['interval']}s",
-            (last_message.author,),
-            relevant_messages
-        )
-    return None
+
+    def measure(self, message: Message, config: Dict[str, int]) -> Tuple[int]:
+        """Count the role mentions in `message`."""
+        return (len(message.role_mentions),)
+
+    def check(self, totals: Sequence[int], config: Dict[str, int]) -> bool:
+        """Check whether the total amount of role mentions exceeds the limit."""
+        return totals[0] > config['max']
+
+    def report(self, totals: Sequence[int], config: Dict[str, int], relevant_messages: Sequence[Message]) -> str:
+        """Report the total amount of role mentions."""
+        return f"sent {totals[0]} role mentions in {config['interval']}s"
+
+
+rule = RoleMentions()
+apply = rule.apply
@@ -0,0 +1,131 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import typing as t
+
+from bot.async_stats import AsyncStatsClient
+
+log = logging.getLogger(__name__)
+
+# Timers due within this many seconds of the loop's time are run, like the loop does for its own timers.
+CLOCK_RESOLUTION = time.get_clock_info("monotonic").resolution
+# Cancelled timers are only removed from the heap at once when there are at least this many of them.
+MIN_COMPACT_SIZE = 256
+
+
+class Timer:
+    """A callback scheduled in a `TimerQueue`, which can be cancelled until it runs."""
+
+    __slots__ = ("when", "_queue", "_callback", "_args", "cancelled")
+
+    def __init__(self, queue: "TimerQueue", when: float, callback: t.Callable, args: t.Tuple):
+        self.when = when
+        self._queue = queue
+        self._callback = callback
+        self._args = args
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Prevent the callback from running. Does nothing if the timer already ran or was cancelled."""
+        if not self.cancelled and self._queue is not None:
+            self.cancelled = True
+            self._queue._timer_cancelled()
+
+    def _run(self) -> None:
+        self._queue = None
+        self._callback(*self._args)
+
+
+class TimerQueue:
+    """
+    Runs callbacks at given times using a min-heap of timers and a single timer handle on the loop.
+
+    Scheduling a timer is O(log n). Cancelling one is O(1): cancelled timers stay in the heap until
+    they're popped, or until they make up over half of it, at which point the heap is rebuilt without
+    them. Only the earliest timer is ever scheduled on the loop.
+
+    The number of pending timers is sent to the `timers.pending` gauge and how late each timer ran to
+    the `timers.lateness` timer in `stats`, if it's given.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, stats: t.Optional[AsyncStatsClient] = None):
+        self._loop = loop
+        self._stats = stats
+
+        self._heap: t.List[t.Tuple[float, int, Timer]] = []
+        self._counter = itertools.count()
+        self._cancelled = 0
+        self._handle: t.Optional[asyncio.TimerHandle] = None
+
+    def __len__(self) -> int:
+        """Return the number of pending timers."""
+        return len(self._heap) - self._cancelled
+
+    def call_later(self, delay: float, callback: t.Callable, *args) -> Timer:
+        """Run `callback(*args)` after `delay` seconds, or as soon as possible if it's negative."""
+        return self.call_at(self._loop.time() + max(delay, 0), callback, *args)
+
+    def call_at(self, when: float, callback: t.Callable, *args) -> Timer:
+        """Run `callback(*args)` once the loop's time is `when`."""
+        timer = Timer(self, when, callback, args)
+        heapq.heappush(self._heap, (when, next(self._counter), timer))
+
+        if self._handle is None or when < self._handle.when():
+            self._schedule_handle()
+
+        return timer
+
+    def close(self) -> None:
+        """Cancel every pending timer."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        for _, _, timer in self._heap:
+            timer._queue = None
+            timer.cancelled = True
+
+        self._heap.clear()
+        self._cancelled = 0
+
+    def _timer_cancelled(self) -> None:
+        """Rebuild the heap without its cancelled timers if they make up over half of it."""
+        self._cancelled += 1
+        if self._cancelled >= MIN_COMPACT_SIZE and self._cancelled * 2 > len(self._heap):
+            log.trace(f"Removing {self._cancelled} cancelled timers from the timer queue.")
+            self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    def _schedule_handle(self) -> None:
+        """Schedule the loop to run the due timers at the time of the earliest timer."""
+        if self._handle is not None:
+            self._handle.cancel()
+        self._handle = self._loop.call_at(self._heap[0][0], self._run_due_timers)
+
+    def _run_due_timers(self) -> None:
+        """Run every due timer, then schedule the handle for the next one."""
+        self._handle = None
+        now = self._loop.time()
+
+        while self._heap and self._heap[0][0] <= now + CLOCK_RESOLUTION:
+            when, _, timer = heapq.heappop(self._heap)
+            if timer.cancelled:
+                self._cancelled -= 1
+                continue
+
+            if self._stats is not None:
+                self._stats.timing("timers.lateness", max(now - when, 0) * 1000)
+
+            try:
+                timer._run()
+            except Exception:
+                log.exception(f"Error in timer callback {timer._callback!r}.")
+
+        if self._stats is not None:
+            self._stats.gauge("timers.pending", len(self))
+
+        if self._heap:
+            self._schedule_handle()
@@ -0,0 +1,178 @@
+import asyncio
+import functools
+import logging
+import time
+import types
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from bot.async_stats import AsyncStatsClient
+
+log = logging.getLogger(__name__)
+
+
+def _make_key(args: Tuple, kwargs: Dict[str, Any]) -> Hashable:
+    """Return a key for the arguments of a call; dicts are converted to tuples of their items."""
+    def freeze(value: Any) -> Hashable:
+        if isinstance(value, dict):
+            return tuple(sorted(value.items()))
+        return value
+
+    return (*map(freeze, args), *((name, freeze(value)) for name, value in sorted(kwargs.items())))
+
+
+class AsyncCache:
+    """
+    An LRU cache of the results of a coroutine function, with an optional TTL.
+
+    Create it with the `async_cache` decorator. Every decorated function has its own cache, keyed
+    by the arguments it's called with; for methods, the instance isn't part of the key, so all
+    instances share the cache. Concurrent calls with the same arguments are coalesced into a single
+    call of the function. Results which are None and exceptions aren't cached, and neither are the
+    results of calls which were still pending when the cache was cleared.
+
+    When decorating the method of a class which has a `bot` attribute, such as a cog, the hits,
+    misses, coalesced calls, evictions and size of the cache are sent to `bot.stats` under
+    `cache.<qualified name of the method>`.
+    """
+
+    def __init__(
+        self,
+        function: Callable[..., Awaitable],
+        max_size: int,
+        ttl: Optional[float] = None,
+        size_of: Optional[Callable[[Any], int]] = None,
+    ):
+        functools.update_wrapper(self, function)
+        self.function = function
+        self.max_size = max_size
+        self.ttl = ttl
+        self.size_of = size_of
+
+        self.size = 0
+        self.stats: Optional[AsyncStatsClient] = None
+        self._stats_name = f"cache.{function.__qualname__}"
+        self._is_method = False
+
+        # Maps the keys to the expiry times, sizes and results of the calls.
+        self._entries: Dict[Hashable, Tuple[Optional[float], int, Any]] = OrderedDict()
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+
+        # Bumped by `clear`, so calls started before it don't cache their now outdated results.
+        self._generation = 0
+
+    def __set_name__(self, owner: Any, attribute_name: str) -> None:
+        """Remember that this is a method, so the instance it's called on isn't part of the keys."""
+        self._is_method = True
+
+    def __get__(self, instance: Any, owner: Any) -> Any:
+        """Bind the cache to the `instance` like a method, and send stats to the bot of the instance if it has one."""
+        if instance is None:
+            return self
+
+        stats = getattr(getattr(instance, "bot", None), "stats", None)
+        if stats is not None:
+            self.stats = stats
+
+        return types.MethodType(self, instance)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def __call__(self, *args, **kwargs) -> Any:
+        """Return the cached result of the call, calling the function if there isn't one."""
+        key = _make_key(args[1:] if self._is_method else args, kwargs)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, _, result = entry
+            if expires_at is None or expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self._incr("hits")
+                return result
+
+            self._evict(key)
+
+        if key in self._pending:
+            self._incr("coalesced")
+        else:
+            self._incr("misses")
+            future = self._pending[key] = asyncio.ensure_future(self._call(key, args, kwargs))
+            future.add_done_callback(functools.partial(self._forget_pending, key))
+
+        return await asyncio.shield(self._pending[key])
+
+    async def _call(self, key: Hashable, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+        """Call the function and cache its result, unless the cache was cleared in the meantime."""
+        generation = self._generation
+        result = await self.function(*args, **kwargs)
+        if result is None or generation != self._generation:
+            return result
+
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        size = 1 if self.size_of is None else self.size_of(result)
+        self._entries[key] = (expires_at, size, result)
+        self.size += size
+
+        while self.size > self.max_size and len(self._entries) > 1:
+            self._evict(next(iter(self._entries)))
+            self._incr("evictions")
+
+        self._gauge_size()
+        return result
+
+    def invalidate(self, *args, **kwargs) -> bool:
+        """Remove the result of the call with the given arguments from the cache; return True if it was cached."""
+        key = _make_key(args, kwargs)
+        if key not in self._entries:
+            return False
+
+        self._evict(key)
+        self._gauge_size()
+        return True
+
+    def clear(self) -> None:
+        """Remove every result from the cache, and stop the pending calls from caching theirs."""
+        self._generation += 1
+        self._pending.clear()
+        self._entries.clear()
+        self.size = 0
+        self._gauge_size()
+
+    def _forget_pending(self, key: Hashable, future: asyncio.Future) -> None:
+        # The cache may have been cleared, and the key called again, since the call started.
+        if self._pending.get(key) is future:
+            del self._pending[key]
+
+    def _evict(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.size -= size
+
+    def _incr(self, stat: str) -> None:
+        if self.stats is not None:
+            self.stats.incr(f"{self._stats_name}.{stat}")
+
+    def _gauge_size(self) -> None:
+        if self.stats is not None:
+            self.stats.gauge(f"{self._stats_name}.size", self.size)
+
+
+def async_cache(
+    max_size: int = 128,
+    *,
+    ttl: Optional[float] = None,
+    size_of: Optional[Callable[[Any], int]] = None,
+) -> Callable[[Callable[..., Awaitable]], AsyncCache]:
+    """
+    Cache the results of the decorated coroutine function or method in an `AsyncCache`.
+
+    Once the cache exceeds `max_size`, the least recently used results are evicted. By default the
+    size is the number of results, or the sum of `size_of(result)` if it's given. If `ttl` is given,
+    results are only used for `ttl` seconds after they were cached.
+
+    The cache can be emptied with `clear`, and single results removed with `invalidate`, which
+    takes the same arguments as the decorated function (without the instance for methods).
+    """
+    def decorator(function: Callable[..., Awaitable]) -> AsyncCache:
+        return AsyncCache(function, max_size, ttl, size_of)
+    return decorator
@@ -0,0 +1,129 @@
+import re
+from functools import cached_property, lru_cache
+from typing import List, Optional
+
+INVITE_RE = re.compile(
+    r"(?:discord(?:[\.,]|dot)gg|"                     # Could be discord.gg/
+    r"discord(?:[\.,]|dot)com(?:\/|slash)invite|"     # or discord.com/invite/
+    r"discordapp(?:[\.,]|dot)com(?:\/|slash)invite|"  # or discordapp.com/invite/
+    r"discord(?:[\.,]|dot)me|"                        # or discord.me
+    r"discord(?:[\.,]|dot)io"                         # or discord.io.
+    r")(?:[\/]|slash)"                                # / or 'slash'
+    r"([a-zA-Z0-9]+)",                                # the invite code itself
+    flags=re.IGNORECASE
+)
+
+SPOILER_RE = re.compile(r"(\|\|.+?\|\|)", re.DOTALL)
+URL_RE = re.compile(r"(https?://[^\s]+)", flags=re.IGNORECASE)
+ZALGO_RE = re.compile(r"[\u0300-\u036F\u0489]")
+
+TOKEN_RE = re.compile(
+    r"[^\s\.()\"']+"  # Matches token part 1: The user ID string, encoded as base64
+    r"\."             # Matches a literal dot between the token parts
+    r"[^\s\.()\"']+"  # Matches token part 2: The creation timestamp, as an integer
+    r"\."             # Matches a literal dot between the token parts
+    r"[^\s\.()\"']+"  # Matches token part 3: The HMAC, unused by us, but check that it isn't empty
+)
+WEBHOOK_URL_RE = re.compile(r"((?:https?://)?discordapp\.com/api/webhooks/\d+/)\S+/?", re.I)
+
+# Used by the antispam rules
+LINK_RE = re.compile(r"(https?://[^\s]+)")
+DISCORD_EMOJI_RE = re.compile(r"<:\w+:\d+>")
+NEWLINES_RE = re.compile(r"(\n+)")
+
+
+def expand_spoilers(text: str) -> str:
+    """Return a string containing all interpretations of a spoilered message."""
+    split_text = SPOILER_RE.split(text)
+    return ''.join(
+        split_text[0::2] + split_text[1::2] + split_text
+    )
+
+
+class MessageAnalysis:
+    """
+    Facts derived from the content of a message, shared by all the cogs that inspect messages.
+
+    Every fact is computed lazily the first time it's accessed and then cached, so the filters,
+    the token and webhook removers, the codeblock detector and the antispam rules never scan the
+    same content with the same expression twice. Use `analyse` to get the shared instance for
+    some content rather than creating one directly.
+    """
+
+    def __init__(self, content: str):
+        self.content = content
+
+    @cached_property
+    def lowered_content(self) -> str:
+        """The content in lowercase."""
+        return self.content.lower()
+
+    @cached_property
+    def expanded_content(self) -> str:
+        """The content with every interpretation of its spoilers expanded."""
+        if SPOILER_RE.search(self.content):
+            return expand_spoilers(self.content)
+        return self.content
+
+    @cached_property
+    def urls(self) -> List[str]:
+        """All URLs in the content."""
+        return URL_RE.findall(self.content)
+
+    @cached_property
+    def links(self) -> List[str]:
+        """All links in the content, as counted by the antispam `links` rule."""
+        return LINK_RE.findall(self.content)
+
+    @cached_property
+    def invite_codes(self) -> List[str]:
+        """All invite codes in the content."""
+        # Remove backslashes to prevent escape character aroundfuckery like
+        # discord\.gg/gdudes-pony-farm
+        return INVITE_RE.findall(self.content.replace("\\", ""))
+
+    @cached_property
+    def token_candidates(self) -> List[str]:
+        """
+        All substrings which are shaped like a Discord token.
+
+        `findall` is used rather than `search` to guard against method calls prematurely
+        returning the token check (e.g. `message.channel.send` also matches the token pattern).
+        """
+        return TOKEN_RE.findall(self.content)
+
+    @cached_property
+    def webhook_url(self) -> Optional[re.Match]:
+        """The first Discord webhook URL in the content, if any."""
+        return WEBHOOK_URL_RE.search(self.content)
+
+    @cached_property
+    def has_zalgo(self) -> bool:
+        """Whether the content contains zalgo characters."""
+        return bool(ZALGO_RE.search(self.content))
+
+    @cached_property
+    def line_count(self) -> int:
+        """The number of lines in the content."""
+        return len(self.content.splitlines())
+
+    @cached_property
+    def newline_groups(self) -> List[int]:
+        """The sizes of all the groups of consecutive newlines in the content."""
+        return [len(group) for group in NEWLINES_RE.findall(self.content)]
+
+    @cached_property
+    def discord_emoji_count(self) -> int:
+        """The number of custom Discord emojis in the content."""
+        return len(DISCORD_EMOJI_RE.findall(self.content))
+
+
+@lru_cache(maxsize=1024)
+def analyse(content: str) -> MessageAnalysis:
+    """
+    Return the shared `MessageAnalysis` of `content`.
+
+    The analysis is cached by content rather than by message, so an edited message is analysed
+    again while every consumer of the same message content shares one analysis.
+    """
+    return MessageAnalysis(content)
@@ -0,0 +1,106 @@
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, Iterable, List, Optional
+
+from discord import Message
+
+log = logging.getLogger(__name__)
+
+
+class MessageWindowCache:
+    """
+    A per-channel sliding window of recently sent messages.
+
+    Messages are kept in chronological order in one deque per channel and are evicted once they
+    are older than `max_age` seconds, so the memory used is bounded by the message rate of the
+    busiest channels rather than by the total number of messages seen.
+
+    A channel is considered "warm" once it has been primed, either with the result of a single
+    `channel.history()` call or by simply receiving its first message after a cold start. Calling
+    `clear` makes every channel cold again, which should be done whenever gateway events may have
+    been missed, for example after a new session is started.
+    """
+
+    def __init__(self, max_age: float) -> None:
+        self.max_age = timedelta(seconds=max_age)
+        self._channels: Dict[int, Deque[Message]] = {}
+
+    def __len__(self) -> int:
+        """Return the total number of messages held across all channels."""
+        return sum(len(messages) for messages in self._channels.values())
+
+    def is_warm(self, channel_id: int) -> bool:
+        """Return True if the window of the channel `channel_id` has been primed."""
+        return channel_id in self._channels
+
+    def prime(self, channel_id: int, messages: Iterable[Message]) -> None:
+        """Merge `messages`, usually fetched with `channel.history()`, into the window of `channel_id`."""
+        merged = {message.id: message for message in self._channels.get(channel_id, ())}
+        merged.update((message.id, message) for message in messages)
+
+        self._channels[channel_id] = deque(sorted(merged.values(), key=lambda message: message.id))
+        log.trace(f"Primed message window of channel {channel_id} with {len(merged)} messages.")
+
+    def append(self, message: Message) -> int:
+        """
+        Add `message` to the window of its channel and evict expired messages.
+
+        Messages which are already present in the window are ignored.
+        Return the number of messages that were evicted.
+        """
+        messages = self._channels.setdefault(message.channel.id, deque())
+
+        if not messages or messages[-1].id < message.id:
+            messages.append(message)
+        elif not any(cached.id == message.id for cached in messages):
+            # Messages may occasionally be dispatched out of order; keep the window sorted.
+            messages.append(message)
+            self._channels[message.channel.id] = deque(sorted(messages, key=lambda cached: cached.id))
+
+        return self.evict(message.channel.id)
+
+    def evict(self, channel_id: int, now: Optional[datetime] = None) -> int:
+        """Remove messages older than `max_age` from the window of `channel_id` and return how many were removed."""
+        messages = self._channels.get(channel_id)
+        if not messages:
+            return 0
+
+        cutoff = (now or datetime.utcnow()) - self.max_age
+        evicted = 0
+
+        while messages and messages[0].created_at <= cutoff:
+            messages.popleft()
+            evicted += 1
+
+        return evicted
+
+    def get_recent(self, channel_id: int, interval: float, now: Optional[datetime] = None) -> List[Message]:
+        """
+        Return the messages sent in `channel_id` in the last `interval` seconds.
+
+        Like `channel.history(oldest_first=False)`, the messages are ordered from newest to oldest.
+        """
+        cutoff = (now or datetime.utcnow()) - timedelta(seconds=interval)
+        recent = []
+
+        for message in reversed(self._channels.get(channel_id, ())):
+            if message.created_at <= cutoff:
+                break
+            recent.append(message)
+
+        return recent
+
+    def remove(self, channel_id: int, message_ids: Iterable[int]) -> None:
+        """Remove the messages with the given `message_ids` from the window of `channel_id`."""
+        messages = self._channels.get(channel_id)
+        if not messages:
+            return
+
+        message_ids = set(message_ids)
+        self._channels[channel_id] = deque(message for message in messages if message.id not in message_ids)
+
+    def clear(self) -> None:
+        """Drop all windows, making every channel cold."""
+        log.trace("Clearing all message windows.")
+        self._channels.clear()
@@ -1,11 +1,22 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import itertools
+import json
 import logging
-from functools import partialmethod
-from typing import Any, Dict, ItemsView, Optional, Tuple, Union
+import math
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Generator, ItemsView, Iterable, List, Optional, Tuple, Union
+
+from aioredis.errors import RedisError, ReplyError
 
 from bot.bot import Bot
+from bot.utils import redis_codec
 
 log = logging.getLogger(__name__)
 
@@ -14,17 +25,103 @@ RedisKeyType = Union[str, int]
 RedisValueType = Union[str, int, float]
 RedisKeyOrValue = Union[RedisKeyType, RedisValueType]
 
-# Prefix tuples
-_PrefixTuple = Tuple[Tuple[str, Any], ...]
-_VALUE_PREFIXES = (
-    ("f|", float),
-    ("i|", int),
-    ("s|", str),
-)
-_KEY_PREFIXES = (
-    ("i|", int),
-    ("s|", str),
-)
+# Map the types of keys and values to the prefixes of their typestrings, in the order they're tried
+# for subclasses of the types, and the prefixes back to the types. Every prefix is two characters long.
+_VALUE_PREFIXES: Dict[type, str] = {float: "f|", int: "i|", str: "s|"}
+_KEY_PREFIXES: Dict[type, str] = {int: "i|", str: "s|"}
+_VALUE_TYPES = {prefix: _type for _type, prefix in _VALUE_PREFIXES.items()}
+_KEY_TYPES = {prefix: _type for _type, prefix in _KEY_PREFIXES.items()}
+
+# Increments the value of ARGV[1] in the hash KEYS[1] by the typestring ARGV[2] and returns its new value.
+# Like in Python, the sum is only an int if both numbers are. Lua numbers are doubles, which can't hold
+# ints above 2**53 exactly, so ints are added digit by digit as strings instead. Floats are formatted with
+# enough digits to be read back exactly. Returns nil if the value doesn't exist, and the value unchanged
+# if it isn't a number.
+_INCREMENT_SCRIPT = """
+-- Adds the digits of b to those of a, or subtracts them if sign is -1. a must have the larger magnitude.
+local function add_digits(a, b, sign)
+    local result = ""
+    local carry = 0
+    for i = 1, #a do
+        local digit = tonumber(string.sub(a, -i, -i)) + carry
+        if i <= #b then
+            digit = digit + sign * tonumber(string.sub(b, -i, -i))
+        end
+        carry = math.floor(digit / 10)
+        result = digit % 10 .. result
+    end
+    if carry > 0 then
+        result = carry .. result
+    end
+
+    result = string.gsub(result, "^0+", "")
+    return result == "" and "0" or result
+end
+
+local function add_integers(a, b)
+    local a_sign, a_digits = string.match(a, "^(-?)(%d+)$")
+    local b_sign, b_digits = string.match(b, "^(-?)(%d+)$")
+    if #a_digits < #b_digits or (#a_digits == #b_digits and a_digits < b_digits) then
+        a_sign, a_digits, b_sign, b_digits = b_sign, b_digits, a_sign, a_digits
+    end
+
+    if a_sign == b_sign then
+        return a_sign .. add_digits(a_digits, b_digits, 1)
+    end
+    local result = add_digits(a_digits, b_digits, -1)
+    return result == "0" and result or a_sign .. result
+end
+
+local value = redis.call("HGET", KEYS[1], ARGV[1])
+if not value then
+    return nil
+end
+
+local prefix = string.sub(value, 1, 2)
+if prefix ~= "i|" and prefix ~= "f|" then
+    return value
+end
+
+if prefix == "i|" and string.sub(ARGV[2], 1, 2) == "i|" then
+    value = "i|" .. add_integers(string.sub(value, 3), string.sub(ARGV[2], 3))
+else
+    local result = tonumber(string.sub(value, 3)) + tonumber(string.sub(ARGV[2], 3))
+    value = "f|" .. string.format("%.17g", result)
+end
+
+redis.call("HSET", KEYS[1], ARGV[1], value)
+return value
+"""
+_INCREMENT_SCRIPT_SHA = hashlib.sha1(_INCREMENT_SCRIPT.encode()).hexdigest()
+
+# Deletes up to ARGV[2] items of the hash KEYS[1] which expired at the time ARGV[1] according to the sorted
+# set of expiry times KEYS[2], and returns their keys. `unpack` was moved to `table` after Lua 5.1, which Redis uses.
+_SWEEP_SCRIPT = """
+local unpack = unpack or table.unpack
+local expired = redis.call("ZRANGEBYSCORE", KEYS[2], "-inf", ARGV[1], "LIMIT", 0, ARGV[2])
+if #expired > 0 then
+    redis.call("HDEL", KEYS[1], unpack(expired))
+    redis.call("ZREM", KEYS[2], unpack(expired))
+end
+return expired
+"""
+_SWEEP_SCRIPT_SHA = hashlib.sha1(_SWEEP_SCRIPT.encode()).hexdigest()
+
+# Seconds between deleting the expired items of caches with a TTL, and the number deleted at a time.
+SWEEP_INTERVAL = 60
+SWEEP_BATCH_SIZE = 1000
+
+# The pub/sub channel of the keys invalidated in near caches, and the seconds to wait before subscribing
+# to it again after the subscription failed.
+INVALIDATIONS_CHANNEL = "RedisCache.invalidations"
+RESUBSCRIBE_DELAY = 5
+
+# The number of key/value pairs fetched at a time when iterating over the items of a cache.
+SCAN_BATCH_SIZE = 1000
+
+# Sentinels for the near cache: keys cached as not existing, and keys which aren't cached.
+_MISSING = object()
+_UNCACHED = object()
 
 
 class NoBotInstanceError(RuntimeError):
@@ -48,7 +145,9 @@ class RedisCache:
     all the public methods in this class are coroutines, and must be awaited.
 
     Because of limitations in Redis, this cache will only accept strings, integers and
-    floats both for keys and values.
+    floats both for keys and values. Caches created with `binary=True` store their values
+    in a compact binary format instead, which also supports None, bytes, datetimes, and
+    lists and dicts of them. See `bot.utils.redis_codec` for more information.
 
     Please note that this class MUST be created as a class attribute, and that that class
     must also contain an attribute with an instance of our Bot. See `__get__` and `__set_name__`
@@ -88,15 +187,57 @@ class RedisCache:
 
             # We can even iterate in a comprehension!
             consumed = [value async for key, value in self.cache.items()]
+
+            # Several commands can be sent in a single round trip with a pipeline.
+            async with self.cache.pipeline() as pipeline:
+                pipeline.set("key", "value")
+                value = pipeline.get("other_key")
+
+            # The results of the commands are available once the pipeline is left.
+            print(value.result())
+
+    Caches read on hot paths can keep up to `near_cache_size` recently used values in memory for
+    `near_cache_ttl` seconds, so getting them doesn't need a round trip to Redis:
+
+    class SomeCog(Cog):
+        cache = RedisCache(near_cache_size=1000)
+
+    Values written through the cache are updated in the near cache, and the processes of other bots
+    using the same Redis server are told to forget them over a pub/sub channel.
+    While the bot can't reach Redis, near cached values are got even if they're stale, rather than
+    waiting for commands to time out. The hits and misses of the near cache are sent to stats under
+    `cache.<namespace>`.
+
+    Items of caches created with a `ttl` expire that many seconds after they were last set, unless
+    another TTL is passed to `set` or `update`. Since Redis hashes can't expire single fields, the
+    expiry times are kept in a sorted set, and expired items are deleted every `SWEEP_INTERVAL`
+    seconds; until then, they can still be got.
     """
 
     _namespaces = []
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        ttl: Optional[float] = None,
+        binary: bool = False,
+        near_cache_size: int = 0,
+        near_cache_ttl: float = 5 * 60,
+    ) -> None:
         """Initialize the RedisCache."""
         self._namespace = None
         self.bot = None
-        self._increment_lock = None
+        self.ttl = ttl
+        self.binary = binary
+        self._sweeper: Optional[asyncio.Task] = None
+
+        self.near_cache_size = near_cache_size
+        self.near_cache_ttl = near_cache_ttl
+        # Maps the typestrings of the keys to the expiry times and values of the cached items.
+        self._near_cache: Dict[str, Tuple[float, Any]] = OrderedDict()
+        # Incremented on every invalidation, so values got before one aren't cached.
+        self._near_cache_generation = 0
+        self._invalidations: Optional[InvalidationListener] = None
 
     def _set_namespace(self, namespace: str) -> None:
         """Try to set the namespace, but do not permit collisions."""
@@ -105,44 +246,63 @@ class RedisCache:
         self._namespace = namespace
 
     @staticmethod
-    def _to_typestring(key_or_value: RedisKeyOrValue, prefixes: _PrefixTuple) -> str:
+    def _to_typestring(key_or_value: RedisKeyOrValue, prefixes: Dict[type, str]) -> str:
         """Turn a valid Redis type into a typestring."""
-        for prefix, _type in prefixes:
-            if isinstance(key_or_value, _type):
-                return f"{prefix}{key_or_value}"
-        raise TypeError(f"RedisCache._to_typestring only supports the following: {prefixes}.")
+        prefix = prefixes.get(type(key_or_value))
+        if prefix is None:
+            # Subclasses, such as bools, aren't in the table, so find the type they're a subclass of.
+            prefix = next((prefix for _type, prefix in prefixes.items() if isinstance(key_or_value, _type)), None)
+            if prefix is None:
+                raise TypeError(f"RedisCache._to_typestring only supports the following: {tuple(prefixes)}.")
+
+        return f"{prefix}{key_or_value}"
 
     @staticmethod
-    def _from_typestring(key_or_value: Union[bytes, str], prefixes: _PrefixTuple) -> RedisKeyOrValue:
+    def _from_typestring(key_or_value: Union[bytes, str], types: Dict[str, type]) -> RedisKeyOrValue:
         """Deserialize a typestring into a valid Redis type."""
         # Stuff that comes out of Redis will be bytestrings, so let's decode those.
         if isinstance(key_or_value, bytes):
             key_or_value = key_or_value.decode('utf-8')
 
         # Now we convert our unicode string back into the type it originally was.
-        for prefix, _type in prefixes:
-            if key_or_value.startswith(prefix):
-                return _type(key_or_value[len(prefix):])
-        raise TypeError(f"RedisCache._from_typestring only supports the following: {prefixes}.")
-
-    # Add some nice partials to call our generic typestring converters.
-    # These are basically methods that will fill in some of the parameters for you, so that
-    # any call to _key_to_typestring will be like calling _to_typestring with the two parameters
-    # at `prefixes` and `types_string` pre-filled.
-    #
-    # See https://docs.python.org/3/library/functools.html#functools.partialmethod
-    _key_to_typestring = partialmethod(_to_typestring, prefixes=_KEY_PREFIXES)
-    _value_to_typestring = partialmethod(_to_typestring, prefixes=_VALUE_PREFIXES)
-    _key_from_typestring = partialmethod(_from_typestring, prefixes=_KEY_PREFIXES)
-    _value_from_typestring = partialmethod(_from_typestring, prefixes=_VALUE_PREFIXES)
+        _type = types.get(key_or_value[:2])
+        if _type is None:
+            raise TypeError(f"RedisCache._from_typestring only supports the following: {tuple(types)}.")
+        return _type(key_or_value[2:])
+
+    # Add some nice shortcuts to call our generic typestring converters with the prefixes of keys or values.
+    # They aren't partialmethods, since those create a new partial object every time they're accessed.
+    @staticmethod
+    def _key_to_typestring(key: RedisKeyType) -> str:
+        return RedisCache._to_typestring(key, _KEY_PREFIXES)
+
+    @staticmethod
+    def _value_to_typestring(value: RedisValueType) -> str:
+        return RedisCache._to_typestring(value, _VALUE_PREFIXES)
+
+    @staticmethod
+    def _key_from_typestring(key: Union[bytes, str]) -> RedisKeyType:
+        return RedisCache._from_typestring(key, _KEY_TYPES)
+
+    @staticmethod
+    def _value_from_typestring(value: Union[bytes, str]) -> RedisValueType:
+        return RedisCache._from_typestring(value, _VALUE_TYPES)
+
+    def _encode_value(self, value: RedisValueType) -> Union[bytes, str]:
+        """Encode a value to store in Redis, as bytes if the cache has binary values, otherwise as a typestring."""
+        return redis_codec.encode(value) if self.binary else self._value_to_typestring(value)
+
+    def _decode_value(self, value: bytes) -> RedisValueType:
+        """Decode a value which came out of Redis."""
+        return redis_codec.decode(value) if self.binary else self._value_from_typestring(value)
 
     def _dict_from_typestring(self, dictionary: Dict) -> Dict:
         """Turns all contents of a dict into valid Redis types."""
-        return {self._key_from_typestring(key): self._value_from_typestring(value) for key, value in dictionary.items()}
+        return {self._key_from_typestring(key): self._decode_value(value) for key, value in dictionary.items()}
 
     def _dict_to_typestring(self, dictionary: Dict) -> Dict:
-        """Turns all contents of a dict into typestrings."""
-        return {self._key_to_typestring(key): self._value_to_typestring(value) for key, value in dictionary.items()}
+        """Turns all contents of a dict into typestrings, or bytes for the values of caches with binary values."""
+        return {self._key_to_typestring(key): self._encode_value(value) for key, value in dictionary.items()}
 
     async def _validate_cache(self) -> None:
         """Validate that the RedisCache is ready to be used."""
@@ -167,6 +327,13 @@ class RedisCache:
         if not self.bot.redis_closed:
             await self.bot.redis_ready.wait()
 
+        if self.near_cache_size and self._invalidations is None:
+            self._invalidations = InvalidationListener.for_bot(self.bot)
+            self._invalidations.add(self)
+
+        if self.ttl is not None and self._sweeper is None:
+            self._sweeper = self.bot.loop.create_task(self._sweep_periodically())
+
     def __set_name__(self, owner: Any, attribute_name: str) -> None:
         """
         Set the namespace to Class.attribute_name.
@@ -227,33 +394,201 @@ class RedisCache:
         """Return a beautiful representation of this object instance."""
         return f"RedisCache(namespace={self._namespace!r})"
 
-    async def set(self, key: RedisKeyType, value: RedisValueType) -> None:
-        """Store an item in the Redis cache."""
+    def _near_cache_get(self, key: str) -> Any:
+        """Return the near cached value of the typestring `key`, `_MISSING` if it doesn't exist, or `_UNCACHED`."""
+        if not self.near_cache_size:
+            return _UNCACHED
+
+        # While Redis is unreachable, values are served even if they're stale, rather than failing.
+        if self.bot.redis_degraded:
+            entry = self._near_cache.get(key)
+            if entry is None:
+                self.bot.stats.incr(f"cache.{self._namespace}.misses")
+                return _UNCACHED
+
+            self.bot.stats.incr(f"cache.{self._namespace}.stale_hits")
+            return entry[1]
+
+        # Otherwise the near cache is only used while invalidations can be received.
+        if not self._invalidations.subscribed:
+            return _UNCACHED
+
+        entry = self._near_cache.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._near_cache[key]
+            entry = None
+
+        if entry is None:
+            self.bot.stats.incr(f"cache.{self._namespace}.misses")
+            return _UNCACHED
+
+        self._near_cache.move_to_end(key)
+        self.bot.stats.incr(f"cache.{self._namespace}.hits")
+        return entry[1]
+
+    def _near_cache_set(self, key: str, value: Any, generation: int) -> None:
+        """Cache the `value` of the typestring `key`, unless anything was invalidated since `generation`."""
+        if not self.near_cache_size or not self._invalidations.subscribed:
+            return
+        # The value may be outdated if anything was invalidated while it was being got.
+        if generation != self._near_cache_generation:
+            return
+
+        self._near_cache[key] = (time.monotonic() + self.near_cache_ttl, value)
+        self._near_cache.move_to_end(key)
+        if len(self._near_cache) > self.near_cache_size:
+            self._near_cache.popitem(last=False)
+
+    def _near_cache_forget(self, keys: Optional[Iterable[str]]) -> None:
+        """Forget the typestrings `keys` in the near cache, or every key if they're None."""
+        self._near_cache_generation += 1
+        if keys is None:
+            self._near_cache.clear()
+        else:
+            for key in keys:
+                self._near_cache.pop(key, None)
+
+    async def _invalidate(self, keys: Optional[List[str]]) -> int:
+        """
+        Forget the typestrings `keys`, or every key if they're None, in the near caches of every process.
+
+        Return the generation of the near cache after forgetting them, to write the new values through with.
+        """
+        if not self.near_cache_size:
+            return 0
+
+        self._near_cache_forget(keys)
+        generation = self._near_cache_generation
+        message = json.dumps([self._invalidations.id, self._namespace, keys])
+        await self._redis.publish(INVALIDATIONS_CHANNEL, message)
+        return generation
+
+    async def _eval(self, script: str, sha: str, keys: List[str], args: List[Any]) -> Any:
+        """Run a Lua `script` with the SHA1 digest `sha`, sending it in full only if Redis hasn't cached it."""
+        try:
+            return await self._redis.evalsha(sha, keys=keys, args=args)
+        except ReplyError as e:
+            if not str(e).startswith("NOSCRIPT"):
+                raise
+
+            # Redis hasn't cached the script yet, so send it in full. It's cached afterwards.
+            return await self._redis.eval(script, keys=keys, args=args)
+
+    @property
+    def _expiries_key(self) -> str:
+        """The key of the sorted set of the expiry times of the items, for caches with a TTL."""
+        return f"{self._namespace}.expiries"
+
+    def _expiry_command(self, keys: List[str], ttl: Optional[float]) -> Tuple[str, tuple]:
+        """
+        Return the command and arguments expiring the typestrings `keys` after `ttl` seconds.
+
+        If `ttl` is None, the TTL of the cache is used instead. If it's infinite, the keys never expire.
+        """
+        if self.ttl is None:
+            error_message = "Only the items of a RedisCache created with a TTL can expire."
+            log.error(error_message)
+            raise ValueError(error_message)
+
+        ttl = self.ttl if ttl is None else ttl
+        if ttl == math.inf:
+            return "zrem", (self._expiries_key, *keys)
+
+        expires_at = time.time() + ttl
+        return "zadd", (self._expiries_key, *itertools.chain.from_iterable((expires_at, key) for key in keys))
+
+    async def _write(self, command: str, *args, keys: List[str], ttl: Optional[float]) -> None:
+        """Run a Redis `command` writing the typestrings `keys` in the hash, and set their expiry times."""
+        if self.ttl is None and ttl is None:
+            await getattr(self._redis, command)(self._namespace, *args)
+            return
+
+        expiry_command, expiry_args = self._expiry_command(keys, ttl)
+        transaction = self._redis.multi_exec()
+        getattr(transaction, command)(self._namespace, *args)
+        getattr(transaction, expiry_command)(*expiry_args)
+        await transaction.execute()
+
+    async def _sweep(self) -> int:
+        """Delete the expired items and return how many there were."""
+        expired = []
+        while True:
+            batch = await self._eval(
+                _SWEEP_SCRIPT,
+                _SWEEP_SCRIPT_SHA,
+                keys=[self._namespace, self._expiries_key],
+                args=[time.time(), SWEEP_BATCH_SIZE],
+            )
+            expired.extend(key.decode("utf-8") for key in batch)
+            if len(batch) < SWEEP_BATCH_SIZE:
+                break
+
+        if expired:
+            log.trace(f"Deleted {len(expired)} expired items of {self._namespace}.")
+            await self._invalidate(expired)
+        return len(expired)
+
+    async def _sweep_periodically(self) -> None:
+        """Delete the expired items every `SWEEP_INTERVAL` seconds until Redis is closed."""
+        while not self.bot.redis_closed:
+            try:
+                await self._sweep()
+            except (RedisError, OSError) as e:
+                log.warning(f"Failed to delete the expired items of {self._namespace}: {e}")
+
+            await asyncio.sleep(SWEEP_INTERVAL)
+
+    async def set(self, key: RedisKeyType, value: RedisValueType, ttl: Optional[float] = None) -> None:
+        """
+        Store an item in the Redis cache.
+
+        In caches with a TTL, the item expires after `ttl` seconds, or the TTL of the cache if it's None.
+        """
         await self._validate_cache()
 
         # Convert to a typestring and then set it
         key = self._key_to_typestring(key)
-        value = self._value_to_typestring(value)
+        encoded = self._encode_value(value)
 
-        log.trace(f"Setting {key} to {value}.")
-        await self._redis.hset(self._namespace, key, value)
+        log.trace(f"Setting {key} to {encoded}.")
+        await self._write("hset", key, encoded, keys=[key], ttl=ttl)
+        self._near_cache_set(key, value, await self._invalidate([key]))
 
     async def get(self, key: RedisKeyType, default: Optional[RedisValueType] = None) -> Optional[RedisValueType]:
         """Get an item from the Redis cache."""
         await self._validate_cache()
         key = self._key_to_typestring(key)
 
-        log.trace(f"Attempting to retrieve {key}.")
-        value = await self._redis.hget(self._namespace, key)
+        value = self._near_cache_get(key)
+        if value is _UNCACHED:
+            log.trace(f"Attempting to retrieve {key}.")
+            generation = self._near_cache_generation
+            value = await self._redis.hget(self._namespace, key)
+            value = _MISSING if value is None else self._decode_value(value)
+            self._near_cache_set(key, value, generation)
 
-        if value is None:
+        if value is _MISSING:
             log.trace(f"Value not found, returning default value {default}")
             return default
         else:
-            value = self._value_from_typestring(value)
             log.trace(f"Value found, returning value {value}")
             return value
 
+    async def get_many(self, keys: Iterable[RedisKeyType]) -> Dict[RedisKeyType, RedisValueType]:
+        """Get several items from the Redis cache in a single round trip, leaving out the keys which aren't found."""
+        await self._validate_cache()
+        keys = list(keys)
+        if not keys:
+            return {}
+
+        log.trace(f"Attempting to retrieve {len(keys)} keys.")
+        values = await self._redis.hmget(self._namespace, *map(self._key_to_typestring, keys))
+        return self._found_items(keys, values)
+
+    def _found_items(self, keys: List[RedisKeyType], values: List[Optional[bytes]]) -> Dict:
+        """Return a dict of the `keys` which have a value in the `values` returned by HMGET, with those values."""
+        return {key: self._decode_value(value) for key, value in zip(keys, values) if value is not None}
+
     async def delete(self, key: RedisKeyType) -> None:
         """
         Delete an item from the Redis cache.
@@ -266,7 +601,25 @@ class RedisCache:
         key = self._key_to_typestring(key)
 
         log.trace(f"Attempting to delete {key}.")
-        return await self._redis.hdel(self._namespace, key)
+        deleted = await self._redis.hdel(self._namespace, key)
+        await self._invalidate([key])
+        return deleted
+
+    async def delete_many(self, keys: Iterable[RedisKeyType]) -> int:
+        """
+        Delete several items from the Redis cache in a single round trip.
+
+        Keys which don't exist are ignored. Return the number of items deleted.
+        """
+        await self._validate_cache()
+        keys = [self._key_to_typestring(key) for key in keys]
+        if not keys:
+            return 0
+
+        log.trace(f"Attempting to delete {len(keys)} keys.")
+        deleted = await self._redis.hdel(self._namespace, *keys)
+        await self._invalidate(keys)
+        return deleted
 
     async def contains(self, key: RedisKeyType) -> bool:
         """
@@ -276,16 +629,23 @@ class RedisCache:
         """
         await self._validate_cache()
         key = self._key_to_typestring(key)
-        exists = await self._redis.hexists(self._namespace, key)
+        value = self._near_cache_get(key)
+        if value is _UNCACHED:
+            exists = await self._redis.hexists(self._namespace, key)
+        else:
+            exists = value is not _MISSING
 
         log.trace(f"Testing if {key} exists in the RedisCache - Result is {exists}")
         return exists
 
-    async def items(self) -> ItemsView:
+    def items(self, batch_size: int = SCAN_BATCH_SIZE) -> RedisCacheItems:
         """
         Fetch all the key/value pairs in the cache.
 
-        Returns a normal ItemsView, like you would get from dict.items().
+        Awaiting the result returns a normal ItemsView, like you would get from dict.items().
+        For large caches, iterate over it with `async for` instead, which fetches the items in
+        batches of about `batch_size` and decodes them as they're iterated over, so neither
+        Redis nor the bot have to handle the whole cache at once.
 
         Keep in mind that these items are just a _copy_ of the data in the
         RedisCache - any changes you make to them will not be reflected
@@ -296,14 +656,11 @@ class RedisCache:
         items = await my_cache.items()
         for key, value in items:
             # Iterate like a normal dictionary
-        """
-        await self._validate_cache()
-        items = self._dict_from_typestring(
-            await self._redis.hgetall(self._namespace)
-        ).items()
 
-        log.trace(f"Retrieving all key/value pairs from cache, total of {len(items)} items.")
-        return items
+        async for key, value in my_cache.items():
+            # Iterate over the items in batches
+        """
+        return RedisCacheItems(self, batch_size)
 
     async def length(self) -> int:
         """Return the number of items in the Redis cache."""
@@ -312,6 +669,13 @@ class RedisCache:
         log.trace(f"Returning length. Result is {number_of_items}.")
         return number_of_items
 
+    async def keys(self) -> List[RedisKeyType]:
+        """Return the keys of the items in the Redis cache, without fetching their values."""
+        await self._validate_cache()
+        keys = [self._key_from_typestring(key) for key in await self._redis.hkeys(self._namespace)]
+        log.trace(f"Returning the keys of the cache, total of {len(keys)} keys.")
+        return keys
+
     async def to_dict(self) -> Dict:
         """Convert to dict and return."""
         return {key: value for key, value in await self.items()}
@@ -320,22 +684,25 @@ class RedisCache:
         """Deletes the entire hash from the Redis cache."""
         await self._validate_cache()
         log.trace("Clearing the cache of all key/value pairs.")
-        await self._redis.delete(self._namespace)
+        if self.ttl is None:
+            await self._redis.delete(self._namespace)
+        else:
+            await self._redis.delete(self._namespace, self._expiries_key)
+        await self._invalidate(None)
 
     async def pop(self, key: RedisKeyType, default: Optional[RedisValueType] = None) -> RedisValueType:
-        """Get the item, remove it from the cache, and provide a default if not found."""
-        log.trace(f"Attempting to pop {key}.")
-        value = await self.get(key, default)
+        """
+        Get the item, remove it from the cache, and provide a default if not found.
 
-        log.trace(
-            f"Attempting to delete item with key '{key}' from the cache. "
-            "If this key doesn't exist, nothing will happen."
-        )
-        await self.delete(key)
+        The item is got and removed in a single transaction, so concurrent pops can't both get it.
+        """
+        log.trace(f"Attempting to pop {key}.")
+        async with self.pipeline() as pipeline:
+            value = pipeline.pop(key, default)
 
-        return value
+        return value.result()
 
-    async def update(self, items: Dict[RedisKeyType, RedisValueType]) -> None:
+    async def update(self, items: Dict[RedisKeyType, RedisValueType], ttl: Optional[float] = None) -> None:
         """
         Update the Redis cache with multiple values.
 
@@ -346,10 +713,31 @@ class RedisCache:
 
         Please note that keys and the values in the `items` dictionary
         must consist of valid RedisKeyTypes and RedisValueTypes.
+
+        In caches with a TTL, the items expire after `ttl` seconds, or the TTL of the cache if it's None.
         """
         await self._validate_cache()
         log.trace(f"Updating the cache with the following items:\n{items}")
-        await self._redis.hmset_dict(self._namespace, self._dict_to_typestring(items))
+        encoded = self._dict_to_typestring(items)
+        await self._write("hmset_dict", encoded, keys=list(encoded), ttl=ttl)
+
+        generation = await self._invalidate(list(encoded))
+        for key, value in items.items():
+            self._near_cache_set(self._key_to_typestring(key), value, generation)
+
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = True) -> AsyncIterator[RedisCachePipeline]:
+        """
+        Queue commands on the cache and send them in a single round trip when leaving the context.
+
+        If `transaction` is True, the commands are run in a MULTI/EXEC transaction, so no other
+        client's commands run between them. If an exception is raised in the context, the queued
+        commands are discarded. See `RedisCachePipeline` for the available commands.
+        """
+        await self._validate_cache()
+        pipeline = RedisCachePipeline(self, transaction)
+        yield pipeline
+        await pipeline.execute()
 
     async def increment(self, key: RedisKeyType, amount: Optional[int, float] = 1) -> None:
         """
@@ -360,36 +748,37 @@ class RedisCache:
 
         This also supports negative amounts, although it would provide better
         readability to use .decrement() for that.
+
+        The value is incremented by a script running on the Redis server, so increments
+        take a single round trip and are atomic, even across several bot processes. Values
+        of caches with binary values can't be incremented.
         """
         log.trace(f"Attempting to increment/decrement the value with the key {key} by {amount}.")
+        await self._validate_cache()
 
-        # We initialize the lock here, because we need to ensure we get it
-        # running on the same loop as the calling coroutine.
-        #
-        # If we initialized the lock in the __init__, the loop that the coroutine this method
-        # would be called from might not exist yet, and so the lock would be on a different
-        # loop, which would raise RuntimeErrors.
-        if self._increment_lock is None:
-            self._increment_lock = asyncio.Lock()
-
-        # Since this has several API calls, we need a lock to prevent race conditions
-        async with self._increment_lock:
-            value = await self.get(key)
-
-            # Can't increment a non-existing value
-            if value is None:
-                error_message = "The provided key does not exist!"
-                log.error(error_message)
-                raise KeyError(error_message)
-
-            # If it does exist, and it's an int or a float, increment and set it.
-            if isinstance(value, int) or isinstance(value, float):
-                value += amount
-                await self.set(key, value)
-            else:
-                error_message = "You may only increment or decrement values that are integers or floats."
-                log.error(error_message)
-                raise TypeError(error_message)
+        if self.binary:
+            error_message = "You may only increment or decrement the values of caches with typestring values."
+            log.error(error_message)
+            raise TypeError(error_message)
+
+        key = self._key_to_typestring(key)
+        amount = self._value_to_typestring(amount)
+        value = await self._eval(_INCREMENT_SCRIPT, _INCREMENT_SCRIPT_SHA, keys=[self._namespace], args=[key, amount])
+
+        # Can't increment a non-existing value
+        if value is None:
+            error_message = "The provided key does not exist!"
+            log.error(error_message)
+            raise KeyError(error_message)
+
+        # The script returns values which aren't ints or floats without changing them.
+        value = self._value_from_typestring(value)
+        if not isinstance(value, (int, float)):
+            error_message = "You may only increment or decrement values that are integers or floats."
+            log.error(error_message)
+            raise TypeError(error_message)
+
+        self._near_cache_set(key, value, await self._invalidate([key]))
 
     async def decrement(self, key: RedisKeyType, amount: Optional[int, float] = 1) -> None:
         """
@@ -398,3 +787,238 @@ class RedisCache:
         Basically just does the opposite of .increment.
         """
         await self.increment(key, -amount)
+
+
+class InvalidationListener:
+    """Forgets the keys invalidated by other processes in the near caches of a bot."""
+
+    _listeners = weakref.WeakKeyDictionary()
+
+    def __init__(self, bot: Bot):
+        self.bot = bot
+        # Identifies the invalidations published by this process, which it doesn't need to apply again.
+        self.id = uuid.uuid4().hex
+        # Maps the namespaces to their near caches.
+        self.caches: Dict[str, weakref.WeakSet] = {}
+        self.subscribed = False
+        self.task = bot.loop.create_task(self.listen())
+
+    @classmethod
+    def for_bot(cls, bot: Bot) -> InvalidationListener:
+        """Return the listener of the `bot`, creating it if it doesn't have one yet."""
+        if bot not in cls._listeners:
+            cls._listeners[bot] = cls(bot)
+        return cls._listeners[bot]
+
+    def add(self, cache: RedisCache) -> None:
+        """Forget the invalidated keys of the `cache` in its near cache."""
+        self.caches.setdefault(cache._namespace, weakref.WeakSet()).add(cache)
+
+    def forget(self, namespace: Optional[str], keys: Optional[List[str]]) -> None:
+        """Forget the `keys` of the near caches of `namespace`, or everything in every near cache if it's None."""
+        if namespace is None:
+            caches = [cache for caches in self.caches.values() for cache in caches]
+        else:
+            caches = self.caches.get(namespace, ())
+
+        for cache in caches:
+            cache._near_cache_forget(keys)
+
+    async def listen(self) -> None:
+        """Listen for invalidations, subscribing again whenever the subscription is lost."""
+        while not self.bot.redis_closed:
+            try:
+                channel, = await self.bot.redis_session.subscribe(INVALIDATIONS_CHANNEL)
+                # Invalidations could have been missed while we weren't subscribed.
+                self.forget(None, None)
+                self.subscribed = True
+                log.trace("Subscribed to the invalidations of near caches.")
+
+                while await channel.wait_message():
+                    process_id, namespace, keys = json.loads(await channel.get())
+                    if process_id != self.id:
+                        self.forget(namespace, keys)
+            except (RedisError, OSError) as e:
+                log.warning(f"Lost the subscription to the invalidations of near caches: {e}")
+            finally:
+                self.subscribed = False
+
+            await asyncio.sleep(RESUBSCRIBE_DELAY)
+
+
+class RedisCacheItems:
+    """
+    The key/value pairs of a `RedisCache`, created by `RedisCache.items`.
+
+    Awaiting it fetches every pair with HGETALL. Iterating over it with `async for` fetches them in
+    batches with HSCAN instead. Like any SCAN, this may return a pair more than once if the cache is
+    changed while it's iterated over, and pairs added or removed in the meantime may be left out.
+    """
+
+    def __init__(self, cache: RedisCache, batch_size: int):
+        self._cache = cache
+        self.batch_size = batch_size
+
+    def __await__(self) -> Generator[Any, None, ItemsView]:
+        return self._fetch_all().__await__()
+
+    async def _fetch_all(self) -> ItemsView:
+        """Fetch every pair in a single command."""
+        await self._cache._validate_cache()
+        items = self._cache._dict_from_typestring(
+            await self._cache._redis.hgetall(self._cache._namespace)
+        ).items()
+
+        log.trace(f"Retrieving all key/value pairs from cache, total of {len(items)} items.")
+        return items
+
+    async def __aiter__(self) -> AsyncIterator[Tuple[RedisKeyType, RedisValueType]]:
+        """Fetch the pairs in batches, decoding them as they're iterated over."""
+        await self._cache._validate_cache()
+        log.trace(f"Scanning the key/value pairs of {self._cache._namespace} in batches of {self.batch_size}.")
+
+        cursor = 0
+        while True:
+            cursor, pairs = await self._cache._redis.hscan(self._cache._namespace, cursor, count=self.batch_size)
+            for key, value in pairs:
+                yield self._cache._key_from_typestring(key), self._cache._decode_value(value)
+
+            if not cursor:
+                break
+
+
+class RedisCachePipeline:
+    """
+    Commands on a `RedisCache` queued to be sent to Redis together, created by `RedisCache.pipeline`.
+
+    The methods work like the cache's, except that they aren't coroutines: they queue the command and
+    return a future of its result, which is done once the pipeline is executed.
+    """
+
+    def __init__(self, cache: RedisCache, transaction: bool):
+        self._cache = cache
+        self._transaction = transaction
+        self._commands: List[Tuple[str, tuple, Optional[Callable], asyncio.Future]] = []
+        # The typestrings of the keys changed by the queued commands, to invalidate in near caches.
+        self._changed_keys: List[str] = []
+
+    def _queue(self, command: str, *args, convert: Optional[Callable] = None) -> asyncio.Future:
+        """Queue a Redis `command` on the cache's hash and return a future of its result passed to `convert`."""
+        result = asyncio.get_event_loop().create_future()
+        self._commands.append((command, (self._cache._namespace, *args), convert, result))
+        return result
+
+    @staticmethod
+    def _done(result: object) -> asyncio.Future:
+        """Return a future which is already done with `result`, for commands with nothing to send."""
+        future = asyncio.get_event_loop().create_future()
+        future.set_result(result)
+        return future
+
+    def _get(self, key: RedisKeyType, default: Optional[RedisValueType]) -> asyncio.Future:
+        def convert(value: Optional[bytes]) -> Optional[RedisValueType]:
+            return default if value is None else self._cache._decode_value(value)
+
+        return self._queue("hget", self._cache._key_to_typestring(key), convert=convert)
+
+    def _queue_expiry(self, keys: List[str], ttl: Optional[float]) -> None:
+        """Queue setting the expiry times of the typestrings `keys`, if the cache has a TTL or `ttl` is given."""
+        if self._cache.ttl is None and ttl is None:
+            return
+
+        command, args = self._cache._expiry_command(keys, ttl)
+        self._commands.append((command, args, None, asyncio.get_event_loop().create_future()))
+
+    def set(self, key: RedisKeyType, value: RedisValueType, ttl: Optional[float] = None) -> asyncio.Future:
+        """Queue storing an item, which expires after `ttl` seconds in caches with a TTL."""
+        key = self._cache._key_to_typestring(key)
+        self._changed_keys.append(key)
+        result = self._queue("hset", key, self._cache._encode_value(value))
+        self._queue_expiry([key], ttl)
+        return result
+
+    def get(self, key: RedisKeyType, default: Optional[RedisValueType] = None) -> asyncio.Future:
+        """Queue getting an item, or `default` if it's not found."""
+        return self._get(key, default)
+
+    def get_many(self, keys: Iterable[RedisKeyType]) -> asyncio.Future:
+        """Queue getting several items, as a dict leaving out the keys which aren't found."""
+        keys = list(keys)
+        if not keys:
+            return self._done({})
+
+        return self._queue(
+            "hmget",
+            *map(self._cache._key_to_typestring, keys),
+            convert=lambda values: self._cache._found_items(keys, values)
+        )
+
+    def update(self, items: Dict[RedisKeyType, RedisValueType], ttl: Optional[float] = None) -> asyncio.Future:
+        """Queue storing several items, which expire after `ttl` seconds in caches with a TTL."""
+        items = self._cache._dict_to_typestring(items)
+        self._changed_keys.extend(items)
+        result = self._queue("hmset_dict", items)
+        self._queue_expiry(list(items), ttl)
+        return result
+
+    def delete(self, key: RedisKeyType) -> asyncio.Future:
+        """Queue deleting an item."""
+        key = self._cache._key_to_typestring(key)
+        self._changed_keys.append(key)
+        return self._queue("hdel", key)
+
+    def delete_many(self, keys: Iterable[RedisKeyType]) -> asyncio.Future:
+        """Queue deleting several items, with the number of items deleted as the result."""
+        keys = [self._cache._key_to_typestring(key) for key in keys]
+        if not keys:
+            return self._done(0)
+
+        self._changed_keys.extend(keys)
+        return self._queue("hdel", *keys)
+
+    def contains(self, key: RedisKeyType) -> asyncio.Future:
+        """Queue checking whether a key exists."""
+        return self._queue("hexists", self._cache._key_to_typestring(key), convert=bool)
+
+    def pop(self, key: RedisKeyType, default: Optional[RedisValueType] = None) -> asyncio.Future:
+        """Queue getting and deleting an item, or getting `default` if it's not found."""
+        value = self._get(key, default)
+        self.delete(key)
+        return value
+
+    async def execute(self) -> None:
+        """
+        Send the queued commands and set the results of their futures.
+
+        Errors of single commands are set on their futures. If sending the commands fails, the
+        error is raised and the futures of the commands without a result are cancelled.
+        """
+        commands, self._commands = self._commands, []
+        changed_keys, self._changed_keys = self._changed_keys, []
+        if not commands:
+            return
+
+        redis = self._cache._redis
+        pipeline = redis.multi_exec() if self._transaction else redis.pipeline()
+        futures = [getattr(pipeline, command)(*args) for command, args, _, _ in commands]
+
+        log.trace(f"Sending {len(commands)} commands to {self._cache._namespace} in one round trip.")
+        try:
+            await pipeline.execute(return_exceptions=True)
+        finally:
+            for future, (_, _, convert, result) in zip(futures, commands):
+                if not future.done() or future.cancelled():
+                    future.cancel()
+                    result.cancel()
+                elif future.exception() is not None:
+                    result.set_exception(future.exception())
+                elif convert is None:
+                    result.set_result(future.result())
+                else:
+                    try:
+                        result.set_result(convert(future.result()))
+                    except Exception as e:
+                        result.set_exception(e)
+
+        if changed_keys:
+            await self._cache._invalidate(changed_keys)
@@ -0,0 +1,81 @@
+"""
+Compact binary encoding of the values of a `RedisCache` created with `binary=True`.
+
+Values are packed with msgpack, which supports None, bools, ints, floats, strings, bytes, and lists and
+dicts of them. Tuples are decoded as lists. Datetimes are packed as msgpack extension types holding the
+microseconds since the epoch; naive datetimes are assumed to be in UTC, like the ones of `datetime.utcnow`,
+and aware ones are decoded in UTC.
+"""
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict
+
+import msgpack
+
+# The codes of the msgpack extension types.
+_NAIVE_DATETIME = 1
+_AWARE_DATETIME = 2
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECONDS = struct.Struct("<q")
+
+
+def _pack_datetime(value: datetime) -> msgpack.ExtType:
+    """Pack a datetime as the microseconds since the epoch, in UTC for aware datetimes."""
+    if value.tzinfo is None:
+        code = _NAIVE_DATETIME
+    else:
+        code = _AWARE_DATETIME
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return msgpack.ExtType(code, _MICROSECONDS.pack((value - _EPOCH) // timedelta(microseconds=1)))
+
+
+def _unpack_naive_datetime(data: bytes) -> datetime:
+    return _EPOCH + timedelta(microseconds=_MICROSECONDS.unpack(data)[0])
+
+
+def _unpack_aware_datetime(data: bytes) -> datetime:
+    return _unpack_naive_datetime(data).replace(tzinfo=timezone.utc)
+
+
+# Map the types msgpack doesn't support to functions returning their extension types, and the codes
+# of the extension types to functions unpacking their data.
+_PACKERS: Dict[type, Callable[[Any], msgpack.ExtType]] = {
+    datetime: _pack_datetime,
+}
+_UNPACKERS: Dict[int, Callable[[bytes], Any]] = {
+    _NAIVE_DATETIME: _unpack_naive_datetime,
+    _AWARE_DATETIME: _unpack_aware_datetime,
+}
+
+
+def _default(value: Any) -> msgpack.ExtType:
+    """Return the extension type of a `value` msgpack doesn't support."""
+    packer = _PACKERS.get(type(value))
+    if packer is None:
+        raise TypeError(f"RedisCache can't encode values of type {type(value).__name__}.")
+    return packer(value)
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    """Unpack the `data` of an extension type."""
+    unpacker = _UNPACKERS.get(code)
+    if unpacker is None:
+        raise TypeError(f"RedisCache can't decode values of the extension type {code}.")
+    return unpacker(data)
+
+
+# Packers keep a buffer around between calls, so reusing one is faster than calling `msgpack.packb`.
+_packer = msgpack.Packer(default=_default, use_bin_type=True)
+
+
+def encode(value: Any) -> bytes:
+    """Encode a `value` to bytes."""
+    return _packer.pack(value)
+
+
+def decode(data: bytes) -> Any:
+    """Decode a value from the bytes it was encoded to."""
+    # Dicts with int keys, such as IDs, are allowed.
+    return msgpack.unpackb(data, ext_hook=_ext_hook, raw=False, strict_map_key=False)
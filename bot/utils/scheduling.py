@@ -1,41 +1,100 @@
 import asyncio
 import contextlib
 import logging
+import math
+import time
 import typing as t
 from abc import abstractmethod
+from datetime import datetime, timedelta
 from functools import partial
 
+from bot.timers import Timer
 from bot.utils import CogABCMeta
+from bot.utils.redis_cache import RedisCache, RedisKeyType
 
 log = logging.getLogger(__name__)
 
+# Items loaded from the site are only scheduled once they're due within this many seconds.
+SCHEDULE_HORIZON = 60 * 60
+# How often the site is swept for items which came within the horizon. It must be shorter than the horizon.
+SWEEP_INTERVAL = 15 * 60
+
+
+class ScheduleWindow(t.NamedTuple):
+    """
+    The range of naive UTC due times of the items a sweep of the site should schedule.
+
+    A window starts where the previous sweep's window ended: items due before then were scheduled
+    by that sweep or when they were created, and may have already run since. The first window
+    has no start, so overdue items are scheduled too.
+    """
+
+    start: t.Optional[datetime]
+    end: datetime
+
+    @classmethod
+    def after(cls, previous: t.Optional["ScheduleWindow"]) -> "ScheduleWindow":
+        """Return the window following the `previous` one, ending `SCHEDULE_HORIZON` seconds from now."""
+        start = previous.end if previous else None
+        return cls(start, datetime.utcnow() + timedelta(seconds=SCHEDULE_HORIZON))
+
+    def includes(self, due: datetime) -> bool:
+        """Return True if an item `due` at the given time should be scheduled in this window."""
+        return (self.start is None or due > self.start) and due <= self.end
+
 
 class Scheduler(metaclass=CogABCMeta):
-    """Task scheduler."""
+    """
+    Task scheduler.
+
+    Tasks wait in the bot's `TimerQueue` until they're due, so no asyncio task exists for a task
+    until it runs. The class this is mixed into must have a `bot` attribute.
+
+    If `persist_tasks` is True, the due times of the scheduled tasks are also kept in a Redis sorted
+    set named after the cog, so the tasks can be recovered after a restart with `get_persisted_tasks`.
+    Their IDs must then be valid `RedisCache` keys. The writes are made in the background, and
+    several changes to the same task before they're written only result in one write.
+    """
+
+    persist_tasks = False
 
     def __init__(self):
         # Keep track of the child cog's name so the logs are clear.
         self.cog_name = self.__class__.__name__
 
-        self._scheduled_tasks: t.Dict[t.Hashable, asyncio.Task] = {}
+        # Maps the IDs of the tasks to their timers, or to their asyncio tasks once they're running.
+        self._scheduled_tasks: t.Dict[t.Hashable, t.Union[Timer, asyncio.Task]] = {}
+
+        # Maps the IDs of tasks to their new due times, or to None if they were removed, until they're persisted.
+        self._unpersisted_tasks: t.Dict[RedisKeyType, t.Optional[float]] = {}
+        self._persist_writer: t.Optional[asyncio.Task] = None
+
+    @abstractmethod
+    def _task_delay(self, task_object: t.Any) -> float:
+        """
+        Return the number of seconds to wait before running the task.
+
+        For example, in Reminders this is the time until the reminder expires.
+        """
 
     @abstractmethod
     async def _scheduled_task(self, task_object: t.Any) -> None:
         """
         A coroutine which handles the scheduling.
 
-        This is added to the scheduled tasks, and should wait the task duration, execute the desired
-        code, then clean up the task.
+        This is run once the task's delay has passed, and should execute the desired code,
+        then clean up the task.
 
-        For example, in Reminders this will wait for the reminder duration, send the reminder,
-        then make a site API request to delete the reminder from the database.
+        For example, in Reminders this will send the reminder, then make a site API request to
+        delete the reminder from the database.
         """
 
     def schedule_task(self, task_id: t.Hashable, task_data: t.Any) -> None:
         """
         Schedules a task.
 
-        `task_data` is passed to the `Scheduler._scheduled_task()` coroutine.
+        `task_data` is passed to `Scheduler._task_delay()` when the task is scheduled, and to the
+        `Scheduler._scheduled_task()` coroutine once it's due.
         """
         log.trace(f"{self.cog_name}: scheduling task #{task_id}...")
 
@@ -45,11 +104,20 @@ class Scheduler(metaclass=CogABCMeta):
             )
             return
 
+        delay = self._task_delay(task_data)
+        timer = self.bot.timers.call_later(delay, self._start_task, task_id, task_data)
+
+        self._scheduled_tasks[task_id] = timer
+        self._persist_task_change(task_id, time.time() + max(delay, 0))
+        log.debug(f"{self.cog_name}: scheduled task #{task_id} to run in {delay:.0f} seconds.")
+
+    def _start_task(self, task_id: t.Hashable, task_data: t.Any) -> None:
+        """Create the asyncio task for a task which is due."""
         task = asyncio.create_task(self._scheduled_task(task_data))
         task.add_done_callback(partial(self._task_done_callback, task_id))
 
         self._scheduled_tasks[task_id] = task
-        log.debug(f"{self.cog_name}: scheduled task #{task_id} {id(task)}.")
+        log.trace(f"{self.cog_name}: started task #{task_id} {id(task)}.")
 
     def cancel_task(self, task_id: t.Hashable, ignore_missing: bool = False) -> None:
         """
@@ -67,15 +135,92 @@ class Scheduler(metaclass=CogABCMeta):
 
         del self._scheduled_tasks[task_id]
         task.cancel()
+        self._persist_task_change(task_id, None)
 
         log.debug(f"{self.cog_name}: unscheduled task #{task_id} {id(task)}.")
 
     def cancel_all(self) -> None:
-        """Unschedule all known tasks."""
+        """
+        Unschedule all known tasks.
+
+        Their persisted due times are kept, so the tasks can be recovered when the cog is loaded again.
+        """
         log.debug(f"{self.cog_name}: unscheduling all tasks")
 
-        for task_id in self._scheduled_tasks.copy():
-            self.cancel_task(task_id, ignore_missing=True)
+        for task in self._scheduled_tasks.values():
+            task.cancel()
+        self._scheduled_tasks.clear()
+
+    @property
+    def _persisted_tasks_key(self) -> str:
+        return f"{self.cog_name}.scheduled_tasks"
+
+    async def get_persisted_tasks(self, until: float = math.inf) -> t.Dict[RedisKeyType, float]:
+        """
+        Return the persisted tasks due by the POSIX timestamp `until`, mapping their IDs to their due times.
+
+        The due times include the changes which are still being written.
+        """
+        if not self.bot.redis_closed:
+            await self.bot.redis_ready.wait()
+
+        entries = await self.bot.redis_session.zrangebyscore(self._persisted_tasks_key, max=until, withscores=True)
+        tasks = {RedisCache._key_from_typestring(task_id): due for task_id, due in entries}
+
+        for task_id, due in self._unpersisted_tasks.items():
+            if due is None or due > until:
+                tasks.pop(task_id, None)
+            else:
+                tasks[task_id] = due
+
+        log.trace(f"{self.cog_name}: got {len(tasks)} persisted tasks.")
+        return tasks
+
+    def discard_persisted_task(self, task_id: RedisKeyType) -> None:
+        """Remove the persisted due time of a task which won't be rescheduled."""
+        self._persist_task_change(task_id, None)
+
+    def _persist_task_change(self, task_id: RedisKeyType, due: t.Optional[float]) -> None:
+        """Write the new due time of a task, or remove it if `due` is None, in the background."""
+        if not self.persist_tasks:
+            return
+
+        self._unpersisted_tasks[task_id] = due
+        if self._persist_writer is None:
+            self._persist_writer = self.bot.loop.create_task(self._persist_task_changes())
+
+    async def _persist_task_changes(self) -> None:
+        """Write the changed due times of tasks to Redis in a single transaction, until there are none left."""
+        try:
+            if not self.bot.redis_closed:
+                await self.bot.redis_ready.wait()
+
+            while self._unpersisted_tasks:
+                changes = self._unpersisted_tasks.copy()
+                added = [
+                    value
+                    for task_id, due in changes.items() if due is not None
+                    for value in (due, RedisCache._key_to_typestring(task_id))
+                ]
+                removed = [RedisCache._key_to_typestring(task_id) for task_id, due in changes.items() if due is None]
+
+                transaction = self.bot.redis_session.multi_exec()
+                if added:
+                    transaction.zadd(self._persisted_tasks_key, *added)
+                if removed:
+                    transaction.zrem(self._persisted_tasks_key, *removed)
+
+                await transaction.execute()
+                log.trace(f"{self.cog_name}: persisted {len(added) // 2} and removed {len(removed)} tasks.")
+
+                # Only forget the changes which weren't overwritten while they were being written.
+                for task_id, due in changes.items():
+                    if task_id in self._unpersisted_tasks and self._unpersisted_tasks[task_id] == due:
+                        del self._unpersisted_tasks[task_id]
+        except Exception:
+            log.exception(f"{self.cog_name}: failed to persist the scheduled tasks.")
+        finally:
+            self._persist_writer = None
 
     def _task_done_callback(self, task_id: t.Hashable, done_task: asyncio.Task) -> None:
         """
@@ -93,6 +238,7 @@ class Scheduler(metaclass=CogABCMeta):
             # Since this is the done callback, the task is already done so no need to cancel it.
             log.trace(f"{self.cog_name}: deleting task #{task_id} {id(done_task)}.")
             del self._scheduled_tasks[task_id]
+            self._persist_task_change(task_id, None)
         elif scheduled_task:
             # A new task was likely rescheduled with the same ID.
             log.debug(
@@ -0,0 +1,195 @@
+import bisect
+import heapq
+import itertools
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+log = logging.getLogger(__name__)
+
+# The number of corrections considered for every component of a query.
+MAX_CORRECTIONS = 3
+# The number of symbols considered when completing a prefix or matching the last component of a query,
+# and the number of combinations of corrections tried.
+MAX_CANDIDATES = 50
+
+
+def _deletes(word: str) -> Iterable[Tuple[str, int]]:
+    """Yield `word` with each of its characters deleted, along with the index of the deleted character."""
+    for index in range(len(word)):
+        yield word[:index] + word[index + 1:], index
+
+
+def _is_transposition(first: str, second: str) -> bool:
+    """Return True if `second` is `first` with two adjacent characters swapped."""
+    differences = [index for index, (a, b) in enumerate(zip(first, second)) if a != b]
+    return (
+        len(differences) == 2
+        and differences[1] == differences[0] + 1
+        and first[differences[0]] == second[differences[1]]
+        and first[differences[1]] == second[differences[0]]
+    )
+
+
+class SymbolIndex:
+    """
+    An index of dotted symbol names for suggesting the symbols closest to a query.
+
+    Queries are matched case-insensitively. `complete` finds the symbols starting with a prefix, or
+    whose last component starts with it. `suggest` also corrects a typo in every component of the
+    query, using a map of the components with each of their characters deleted: two components
+    are one edit apart if they are equal after deleting at most one character from each at the same
+    index, and at most two edits apart if the characters are at adjacent indices.
+
+    Lookups don't scan the symbols, so they take well under a millisecond for 100k symbols;
+    building the index takes a second or two for as many symbols, so it should be built in an executor.
+    """
+
+    def __init__(self, symbols: Iterable[str]):
+        # Maps lowercase symbols to the symbols, since several may only differ in case.
+        self._symbols: Dict[str, List[str]] = defaultdict(list)
+        # Maps the lowercase last components of symbols to the symbols.
+        self._by_name: Dict[str, List[str]] = defaultdict(list)
+        # Maps lowercase components to the number of symbols they're in.
+        self._components: Dict[str, int] = defaultdict(int)
+        # The most components in a symbol; queries with more can't be corrected into one.
+        self._max_components = 0
+
+        for symbol in symbols:
+            key = symbol.lower()
+            self._symbols[key].append(symbol)
+            self._by_name[key.rsplit(".", 1)[-1]].append(symbol)
+            components = key.split(".")
+            self._max_components = max(self._max_components, len(components))
+            for component in components:
+                self._components[component] += 1
+
+        for names in self._by_name.values():
+            names.sort(key=len)
+
+        # Maps components with a character deleted to the components and the indices of the deleted characters.
+        self._deletes: Dict[str, List[Tuple[str, int]]] = defaultdict(list)
+        for component in self._components:
+            for deleted, index in _deletes(component):
+                self._deletes[deleted].append((component, index))
+
+        self._sorted_symbols = sorted(self._symbols)
+        self._sorted_names = sorted(self._by_name)
+
+        log.trace(f"Indexed {len(self._symbols)} symbols with {len(self._components)} distinct components.")
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def complete(self, prefix: str, limit: int = 5) -> List[str]:
+        """Return up to `limit` of the shortest symbols that, or whose last components, start with `prefix`."""
+        prefix = prefix.lower()
+        matches = self._find_prefix(self._sorted_symbols, prefix)
+        if "." not in prefix:
+            matches += self._find_prefix(self._sorted_names, prefix)
+
+        candidates = {}
+        for match in matches:
+            for symbol in itertools.chain(self._symbols.get(match, ()), self._by_name.get(match, ())):
+                candidates[symbol] = None
+
+        return sorted(candidates, key=len)[:limit]
+
+    def suggest(self, query: str, limit: int = 5) -> List[str]:
+        """
+        Return up to `limit` symbols the `query` may have been meant to be, most likely first.
+
+        Symbols which only differ from the query in case come first, followed by completions of the
+        query, symbols with a typo corrected in any of their components, and lastly symbols whose last
+        component is the query's, or a correction of it. The query itself is never suggested.
+        """
+        key = query.lower()
+        suggestions = dict.fromkeys(self._symbols.get(key, ()))
+        suggestions.update(dict.fromkeys(self.complete(query, limit)))
+
+        # Empty components, as in `a..b`, are ignored rather than corrected.
+        components = [component for component in key.split(".") if component]
+        corrections = [self._correct(component) for component in components]
+
+        # Queries with more components than any symbol can't be corrected into one.
+        if len(corrections) <= self._max_components:
+            for combination in self._combinations(corrections):
+                suggestions.update(dict.fromkeys(self._symbols.get(".".join(c for c, _ in combination), ())))
+
+        # Symbols with the same last component are ranked by how many other components of the query they have.
+        qualifiers = {component for component, _ in itertools.chain.from_iterable(corrections[:-1])}
+        names = corrections[-1] if corrections else ()
+        for name, _ in names:
+            candidates = self._by_name.get(name, ())[:MAX_CANDIDATES]
+            suggestions.update(dict.fromkeys(sorted(
+                candidates,
+                key=lambda symbol: -len(qualifiers.intersection(symbol.lower().split(".")))
+            )))
+
+        suggestions.pop(query, None)
+        return list(suggestions)[:limit]
+
+    @staticmethod
+    def _combinations(corrections: List[List[Tuple[str, int]]]) -> Iterable[List[Tuple[str, int]]]:
+        """
+        Yield up to `MAX_CANDIDATES` combinations of the `corrections` of every component, fewest edits first.
+
+        The corrections of every component are sorted by distance, so the combinations are found lazily by
+        walking from the closest one, rather than sorting all of them, whose number grows exponentially with
+        the number of components.
+        """
+        if not corrections or not all(corrections):
+            return
+
+        start = (0,) * len(corrections)
+        heap = [(sum(options[0][1] for options in corrections), start)]
+        seen = {start}
+        for _ in range(MAX_CANDIDATES):
+            if not heap:
+                return
+            distance, indices = heapq.heappop(heap)
+            yield [options[index] for options, index in zip(corrections, indices)]
+
+            for position, index in enumerate(indices):
+                if index + 1 < len(corrections[position]):
+                    following = (*indices[:position], index + 1, *indices[position + 1:])
+                    if following not in seen:
+                        seen.add(following)
+                        step = corrections[position][index + 1][1] - corrections[position][index][1]
+                        heapq.heappush(heap, (distance + step, following))
+
+    def _correct(self, component: str) -> List[Tuple[str, int]]:
+        """
+        Return the indexed components closest to `component`, and their edit distances from it.
+
+        At most `MAX_CORRECTIONS` components are returned, the closest and most common ones first.
+        """
+        if component in self._components:
+            return [(component, 0)]
+
+        distances = {}
+        # A character missing from the component.
+        for candidate, _ in self._deletes.get(component, ()):
+            distances[candidate] = 1
+
+        for deleted, index in _deletes(component):
+            # An extra character in the component.
+            if deleted in self._components:
+                distances[deleted] = 1
+
+            # A substituted character, or two adjacent characters which are swapped or substituted.
+            for candidate, candidate_index in self._deletes.get(deleted, ()):
+                if index == candidate_index or _is_transposition(component, candidate):
+                    distances[candidate] = 1
+                elif abs(index - candidate_index) == 1:
+                    distances.setdefault(candidate, 2)
+
+        corrections = sorted(distances.items(), key=lambda item: (item[1], -self._components[item[0]]))
+        return corrections[:MAX_CORRECTIONS]
+
+    @staticmethod
+    def _find_prefix(keys: List[str], prefix: str) -> List[str]:
+        """Return up to `MAX_CANDIDATES` of the sorted `keys` which start with `prefix`."""
+        start = bisect.bisect_left(keys, prefix)
+        matches = keys[start:start + MAX_CANDIDATES]
+        return [key for key in matches if key.startswith(prefix)]
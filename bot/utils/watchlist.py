@@ -0,0 +1,282 @@
+import logging
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+# Characters which give an expression a meaning other than its literal text.
+REGEX_METACHARACTERS = frozenset(r".^$*+?[]\|()") | {"{", "}"}
+
+# Quantifiers which make the character before them optional.
+OPTIONAL_QUANTIFIERS = frozenset("*?{")
+
+
+@dataclass(frozen=True)
+class WatchlistEntry:
+    """An expression from the word or token watchlist."""
+
+    expression: str
+    is_word: bool
+
+    @property
+    def is_literal(self) -> bool:
+        """Whether the expression only matches its own text."""
+        return not REGEX_METACHARACTERS.intersection(self.expression)
+
+    @property
+    def pattern(self) -> str:
+        """The regular expression this entry is matched with."""
+        if self.is_word:
+            return fr"\b(?:{self.expression})\b"
+        return f"(?:{self.expression})"
+
+
+@dataclass(frozen=True)
+class WatchlistMatch:
+    """A match of a watchlist entry in some text."""
+
+    entry: WatchlistEntry
+    string: str
+    start: int
+    end: int
+
+    @property
+    def text(self) -> str:
+        """The matched text."""
+        return self.string[self.start:self.end]
+
+
+# Characters which `re.IGNORECASE` treats as equal although their case mappings don't relate them.
+_EQUIVALENT_CHARACTERS = {"\u1fd3": "\u0390", "\u1fe3": "\u03b0", "\ufb05": "\ufb06"}
+# Maps the characters seen so far to their folded characters.
+_folds: Dict[str, str] = {}
+
+
+def _compute_fold(char: str) -> str:
+    """Return the character `re.IGNORECASE` considers `char` equal to, the same for every equal character."""
+    lowered = char.lower()
+    if len(lowered) != 1:
+        # Only İ lowercases to several characters; re uses its simple lowercase, the first of them.
+        lowered = lowered[0]
+    lowered = _EQUIVALENT_CHARACTERS.get(lowered, lowered)
+
+    # Characters with the same uppercase, like ſ and s, are also equal, unless re doesn't consider them so.
+    upper = lowered.upper()
+    if len(upper) == 1:
+        relowered = upper.lower()
+        if len(relowered) == 1 and relowered != lowered and re.fullmatch(re.escape(char), relowered, re.IGNORECASE):
+            return relowered
+    return lowered
+
+
+def _fold(char: str) -> str:
+    """Fold `char` for case-insensitive matching like `re.IGNORECASE`, without ever changing its length."""
+    folded = _folds.get(char)
+    if folded is None:
+        folded = _folds[char] = _compute_fold(char)
+    return folded
+
+
+def _literal_prefix(expression: str) -> str:
+    """
+    Return the literal text every match of `expression` has to start with, or an empty string.
+
+    Expressions with alternatives are never given a prefix, since any branch could match.
+    """
+    if "|" in expression:
+        return ""
+
+    prefix = []
+    for char in expression:
+        if char in REGEX_METACHARACTERS:
+            if char in OPTIONAL_QUANTIFIERS and prefix:
+                prefix.pop()
+            break
+        prefix.append(char)
+    return "".join(prefix)
+
+
+def _is_word_char(text: str, index: int) -> bool:
+    """Return True if the character of `text` at `index` is matched by `\\w`."""
+    if 0 <= index < len(text):
+        char = text[index]
+        return char.isalnum() or char == "_"
+    return False
+
+
+def _is_word_boundary(text: str, index: int) -> bool:
+    """Return True if `\\b` matches `text` at `index`."""
+    return _is_word_char(text, index - 1) != _is_word_char(text, index)
+
+
+class AhoCorasick:
+    """
+    An Aho-Corasick automaton which finds occurrences of many literal terms in one pass over a text.
+
+    Terms are matched case-insensitively. New terms can be added to an existing automaton,
+    which only requires its failure links to be recomputed.
+    """
+
+    def __init__(self, terms: Iterable[Tuple[str, WatchlistEntry]] = ()):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._depth: List[int] = [0]
+        self._outputs: List[List[Tuple[int, WatchlistEntry]]] = [[]]
+        self.add(terms)
+
+    def add(self, terms: Iterable[Tuple[str, WatchlistEntry]]) -> None:
+        """Insert `(text, entry)` pairs into the trie and recompute the failure links."""
+        for text, entry in terms:
+            state = 0
+            for char in text:
+                char = _fold(char)
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._depth.append(self._depth[state] + 1)
+                    self._outputs.append([])
+                state = next_state
+            self._outputs[state].append((len(text), entry))
+
+        self._link()
+
+    def _link(self) -> None:
+        """Compute the failure link and the outputs of every state with a breadth-first traversal of the trie."""
+        # A state's own terms are exactly as long as the state is deep; the rest were inherited from its failure link.
+        own_outputs = [
+            [output for output in outputs if output[0] == depth]
+            for outputs, depth in zip(self._outputs, self._depth)
+        ]
+        queue = deque()
+
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            self._outputs[state] = own_outputs[state]
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+
+                fail_state = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = fail_state
+                self._outputs[next_state] = own_outputs[next_state] + self._outputs[fail_state]
+                queue.append(next_state)
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, WatchlistEntry]]:
+        """Yield `(start, end, entry)` for every occurrence of a term in `text`, ordered by their end."""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+
+        for end, char in enumerate(text, start=1):
+            char = _fold(char)
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for length, entry in outputs[state]:
+                yield end - length, end, entry
+
+
+class WatchlistMatcher:
+    """
+    Matches text against all the entries of the word and token watchlists at once.
+
+    Literal entries, and the literal prefix every match of most expressions has to start with,
+    are found with a single `AhoCorasick` automaton, so the cost of a search barely depends on
+    the number of entries. An expression's own regex is only run where its prefix was found.
+    Expressions without such a prefix are searched for one by one.
+
+    Use `update` when the watchlists change; the automaton is only extended or rebuilt when
+    the terms it looks for change, and regexes are only compiled for new expressions.
+    """
+
+    def __init__(self, word_watchlist: Iterable[str] = (), token_watchlist: Iterable[str] = ()):
+        self._entries: List[WatchlistEntry] = []
+        self._automaton = AhoCorasick()
+        self._terms: Dict[WatchlistEntry, str] = {}
+        self._patterns: Dict[WatchlistEntry, re.Pattern] = {}
+        self._standalone: List[WatchlistEntry] = []
+
+        self.update(word_watchlist, token_watchlist)
+
+    @property
+    def entries(self) -> List[WatchlistEntry]:
+        """All watchlist entries, word entries first."""
+        return list(self._entries)
+
+    def update(self, word_watchlist: Iterable[str], token_watchlist: Iterable[str]) -> None:
+        """Replace the watchlists, rebuilding only what's affected by the changed entries."""
+        entries = [WatchlistEntry(expression, True) for expression in word_watchlist]
+        entries += [WatchlistEntry(expression, False) for expression in token_watchlist]
+
+        self._patterns = {
+            entry: self._patterns.get(entry) or re.compile(entry.pattern, flags=re.IGNORECASE)
+            for entry in entries
+            if not entry.is_literal
+        }
+
+        terms = {}
+        self._standalone = []
+        for entry in entries:
+            term = entry.expression if entry.is_literal else _literal_prefix(entry.expression)
+            if term:
+                terms[entry] = term
+            else:
+                self._standalone.append(entry)
+
+        if terms != self._terms:
+            if self._terms.items() <= terms.items():
+                # Adding terms only requires the new ones to be inserted.
+                self._automaton.add((term, entry) for entry, term in terms.items() if entry not in self._terms)
+            else:
+                self._automaton = AhoCorasick((term, entry) for entry, term in terms.items())
+            self._terms = terms
+            log.trace(f"Rebuilt the watchlist automaton with {len(terms)} terms.")
+
+        self._entries = entries
+
+    def _automaton_matches(self, text: str) -> Iterator[WatchlistMatch]:
+        """Yield the matches of the entries found through the automaton in `text`."""
+        for start, end, entry in self._automaton.finditer(text):
+            if entry.is_literal:
+                if entry.is_word and not (_is_word_boundary(text, start) and _is_word_boundary(text, end)):
+                    continue
+            else:
+                match = self._patterns[entry].match(text, start)
+                if not match:
+                    continue
+                end = match.end()
+
+            yield WatchlistMatch(entry, text, start, end)
+
+    def _standalone_matches(self, text: str) -> Iterator[WatchlistMatch]:
+        """Yield the matches of the expressions without a literal prefix in `text`."""
+        for entry in self._standalone:
+            for match in self._patterns[entry].finditer(text):
+                yield WatchlistMatch(entry, text, match.start(), match.end())
+
+    def search(self, text: str) -> Optional[WatchlistMatch]:
+        """Return the first match found in `text`, or None if nothing matches."""
+        for match in self._automaton_matches(text):
+            return match
+        for match in self._standalone_matches(text):
+            return match
+        return None
+
+    def findall(self, text: str) -> List[WatchlistMatch]:
+        """Return the first match of every entry which matches `text`."""
+        matches = {}
+        for match in self._automaton_matches(text):
+            matches.setdefault(match.entry, match)
+        for match in self._standalone_matches(text):
+            matches.setdefault(match.entry, match)
+        return list(matches.values())
@@ -0,0 +1,114 @@
+"""
+Measure the Doc symbol index on the names of the modules, classes and functions installed with Python.
+
+The names are collected from the source of the standard library and site-packages, and copied under
+other top-level packages to reach the larger index sizes. Suggestions are compared to a linear scan
+with `difflib.get_close_matches`, as a naive implementation would do.
+Run from the project root with `python -m scripts.benchmarks.doc_search`.
+"""
+import ast
+import difflib
+import os
+import random
+import sysconfig
+import time
+import typing as t
+
+from bot.utils.symbol_index import SymbolIndex
+
+SIZES = (10_000, 100_000)
+QUERIES = 1000
+LINEAR_QUERIES = 5  # The linear scan takes seconds per query at 100k symbols.
+
+
+def collect_names() -> t.List[str]:
+    """Return the dotted names of the modules, classes and functions in the installed Python source."""
+    names = set()
+
+    def visit(node: ast.AST, prefix: str) -> None:
+        for child in getattr(node, "body", ()):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                name = f"{prefix}.{child.name}"
+                names.add(name)
+                if isinstance(child, ast.ClassDef):
+                    visit(child, name)
+
+    for root in {sysconfig.get_paths()["stdlib"], sysconfig.get_paths()["purelib"]}:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(name for name in dirnames if name.isidentifier() and name not in ("test", "tests"))
+            for filename in sorted(filenames):
+                if not filename.endswith(".py"):
+                    continue
+
+                path = os.path.join(dirpath, filename)
+                module = os.path.relpath(path, root)[:-3].replace(os.sep, ".").replace(".__init__", "")
+                try:
+                    with open(path, "rb") as file:
+                        tree = ast.parse(file.read())
+                except (SyntaxError, ValueError):
+                    continue
+
+                names.add(module)
+                visit(tree, module)
+
+    return sorted(names)
+
+
+def make_symbols(names: t.List[str], size: int) -> t.List[str]:
+    """Return `size` symbols, copying the `names` under other packages if there aren't enough of them."""
+    symbols = names[:size]
+    copy = 0
+    while len(symbols) < size:
+        copy += 1
+        symbols += [f"vendored{copy}.{name}" for name in names[:size - len(symbols)]]
+    return symbols
+
+
+def make_typo(symbol: str) -> str:
+    """Return the `symbol` with a random character of its last component replaced, deleted or duplicated."""
+    start = symbol.rfind(".") + 1
+    index = random.randrange(start, len(symbol))
+    replacement = random.choice((random.choice("abcdefghijklmnopqrstuvwxyz"), "", symbol[index] * 2))
+    return symbol[:index] + replacement + symbol[index + 1:]
+
+
+def measure(function: t.Callable[[str], t.List[str]], queries: t.List[t.Tuple[str, str]]) -> t.Tuple[float, float]:
+    """Return the mean time taken by `function` in µs, and how often its results contain the expected symbol."""
+    found = 0
+    start = time.perf_counter()
+    for symbol, query in queries:
+        found += symbol in function(query)
+    return (time.perf_counter() - start) / len(queries) * 1e6, found / len(queries)
+
+
+def main() -> None:
+    """Print the time taken to build the index and to query it for every size."""
+    random.seed(0)
+    names = collect_names()
+    print(f"Collected {len(names)} names.")
+    print(f"{'symbols':>8} {'build (s)':>10} {'operation':>18} {'µs/query':>10} {'found':>6}")
+
+    for size in SIZES:
+        symbols = make_symbols(names, size)
+        start = time.perf_counter()
+        index = SymbolIndex(symbols)
+        build_time = time.perf_counter() - start
+
+        samples = random.sample(symbols, QUERIES)
+        typos = [(symbol, make_typo(symbol)) for symbol in samples]
+        prefixes = [(symbol, symbol[:max(len(symbol) - 3, 1)]) for symbol in samples]
+
+        def linear_search(query: str) -> t.List[str]:
+            return difflib.get_close_matches(query, symbols, 5)
+
+        results = (
+            ("suggest (typo)", measure(index.suggest, typos)),
+            ("complete (prefix)", measure(lambda query: index.complete(query, 50), prefixes)),
+            ("difflib (typo)", measure(linear_search, typos[:LINEAR_QUERIES])),
+        )
+        for operation, (duration, found) in results:
+            print(f"{size:>8} {build_time:>10.2f} {operation:>18} {duration:>10.1f} {found:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
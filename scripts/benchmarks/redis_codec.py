@@ -0,0 +1,140 @@
+"""
+Compare encoding and decoding RedisCache values as typestrings to encoding them in the binary format.
+
+Scalars are a mix of ints, floats and strings. They're encoded as typestrings by trying every type like
+RedisCache used to, and by looking up the type in a table like it does now, and with `bot.utils.redis_codec`.
+Structured values are dicts like the persisted invites of the Filtering cog, which have to be dumped to JSON
+to be stored as typestrings.
+Run from the project root with `python -m scripts.benchmarks.redis_codec`.
+"""
+import json
+import random
+import string
+import time
+import typing as t
+from functools import partialmethod
+
+from bot.utils import redis_codec
+from bot.utils.redis_cache import RedisCache
+
+VALUES = 100_000
+
+
+class LoopTypestrings:
+    """Typestrings encoded by trying every type and prefix, through partialmethods, as RedisCache used to."""
+
+    _PREFIXES = (("f|", float), ("i|", int), ("s|", str))
+
+    @staticmethod
+    def _to_typestring(value: t.Union[str, int, float], prefixes: tuple) -> str:
+        for prefix, _type in prefixes:
+            if isinstance(value, _type):
+                return f"{prefix}{value}"
+        raise TypeError
+
+    @staticmethod
+    def _from_typestring(value: bytes, prefixes: tuple) -> t.Union[str, int, float]:
+        value = value.decode("utf-8")
+        for prefix, _type in prefixes:
+            if value.startswith(prefix):
+                return _type(value[len(prefix):])
+        raise TypeError
+
+    _value_to_typestring = partialmethod(_to_typestring, prefixes=_PREFIXES)
+    _value_from_typestring = partialmethod(_from_typestring, prefixes=_PREFIXES)
+
+
+def json_to_typestring(value: dict) -> str:
+    """Encode a structured value as a JSON typestring, like cogs storing dicts have to."""
+    return RedisCache._value_to_typestring(json.dumps(value))
+
+
+def json_from_typestring(value: bytes) -> dict:
+    """Decode a structured value from a JSON typestring."""
+    return json.loads(RedisCache._value_from_typestring(value))
+
+
+def make_scalars() -> t.List[t.Union[str, int, float]]:
+    """Return a mix of IDs, timestamps and short strings."""
+    makers = (
+        lambda: random.randint(10**17, 10**18),
+        lambda: time.time() + random.uniform(-10**6, 10**6),
+        lambda: "".join(random.choices(string.ascii_letters, k=random.randint(5, 30))),
+    )
+    return [random.choice(makers)() for _ in range(VALUES)]
+
+
+def make_invites() -> t.List[dict]:
+    """Return persisted invites with their expiry timestamps and guilds."""
+    return [
+        {
+            "expires": time.time() + random.uniform(0, 3 * 60 * 60),
+            "guild": {
+                "id": random.randint(10**17, 10**18),
+                "name": "".join(random.choices(string.ascii_letters, k=random.randint(5, 30))),
+                "icon": "".join(random.choices(string.hexdigits, k=32)),
+                "members": random.randint(10, 10**6),
+                "active": random.randint(1, 10**5),
+            },
+        }
+        for _ in range(VALUES)
+    ]
+
+
+def measure(
+    values: list,
+    encode: t.Callable[[t.Any], t.Union[str, bytes]],
+    decode: t.Callable[[bytes], t.Any],
+) -> t.Tuple[float, float, float]:
+    """Return the values encoded and decoded per second, and the mean size of the encoded values in bytes."""
+    start = time.perf_counter()
+    encoded = [encode(value) for value in values]
+    encode_time = time.perf_counter() - start
+
+    # Redis returns bytes.
+    encoded = [value.encode("utf-8") if isinstance(value, str) else value for value in encoded]
+
+    start = time.perf_counter()
+    for value in encoded:
+        decode(value)
+    decode_time = time.perf_counter() - start
+
+    return len(values) / encode_time, len(values) / decode_time, sum(map(len, encoded)) / len(encoded)
+
+
+def main() -> None:
+    """Print the measurements for every way of encoding both kinds of values."""
+    random.seed(0)
+    scalars = make_scalars()
+    invites = make_invites()
+    # The converters are looked up on an instance for every value, as they are in the cache.
+    loop = LoopTypestrings()
+    table = RedisCache()
+    cases = (
+        (
+            "scalars",
+            "typestring loop",
+            scalars,
+            lambda value: loop._value_to_typestring(value),
+            lambda value: loop._value_from_typestring(value),
+        ),
+        (
+            "scalars",
+            "typestring table",
+            scalars,
+            lambda value: table._value_to_typestring(value),
+            lambda value: table._value_from_typestring(value),
+        ),
+        ("scalars", "binary", scalars, redis_codec.encode, redis_codec.decode),
+        ("invites", "json typestring", invites, json_to_typestring, json_from_typestring),
+        ("invites", "binary", invites, redis_codec.encode, redis_codec.decode),
+    )
+
+    print(f"{'values':>8} {'encoding':>17} {'encode (k/s)':>13} {'decode (k/s)':>13} {'size (B)':>9}")
+    for kind, name, values, encode, decode in cases:
+        encode_rate, decode_rate, size = measure(values, encode, decode)
+        print(f"{kind:>8} {name:>17} {encode_rate / 1000:>13.0f} {decode_rate / 1000:>13.0f} {size:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
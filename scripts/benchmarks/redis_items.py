@@ -0,0 +1,97 @@
+"""
+Compare the memory used to iterate over the items of a RedisCache fetched at once to fetching them in batches.
+
+The cache holds name alerts like the ones of the Filtering cog: member IDs mapped to timestamps. Its replies
+are generated when they're requested rather than by a Redis server, so the peak memory measured with
+tracemalloc is only what the bot needs to iterate over the items; Redis needs to build the whole reply too
+when the items are fetched at once.
+Run from the project root with `python -m scripts.benchmarks.redis_items`.
+"""
+import asyncio
+import time
+import tracemalloc
+import types
+import typing as t
+
+from bot.utils.redis_cache import RedisCache, SCAN_BATCH_SIZE
+
+SIZES = (10_000, 100_000, 1_000_000)
+FIRST_ID = 100_000_000_000_000_000
+FIRST_ALERT = 1_500_000_000.0
+
+
+class GeneratedHash:
+    """Replies to the commands of a RedisCache on a hash of `size` name alerts, generating them as requested."""
+
+    def __init__(self, size: int):
+        self.size = size
+
+    def _pairs(self, start: int, stop: int) -> t.List[t.Tuple[bytes, bytes]]:
+        return [(f"i|{FIRST_ID + i}".encode(), f"f|{FIRST_ALERT + i}".encode()) for i in range(start, stop)]
+
+    async def hgetall(self, key: str) -> t.Dict[bytes, bytes]:
+        """Return every pair, as aioredis does."""
+        return dict(self._pairs(0, self.size))
+
+    async def hscan(self, key: str, cursor: int, count: int) -> t.Tuple[int, t.List[t.Tuple[bytes, bytes]]]:
+        """Return the next `count` pairs after `cursor`, and the cursor of the pairs after them."""
+        stop = min(cursor + count, self.size)
+        return 0 if stop == self.size else stop, self._pairs(cursor, stop)
+
+
+class Filtering:
+    """Owns the cache, so it has the namespace of the cache in the cog."""
+
+    name_alerts = RedisCache()
+
+
+async def fetch_at_once(cache: RedisCache) -> float:
+    """Return the latest alert, fetching every alert at once."""
+    return max(alert for _, alert in await cache.items())
+
+
+async def fetch_in_batches(cache: RedisCache) -> float:
+    """Return the latest alert, fetching the alerts in batches."""
+    return max([alert async for _, alert in cache.items()])
+
+
+async def fetch_in_batches_lazily(cache: RedisCache) -> float:
+    """Return the latest alert, fetching the alerts in batches and keeping only the latest."""
+    latest = 0
+    async for _, alert in cache.items():
+        latest = max(latest, alert)
+    return latest
+
+
+async def measure(size: int, fetch: t.Callable[[RedisCache], t.Awaitable[float]]) -> t.Tuple[float, float]:
+    """Return the time to iterate over `size` alerts in ms and the peak memory in MiB."""
+    cache = vars(Filtering)["name_alerts"]
+    cache.bot = types.SimpleNamespace(redis_closed=True)
+    cache._redis = GeneratedHash(size)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    await fetch(cache)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed * 1000, peak / 2**20
+
+
+async def main() -> None:
+    """Print the measurements for every size and way of fetching the alerts."""
+    print(f"Batches of {SCAN_BATCH_SIZE} items.")
+    print(f"{'items':>9} {'method':>19} {'time (ms)':>10} {'peak (MiB)':>11}")
+    for size in SIZES:
+        for name, fetch in (
+            ("at once", fetch_at_once),
+            ("batches into list", fetch_in_batches),
+            ("batches", fetch_in_batches_lazily),
+        ):
+            elapsed, peak = await measure(size, fetch)
+            print(f"{size:>9} {name:>19} {elapsed:>10.0f} {peak:>11.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
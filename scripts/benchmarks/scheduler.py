@@ -0,0 +1,115 @@
+"""
+Compare scheduling items with a task sleeping for each of them to scheduling them in a `TimerQueue`.
+
+Most items are due far in the future, like infractions and reminders. A few more due within a second
+are scheduled once the rest are, to measure how late they run. The peak memory is measured with tracemalloc.
+Run from the project root with `python -m scripts.benchmarks.scheduler`.
+"""
+import asyncio
+import random
+import statistics
+import time
+import tracemalloc
+import typing as t
+
+from bot.timers import TimerQueue
+
+ITEMS = 100_000
+DUE_SOON = 100  # Items due within a second, whose lateness is measured.
+FAR_DELAY = 30 * 24 * 60 * 60
+
+
+async def run_due(loop: asyncio.AbstractEventLoop, when: float, lateness: t.List[float]) -> None:
+    """Record how late the item due at `when` runs."""
+    lateness.append(loop.time() - when)
+
+
+async def sleep_then_run(loop: asyncio.AbstractEventLoop, when: float, lateness: t.List[float]) -> None:
+    """Sleep until `when`, then run the item, like a task per item would."""
+    await asyncio.sleep(when - loop.time())
+    await run_due(loop, when, lateness)
+
+
+class TaskScheduler:
+    """Schedules every item with a task which sleeps until it's due."""
+
+    def __init__(self, lateness: t.List[float]):
+        self.loop = asyncio.get_running_loop()
+        self.lateness = lateness
+        self.tasks = []
+
+    def schedule(self, delays: t.List[float]) -> None:
+        """Create a task for every item."""
+        for delay in delays:
+            when = self.loop.time() + delay
+            self.tasks.append(self.loop.create_task(sleep_then_run(self.loop, when, self.lateness)))
+
+    def cancel(self) -> None:
+        """Cancel every task."""
+        for task in self.tasks:
+            task.cancel()
+
+
+class TimerScheduler:
+    """Schedules every item with a timer, which creates a task once the item is due."""
+
+    def __init__(self, lateness: t.List[float]):
+        self.loop = asyncio.get_running_loop()
+        self.lateness = lateness
+        self.queue = TimerQueue(self.loop)
+
+    def schedule(self, delays: t.List[float]) -> None:
+        """Schedule a timer for every item."""
+        for delay in delays:
+            self.queue.call_later(delay, self._start, self.loop.time() + delay)
+
+    def _start(self, when: float) -> None:
+        self.loop.create_task(run_due(self.loop, when, self.lateness))
+
+    def cancel(self) -> None:
+        """Cancel every timer."""
+        self.queue.close()
+
+
+async def measure(
+    scheduler_type: t.Union[t.Type[TaskScheduler], t.Type[TimerScheduler]],
+    delays: t.List[float],
+) -> t.Tuple[float, float, float, float]:
+    """Return the time to schedule and cancel the items in ms, the peak memory in MiB and the mean lateness in ms."""
+    lateness = []
+    scheduler = scheduler_type(lateness)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    scheduler.schedule(delays)
+    # Let every task start sleeping.
+    await asyncio.sleep(0)
+    schedule_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    scheduler.schedule([random.uniform(0.1, 1) for _ in range(DUE_SOON)])
+    while len(lateness) < DUE_SOON:
+        await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    scheduler.cancel()
+    await asyncio.sleep(0)
+    cancel_time = time.perf_counter() - start
+
+    return schedule_time * 1000, cancel_time * 1000, peak / 2**20, statistics.mean(lateness) * 1000
+
+
+async def main() -> None:
+    """Print the measurements for both ways of scheduling the items."""
+    random.seed(0)
+    delays = [random.uniform(60, FAR_DELAY) for _ in range(ITEMS)]
+
+    print(f"{'method':>14} {'schedule (ms)':>14} {'cancel (ms)':>12} {'peak (MiB)':>11} {'lateness (ms)':>14}")
+    for name, scheduler_type in (("task per item", TaskScheduler), ("timer queue", TimerScheduler)):
+        schedule_time, cancel_time, peak, lateness = await measure(scheduler_type, delays)
+        print(f"{name:>14} {schedule_time:>14.0f} {cancel_time:>12.0f} {peak:>11.1f} {lateness:>14.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
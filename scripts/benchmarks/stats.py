@@ -0,0 +1,78 @@
+"""
+Compare the buffered statsd client to the previous client, which sent every metric in its own task.
+
+Metrics are sent to a local UDP port, where nothing has to be listening.
+Run from the project root with `python -m scripts.benchmarks.stats`.
+"""
+import asyncio
+import time
+
+from bot.async_stats import AsyncStatsClient
+
+MESSAGES = 100_000
+CHANNELS = 50
+
+
+class TaskPerMetricStatsClient(AsyncStatsClient):
+    """The previous implementation, which sent each metric in a separate datagram from a new task."""
+
+    def _send(self, data: str) -> None:
+        """Start an async task to send data to statsd."""
+        self._loop.create_task(self._async_send(data))
+
+    async def _async_send(self, data: str) -> None:
+        """Send data to the statsd server using the async transport."""
+        self._transport.sendto(data.encode('ascii'), self._addr)
+
+    def incr(self, stat: str, count: int = 1, rate: float = 1) -> None:
+        """Increment a stat by `count`."""
+        self._send_stat(stat, f"{count}|c", rate)
+
+
+class CountingTransport:
+    """Wraps a datagram transport to count the datagrams sent with it."""
+
+    def __init__(self, transport: asyncio.DatagramTransport):
+        self.transport = transport
+        self.datagrams = 0
+
+    def sendto(self, data: bytes, addr: tuple) -> None:
+        """Send and count a datagram."""
+        self.datagrams += 1
+        self.transport.sendto(data, addr)
+
+    def close(self) -> None:
+        """Close the wrapped transport."""
+        self.transport.close()
+
+
+async def run(client_class: type) -> tuple:
+    """Emit the metrics `Stats.on_message` would for every message, and return the time taken and datagrams sent."""
+    loop = asyncio.get_running_loop()
+    client = client_class(loop, "127.0.0.1", 8125, prefix="bot", max_udp_size=1432)
+    await client.create_socket()
+    client._transport = transport = CountingTransport(client._transport)
+
+    start = time.perf_counter()
+    for index in range(MESSAGES):
+        client.incr(f"channels.channel_{index % CHANNELS}")
+        client.incr("messages")
+
+    # Wait for every metric to actually be sent.
+    if isinstance(client, TaskPerMetricStatsClient):
+        await asyncio.gather(*(task for task in asyncio.all_tasks() if task is not asyncio.current_task()))
+    client.close()
+
+    return time.perf_counter() - start, transport.datagrams
+
+
+async def main() -> None:
+    """Print the time taken and datagrams sent by both clients."""
+    print(f"{'client':>15} {'time (s)':>9} {'µs/metric':>10} {'datagrams':>10}")
+    for name, client_class in (("task per metric", TaskPerMetricStatsClient), ("buffered", AsyncStatsClient)):
+        duration, datagrams = await run(client_class)
+        print(f"{name:>15} {duration:>9.3f} {duration / (2 * MESSAGES) * 1e6:>10.2f} {datagrams:>10}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
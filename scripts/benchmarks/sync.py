@@ -0,0 +1,82 @@
+"""
+Compare sending a user sync one user per request to sending it in concurrent bulk chunks.
+
+The site API is simulated in-process with a fixed latency per request plus a cost per user,
+so this runs offline. Run from the project root with `python -m scripts.benchmarks.sync`.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+from bot.cogs.sync.syncers import UserSyncer, _Diff, _User
+
+SIZES = (1_000, 10_000, 100_000)
+SERIAL_LIMIT = 10_000  # Larger serial syncs take too long to be worth waiting for.
+
+REQUEST_LATENCY = 0.005
+USER_COST = 0.00002
+
+
+class FakeSite:
+    """Stand-in for the site API client which only simulates the time taken by requests."""
+
+    def __init__(self):
+        self.requests = 0
+
+    async def _request(self, json: object) -> None:
+        self.requests += 1
+        users = len(json) if isinstance(json, list) else 1
+        await asyncio.sleep(REQUEST_LATENCY + users * USER_COST)
+
+    async def post(self, endpoint: str, *, json: object) -> None:
+        """Create one user, or a list of them."""
+        await self._request(json)
+
+    async def put(self, endpoint: str, *, json: object) -> None:
+        """Replace one user."""
+        await self._request(json)
+
+    async def patch(self, endpoint: str, *, json: object) -> None:
+        """Update a list of users."""
+        await self._request(json)
+
+
+def make_diff(size: int) -> _Diff:
+    """Create a diff where half of the users are new and the other half were updated."""
+    users = [_User(id_, f"user{id_}", id_ % 10_000, (1, 2), True) for id_ in range(size)]
+    return _Diff(set(users[:size // 2]), set(users[size // 2:]), None)
+
+
+async def sync_serially(site: FakeSite, diff: _Diff) -> None:
+    """Send the diff one user per request, awaiting each request in turn."""
+    for user in diff.created:
+        await site.post("bot/users", json=user._asdict())
+    for user in diff.updated:
+        await site.put(f"bot/users/{user.id}", json=user._asdict())
+
+
+async def main() -> None:
+    """Print how long syncing each diff size takes with both approaches."""
+    print(f"{'users':>8} {'serial (s)':>11} {'requests':>9} {'bulk (s)':>9} {'requests':>9}")
+
+    for size in SIZES:
+        diff = make_diff(size)
+
+        serial_time, serial_requests = "-", "-"
+        if size <= SERIAL_LIMIT:
+            site = FakeSite()
+            start = time.perf_counter()
+            await sync_serially(site, diff)
+            serial_time, serial_requests = f"{time.perf_counter() - start:.2f}", site.requests
+
+        site = FakeSite()
+        syncer = UserSyncer(SimpleNamespace(api_client=site))
+        start = time.perf_counter()
+        await syncer._sync(diff)
+        bulk_time = time.perf_counter() - start
+
+        print(f"{size:>8} {serial_time:>11} {serial_requests:>9} {bulk_time:>9.2f} {site.requests:>9}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
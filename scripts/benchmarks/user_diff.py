@@ -0,0 +1,136 @@
+"""
+Compare the streaming user diff to loading every user at once, on synthetic guilds.
+
+Reports the time taken, the peak memory allocated and the longest time the event loop was
+blocked for. Run from the project root with `python -m scripts.benchmarks.user_diff`.
+"""
+import asyncio
+import time
+import tracemalloc
+import typing as t
+from types import SimpleNamespace
+
+from bot.cogs.sync.syncers import UserSyncer, _Diff, _User
+
+SIZES = (10_000, 100_000, 500_000)
+PAGE_SIZE = 2500
+ROLES = [SimpleNamespace(id=role_id) for role_id in range(10)]
+
+
+def make_guild(size: int) -> SimpleNamespace:
+    """Create a guild with `size` members, each with a few roles."""
+    members = [
+        SimpleNamespace(id=id_, name=f"user{id_}", discriminator=f"{id_ % 10_000:04}", roles=ROLES[:id_ % 5 + 1])
+        for id_ in range(size)
+    ]
+    return SimpleNamespace(members=members)
+
+
+def make_db_user(id_: int) -> dict:
+    """Create the site's version of the member with `id_`; every tenth one has changed since."""
+    name = f"user{id_}" if id_ % 10 else f"old{id_}"
+    return {"id": id_, "name": name, "discriminator": id_ % 10_000, "roles": list(range(id_ % 5 + 1)), "in_guild": True}
+
+
+class FakeSite:
+    """Stand-in for the site API client which generates users on request."""
+
+    def __init__(self, size: int):
+        self.size = size
+
+    async def get(self, endpoint: str, params: dict = None) -> object:
+        """Return every user, or a page of them if a page is requested."""
+        await asyncio.sleep(0)
+        if params is None:
+            return [make_db_user(id_) for id_ in range(self.size)]
+
+        start = (params["page"] - 1) * PAGE_SIZE
+        end = min(start + PAGE_SIZE, self.size)
+        return {
+            "count": self.size,
+            "next_page_no": params["page"] + 1 if end < self.size else None,
+            "previous_page_no": None,
+            "results": [make_db_user(id_) for id_ in range(start, end)],
+        }
+
+
+async def get_diff_at_once(bot: SimpleNamespace, guild: SimpleNamespace) -> _Diff:
+    """The previous implementation of `UserSyncer._get_diff`, which loads all users at once."""
+    users = await bot.api_client.get('bot/users')
+    db_users = {
+        user_dict['id']: _User(roles=tuple(sorted(user_dict.pop('roles'))), **user_dict)
+        for user_dict in users
+    }
+    guild_users = {
+        member.id: _User(
+            id=member.id,
+            name=member.name,
+            discriminator=int(member.discriminator),
+            roles=tuple(sorted(role.id for role in member.roles)),
+            in_guild=True
+        )
+        for member in guild.members
+    }
+
+    users_to_create = set()
+    users_to_update = set()
+    for db_user in db_users.values():
+        guild_user = guild_users.get(db_user.id)
+        if guild_user is not None:
+            if db_user != guild_user:
+                users_to_update.add(guild_user)
+        elif db_user.in_guild:
+            users_to_update.add(db_user._replace(in_guild=False))
+
+    for user_id in set(guild_users.keys()) - set(db_users.keys()):
+        users_to_create.add(guild_users[user_id])
+
+    return _Diff(users_to_create, users_to_update, None)
+
+
+async def measure(coro: t.Awaitable[_Diff], size: int) -> tuple:
+    """Run `coro` and return its duration, peak memory in MiB and longest event loop stall in seconds."""
+    longest_stall = 0
+
+    async def heartbeat() -> None:
+        nonlocal longest_stall
+        while True:
+            before = time.perf_counter()
+            await asyncio.sleep(0)
+            longest_stall = max(longest_stall, time.perf_counter() - before)
+
+    heartbeat_task = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    diff = await coro
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Let the heartbeat see how long it was blocked for by the end of the diff.
+    await asyncio.sleep(0)
+    heartbeat_task.cancel()
+    assert len(diff.updated) == len(range(0, size, 10)), "The diff is incorrect."
+    return duration, peak / 2 ** 20, longest_stall
+
+
+async def main() -> None:
+    """Print the measurements of both implementations for every guild size."""
+    print(f"{'members':>8} {'impl':>9} {'time (s)':>9} {'peak (MiB)':>11} {'stall (ms)':>11}")
+
+    for size in SIZES:
+        guild = make_guild(size)
+        bot = SimpleNamespace(api_client=FakeSite(size))
+
+        for impl, coro in (
+            ("at once", get_diff_at_once(bot, guild)),
+            ("streaming", UserSyncer(bot)._get_diff(guild)),
+        ):
+            duration, peak, stall = await measure(coro, size)
+            print(f"{size:>8} {impl:>9} {duration:>9.2f} {peak:>11.1f} {stall * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
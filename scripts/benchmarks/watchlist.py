@@ -0,0 +1,68 @@
+"""
+Compare the combined `WatchlistMatcher` to searching every watchlist pattern in turn.
+
+Run from the project root with `python -m scripts.benchmarks.watchlist`.
+"""
+import random
+import re
+import string
+import timeit
+
+from bot.utils.watchlist import WatchlistMatcher
+
+SIZES = (100, 1_000, 10_000)
+MESSAGES = 200
+REPEAT = 3
+
+
+def make_watchlists(size: int, rng: random.Random) -> tuple:
+    """Create synthetic word and token watchlists with `size` entries in total, half of them literal."""
+    def word() -> str:
+        return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 10)))
+
+    literals = [word() for _ in range(size // 2)]
+    expressions = [f"{word()}+s*" for _ in range(size - len(literals))]
+    split = size // 4
+    return literals[split:] + expressions[split:], literals[:split] + expressions[:split]
+
+
+def make_messages(rng: random.Random) -> list:
+    """Create synthetic messages which don't match any entry, the common case."""
+    return [
+        " ".join("".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9))) for _ in range(40))
+        for _ in range(MESSAGES)
+    ]
+
+
+def main() -> None:
+    """Print the time per message of both approaches for every watchlist size."""
+    rng = random.Random(0)
+    messages = make_messages(rng)
+    print(f"{'entries':>8} {'loop (µs/msg)':>14} {'matcher (µs/msg)':>17} {'build (ms)':>11}")
+
+    for size in SIZES:
+        word_watchlist, token_watchlist = make_watchlists(size, rng)
+
+        patterns = [re.compile(fr"\b{expression}\b", flags=re.IGNORECASE) for expression in word_watchlist]
+        patterns += [re.compile(expression, flags=re.IGNORECASE) for expression in token_watchlist]
+
+        def loop() -> None:
+            for message in messages:
+                for pattern in patterns:
+                    if pattern.search(message):
+                        break
+
+        build_time = min(timeit.repeat(lambda: WatchlistMatcher(word_watchlist, token_watchlist), number=1, repeat=1))
+        matcher = WatchlistMatcher(word_watchlist, token_watchlist)
+
+        def combined() -> None:
+            for message in messages:
+                matcher.search(message)
+
+        loop_time = min(timeit.repeat(loop, number=1, repeat=REPEAT)) / MESSAGES
+        matcher_time = min(timeit.repeat(combined, number=1, repeat=REPEAT)) / MESSAGES
+        print(f"{size:>8} {loop_time * 1e6:>14.1f} {matcher_time * 1e6:>17.1f} {build_time * 1e3:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import unittest
+from unittest.mock import AsyncMock
+
+from bot.cogs.moderation.infraction_index import ActiveInfractionIndex
+from bot.cogs.moderation.infractions import Infractions
+from tests.helpers import MockBot
+
+
+def make_infraction(id_: int, user: int = 1, type_: str = "mute", active: bool = True) -> dict:
+    """Return a minimal infraction dictionary."""
+    return {"id": id_, "user": user, "type": type_, "active": active}
+
+
+class ActiveInfractionIndexTests(unittest.TestCase):
+    """Tests for the index of active infractions."""
+
+    def setUp(self):
+        self.index = ActiveInfractionIndex({"mute", "ban"})
+
+    def test_get_returns_most_recent_infraction(self):
+        """Looking up a user's infraction of a type returns the most recent one."""
+        self.index.load_snapshot([make_infraction(1), make_infraction(3), make_infraction(2, type_="ban")])
+
+        self.assertEqual(self.index.get(1, "mute")["id"], 3)
+        self.assertEqual(self.index.get(1, "ban")["id"], 2)
+        self.assertIsNone(self.index.get(2, "mute"))
+
+    def test_unsupported_and_inactive_infractions_are_ignored(self):
+        """Only active infractions of the supported types are indexed."""
+        self.index.load_snapshot([make_infraction(1, type_="superstar"), make_infraction(2, active=False)])
+        self.index.add(make_infraction(3, type_="superstar"))
+
+        self.assertEqual(len(self.index), 0)
+
+    def test_add_and_remove(self):
+        """Applied infractions are added to the index and deactivated ones removed."""
+        self.index.load_snapshot([])
+        infraction = make_infraction(1)
+
+        self.index.add(infraction)
+        self.assertIs(self.index.get(1, "mute"), infraction)
+
+        self.index.remove(infraction)
+        self.assertIsNone(self.index.get(1, "mute"))
+
+    def test_changes_during_snapshot_are_replayed(self):
+        """Changes made while a snapshot is fetched are applied on top of it."""
+        self.index.load_snapshot([make_infraction(1)])
+
+        self.index.begin_snapshot()
+        self.index.add(make_infraction(2, user=2))
+        self.index.remove(make_infraction(1))
+        drift = self.index.load_snapshot([make_infraction(1), make_infraction(3, user=3)])
+
+        self.assertIsNone(self.index.get(1, "mute"))
+        self.assertEqual(self.index.get(2, "mute")["id"], 2)
+        self.assertEqual(self.index.get(3, "mute")["id"], 3)
+        self.assertEqual(drift, 1)
+
+
+class GetActiveInfractionTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for looking up active infractions in the member event hooks."""
+
+    def setUp(self):
+        self.bot = MockBot()
+        self.bot.api_client.get = AsyncMock(return_value=[make_infraction(1)])
+        self.cog = Infractions(self.bot)
+
+    async def test_fetches_from_site_until_index_is_warm(self):
+        """The site is queried while the index hasn't been loaded yet."""
+        self.assertEqual(await self.cog.get_active_infraction(1, "mute"), make_infraction(1))
+        self.bot.api_client.get.assert_awaited_once()
+        self.bot.stats.incr.assert_called_once_with("infractions.index.mute.misses")
+
+    async def test_uses_index_once_warm(self):
+        """The index answers lookups once it's been loaded, including for users without infractions."""
+        self.cog.active_infractions.load_snapshot([make_infraction(1)])
+
+        self.assertEqual(await self.cog.get_active_infraction(1, "mute"), make_infraction(1))
+        self.assertIsNone(await self.cog.get_active_infraction(2, "mute"))
+        self.bot.api_client.get.assert_not_awaited()
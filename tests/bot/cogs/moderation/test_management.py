@@ -0,0 +1,33 @@
+import unittest
+from unittest.mock import MagicMock
+
+from bot.cogs.moderation.infractions import Infractions
+from bot.cogs.moderation.management import ModManagement
+from bot.cogs.moderation.superstarify import Superstarify
+from tests.helpers import MockBot
+
+
+class InfractionSchedulerTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for finding the cog which schedules the infractions of a type."""
+
+    def setUp(self):
+        self.bot = MockBot()
+        self.infractions = Infractions(self.bot)
+        self.superstarify = Superstarify(self.bot)
+        self.infractions.infraction_loader._sweep_task = MagicMock()
+        self.addCleanup(self.infractions.cog_unload)
+        self.addCleanup(self.superstarify.cog_unload)
+
+        self.bot.cogs = {"Infractions": self.infractions, "Superstarify": self.superstarify}
+        self.bot.get_cog.side_effect = self.bot.cogs.get
+        self.cog = ModManagement(self.bot)
+
+    async def test_infractions_are_scheduled_by_the_cog_supporting_their_type(self):
+        """Edited infractions should be indexed and scheduled by the cog which supports their type."""
+        self.assertIs(self.cog.get_infraction_scheduler("superstar"), self.superstarify)
+        self.assertIs(self.cog.get_infraction_scheduler("mute"), self.infractions)
+
+    async def test_infractions_cog_is_the_fallback(self):
+        """The Infractions cog should be used if the cog supporting the type isn't loaded."""
+        del self.bot.cogs["Superstarify"]
+        self.assertIs(self.cog.get_infraction_scheduler("superstar"), self.infractions)
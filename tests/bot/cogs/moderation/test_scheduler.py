@@ -0,0 +1,144 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bot.api import ResponseCodeError
+from bot.cogs.moderation.infractions import Infractions
+from bot.cogs.moderation.scheduler import ActiveInfractionLoader
+from bot.cogs.moderation.superstarify import Superstarify
+from bot.utils.scheduling import ScheduleWindow
+from tests.helpers import MockBot
+
+
+def make_infraction(id_: int, type_: str = "mute", expires_in: timedelta = None) -> dict:
+    """Return a minimal active infraction dictionary, expiring after `expires_in` if it's given."""
+    expires_at = (datetime.utcnow() + expires_in).isoformat() if expires_in is not None else None
+    return {"id": id_, "user": id_, "type": type_, "active": True, "expires_at": expires_at}
+
+
+class ScheduleWindowTests(unittest.TestCase):
+    """Tests for the windows of items to schedule."""
+
+    def test_windows_follow_each_other(self):
+        """The first window should include overdue items, and later ones should start where the previous ended."""
+        now = datetime.utcnow()
+        first = ScheduleWindow.after(None)
+        self.assertTrue(first.includes(now - timedelta(days=1)))
+        self.assertTrue(first.includes(first.end))
+        self.assertFalse(first.includes(first.end + timedelta(seconds=1)))
+
+        second = ScheduleWindow.after(first)
+        self.assertEqual(second.start, first.end)
+        self.assertFalse(second.includes(now))
+        self.assertFalse(second.includes(first.end))
+
+
+class ActiveInfractionLoaderTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for loading the active infractions of the infraction schedulers."""
+
+    def setUp(self):
+        self.bot = MockBot()
+        self.infractions = Infractions(self.bot)
+        self.superstarify = Superstarify(self.bot)
+        self.loader = ActiveInfractionLoader.for_bot(self.bot)
+        self.loader._sweep_task = MagicMock()
+
+        for cog in (self.infractions, self.superstarify):
+            cog.schedule_task = MagicMock()
+            self.addCleanup(cog.cog_unload)
+
+        self.pages = [
+            [
+                make_infraction(1, expires_in=timedelta(days=-1)),
+                make_infraction(2, "superstar", timedelta(minutes=30)),
+                make_infraction(3, "ban"),
+            ],
+            [make_infraction(4, expires_in=timedelta(hours=2))],
+        ]
+        self.bot.api_client.get_pages = self.get_pages
+        self.fetches = 0
+
+    async def get_pages(self, endpoint: str, params: dict):
+        """Yield the pages of active infractions."""
+        self.fetches += 1
+        for page in self.pages:
+            yield page
+
+    def scheduled_ids(self, cog: Infractions) -> list:
+        """Return the IDs of the infractions scheduled by the `cog`."""
+        return [args[0] for args, _ in cog.schedule_task.call_args_list]
+
+    async def test_schedulers_share_one_loader(self):
+        """Every scheduler of a bot should share the same loader and fetch."""
+        self.assertIs(self.superstarify.infraction_loader, self.infractions.infraction_loader)
+
+        await self.loader.sweep()
+
+        self.assertEqual(self.fetches, 1)
+        self.assertEqual(len(self.infractions.active_infractions), 3)
+        self.assertEqual(len(self.superstarify.active_infractions), 1)
+        self.bot.stats.gauge.assert_any_call("infractions.index.Superstarify.size", 1)
+
+    async def test_only_infractions_in_window_are_scheduled(self):
+        """Infractions are scheduled once they're due in the window, and never twice."""
+        await self.loader.sweep()
+        self.assertListEqual(self.scheduled_ids(self.infractions), [1])
+        self.assertListEqual(self.scheduled_ids(self.superstarify), [2])
+
+        with patch("bot.utils.scheduling.SCHEDULE_HORIZON", 3 * 60 * 60):
+            await self.loader.sweep()
+        self.assertListEqual(self.scheduled_ids(self.infractions), [1, 4])
+        self.assertListEqual(self.scheduled_ids(self.superstarify), [2])
+
+    async def test_failed_sweep_schedules_nothing(self):
+        """If fetching a page fails, nothing should be scheduled or indexed, and the next sweep should retry."""
+        self.pages.insert(1, None)
+
+        async def get_pages(endpoint: str, params: dict):
+            for page in self.pages:
+                if page is None:
+                    raise ResponseCodeError(MagicMock())
+                yield page
+
+        self.bot.api_client.get_pages = get_pages
+        with self.assertLogs("bot.cogs.moderation.scheduler", "ERROR"):
+            await self.loader.sweep()
+
+        self.infractions.schedule_task.assert_not_called()
+        self.assertFalse(self.infractions.active_infractions.warm)
+        self.assertIsNone(self.loader._windows[self.infractions])
+
+    async def test_timed_out_sweep_stops_recording_changes(self):
+        """If fetching the pages times out, the indices should stop recording changes for the aborted snapshot."""
+        async def get_pages(endpoint: str, params: dict):
+            raise asyncio.TimeoutError
+            yield
+
+        self.bot.api_client.get_pages = get_pages
+        with self.assertLogs("bot.cogs.moderation.scheduler", "ERROR"):
+            await self.loader.sweep()
+
+        self.infractions.schedule_task.assert_not_called()
+        self.assertIsNone(self.infractions.active_infractions._pending_changes)
+        self.assertIsNone(self.superstarify.active_infractions._pending_changes)
+
+    async def test_sweeping_continues_after_errors(self):
+        """A sweep which raises shouldn't stop the following sweeps."""
+        sweep = AsyncMock(side_effect=[asyncio.TimeoutError, RuntimeError, asyncio.CancelledError])
+
+        with patch.object(self.loader, "sweep", sweep), patch("bot.cogs.moderation.scheduler.SWEEP_INTERVAL", 0):
+            with self.assertLogs("bot.cogs.moderation.scheduler", "ERROR"), self.assertRaises(asyncio.CancelledError):
+                await self.loader.sweep_periodically()
+
+        self.assertEqual(sweep.await_count, 3)
+
+    def test_unregistering_last_scheduler_stops_loader(self):
+        """The loader should stop sweeping and be forgotten once its last scheduler is unregistered."""
+        sweep_task = self.loader._sweep_task
+        self.loader.unregister(self.infractions)
+        sweep_task.cancel.assert_not_called()
+
+        self.loader.unregister(self.superstarify)
+        sweep_task.cancel.assert_called_once()
+        self.assertIsNot(ActiveInfractionLoader.for_bot(self.bot), self.loader)
@@ -1,10 +1,11 @@
+import asyncio
 import unittest
 from unittest import mock
-from unittest.mock import MagicMock, Mock
+from unittest.mock import AsyncMock, MagicMock, Mock
 
 from discord import PermissionOverwrite
 
-from bot.cogs.moderation.silence import Silence, SilenceNotifier
+from bot.cogs.moderation.silence import Silence, SilenceNotifier, UnsilenceTask
 from bot.constants import Channels, Emojis, Guild, Roles
 from tests.helpers import MockBot, MockContext, MockTextChannel
 
@@ -78,6 +79,7 @@ class SilenceTests(unittest.IsolatedAsyncioTestCase):
         self.cog = Silence(self.bot)
         self.ctx = MockContext()
         self.cog._verified_role = None
+        self.cog.get_persisted_tasks = AsyncMock(return_value={})
         # Set event so command callbacks can continue.
         self.cog._get_instance_vars_event.set()
 
@@ -108,6 +110,48 @@ class SilenceTests(unittest.IsolatedAsyncioTestCase):
         notifier.assert_called_once_with(mod_log)
         self.bot.get_channel.side_effect = None
 
+    @mock.patch("bot.cogs.moderation.silence.time.time", return_value=1000)
+    async def test_instance_vars_rescheduled_unsilences(self, _):
+        """Persisted unsilences are rescheduled, and ones of unknown channels are discarded."""
+        channel = MockTextChannel(id=5)
+        self.bot.get_channel.side_effect = lambda id_: {5: channel, 6: None}.get(id_, MockTextChannel())
+        self.cog.get_persisted_tasks.return_value = {5: 1060, 6: 1000}
+
+        with mock.patch.object(self.cog, "schedule_task") as schedule_task, \
+                mock.patch.object(self.cog, "discard_persisted_task") as discard_persisted_task:
+            await self.cog._get_instance_vars()
+
+        schedule_task.assert_called_once_with(5, UnsilenceTask(channel, 60))
+        discard_persisted_task.assert_called_once_with(6)
+        self.assertIn(channel, self.cog.muted_channels)
+
+    async def test_instance_vars_set_when_redis_fails(self):
+        """The commands shouldn't wait forever if the persisted unsilences can't be got from Redis."""
+        self.cog._get_instance_vars_event.clear()
+        self.cog.get_persisted_tasks.side_effect = asyncio.TimeoutError
+
+        await self.cog._get_instance_vars()
+        self.assertTrue(self.cog._get_instance_vars_event.is_set())
+
+    async def test_silence_schedules_unsilence(self):
+        """Silencing for a duration schedules unsilencing the channel, and unsilencing cancels it."""
+        with mock.patch.object(self.cog, "_silence", return_value=True), \
+                mock.patch.object(self.cog, "schedule_task") as schedule_task:
+            await self.cog.silence.callback(self.cog, self.ctx, 2)
+        schedule_task.assert_called_once_with(self.ctx.channel.id, UnsilenceTask(self.ctx.channel, 120))
+
+        with mock.patch.object(self.cog, "_unsilence", return_value=True), \
+                mock.patch.object(self.cog, "cancel_task") as cancel_task:
+            await self.cog.unsilence.callback(self.cog, self.ctx)
+        cancel_task.assert_called_once_with(self.ctx.channel.id, ignore_missing=True)
+
+    async def test_scheduled_unsilence_sends_message(self):
+        """The channel is unsilenced once its silence ends, with a message if it was still silenced."""
+        channel = MockTextChannel()
+        with mock.patch.object(self.cog, "_unsilence", return_value=True):
+            await self.cog._scheduled_task(UnsilenceTask(channel, 0))
+        channel.send.assert_called_once_with(f"{Emojis.check_mark} unsilenced current channel.")
+
     async def test_silence_sent_correct_discord_message(self):
         """Check if proper message was sent when called with duration in channel with previous state."""
         test_cases = (
@@ -6,7 +6,7 @@ import discord
 
 from bot import constants
 from bot.api import ResponseCodeError
-from bot.cogs.sync.syncers import Syncer, _Diff
+from bot.cogs.sync.syncers import Syncer, _Diff, _Request
 from tests import helpers
 
 
@@ -402,3 +402,45 @@ class SyncerSyncTests(unittest.IsolatedAsyncioTestCase):
                     self.syncer._wait_for_confirmation.assert_called_once_with(
                         author, expected_message
                     )
+
+
+class SyncerSendRequestsTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for sending the requests of a sync to the site API."""
+
+    def setUp(self):
+        self.bot = helpers.MockBot()
+        self.syncer = TestSyncer(self.bot)
+
+    @staticmethod
+    def response_error(status: int) -> ResponseCodeError:
+        """Return a `ResponseCodeError` with the given `status`."""
+        return ResponseCodeError(mock.MagicMock(status=status))
+
+    async def test_errors_are_raised(self):
+        """Requests which still fail after the API client's retries should raise, without being sent again."""
+        self.bot.api_client.delete.side_effect = self.response_error(500)
+
+        with self.assertRaises(ResponseCodeError):
+            await self.syncer._send_requests([_Request("delete", "bot/lemons/1", None, 1)])
+
+        self.bot.api_client.delete.assert_called_once_with("bot/lemons/1")
+        self.assertEqual(self.syncer._synced, 0)
+
+    @mock.patch.object(constants.Sync, "max_concurrency", new=2)
+    async def test_concurrency_is_bounded(self):
+        """No more than the configured number of requests should be in flight at a time."""
+        in_flight = 0
+        peak = 0
+
+        async def put(*_args, **_kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+
+        self.bot.api_client.put.side_effect = put
+        await self.syncer._send_requests([_Request("put", f"bot/lemons/{i}", {}, 1) for i in range(6)])
+
+        self.assertEqual(self.bot.api_client.put.call_count, 6)
+        self.assertEqual(peak, 2)
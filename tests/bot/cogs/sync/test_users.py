@@ -1,6 +1,7 @@
 import unittest
 from unittest import mock
 
+from bot import constants
 from bot.cogs.sync.syncers import UserSyncer, _Diff, _User
 from tests import helpers
 
@@ -16,6 +17,16 @@ def fake_user(**kwargs):
     return kwargs
 
 
+def fake_page(*users, next_page_no=None):
+    """Fixture to return a page of users as returned by the site API."""
+    return {
+        "count": len(users),
+        "next_page_no": next_page_no,
+        "previous_page_no": None,
+        "results": [user.copy() for user in users],
+    }
+
+
 class UserSyncerDiffTests(unittest.IsolatedAsyncioTestCase):
     """Tests for determining differences between users in the DB and users in the Guild cache."""
 
@@ -42,6 +53,7 @@ class UserSyncerDiffTests(unittest.IsolatedAsyncioTestCase):
 
     async def test_empty_diff_for_no_users(self):
         """When no users are given, an empty diff should be returned."""
+        self.bot.api_client.get.return_value = fake_page()
         guild = self.get_guild()
 
         actual_diff = await self.syncer._get_diff(guild)
@@ -51,7 +63,7 @@ class UserSyncerDiffTests(unittest.IsolatedAsyncioTestCase):
 
     async def test_empty_diff_for_identical_users(self):
         """No differences should be found if the users in the guild and DB are identical."""
-        self.bot.api_client.get.return_value = [fake_user()]
+        self.bot.api_client.get.return_value = fake_page(fake_user())
         guild = self.get_guild(fake_user())
 
         actual_diff = await self.syncer._get_diff(guild)
@@ -63,7 +75,7 @@ class UserSyncerDiffTests(unittest.IsolatedAsyncioTestCase):
         """Only updated users should be added to the 'updated' set of the diff."""
         updated_user = fake_user(id=99, name="new")
 
-        self.bot.api_client.get.return_value = [fake_user(id=99, name="old"), fake_user()]
+        self.bot.api_client.get.return_value = fake_page(fake_user(id=99, name="old"), fake_user())
         guild = self.get_guild(updated_user, fake_user())
 
         actual_diff = await self.syncer._get_diff(guild)
@@ -75,7 +87,7 @@ class UserSyncerDiffTests(unittest.IsolatedAsyncioTestCase):
         """Only new users should be added to the 'created' set of the diff."""
         new_user = fake_user(id=99, name="new")
 
-        self.bot.api_client.get.return_value = [fake_user()]
+        self.bot.api_client.get.return_value = fake_page(fake_user())
         guild = self.get_guild(fake_user(), new_user)
 
         actual_diff = await self.syncer._get_diff(guild)
@@ -87,7 +99,7 @@ class UserSyncerDiffTests(unittest.IsolatedAsyncioTestCase):
         """When a user leaves the guild, the `in_guild` flag is updated to `False`."""
         leaving_user = fake_user(id=63, in_guild=False)
 
-        self.bot.api_client.get.return_value = [fake_user(), fake_user(id=63)]
+        self.bot.api_client.get.return_value = fake_page(fake_user(), fake_user(id=63))
         guild = self.get_guild(fake_user())
 
         actual_diff = await self.syncer._get_diff(guild)
@@ -101,7 +113,7 @@ class UserSyncerDiffTests(unittest.IsolatedAsyncioTestCase):
         updated_user = fake_user(id=55, name="updated")
         leaving_user = fake_user(id=63, in_guild=False)
 
-        self.bot.api_client.get.return_value = [fake_user(), fake_user(id=55), fake_user(id=63)]
+        self.bot.api_client.get.return_value = fake_page(fake_user(), fake_user(id=55), fake_user(id=63))
         guild = self.get_guild(fake_user(), new_user, updated_user)
 
         actual_diff = await self.syncer._get_diff(guild)
@@ -111,7 +123,7 @@ class UserSyncerDiffTests(unittest.IsolatedAsyncioTestCase):
 
     async def test_empty_diff_for_db_users_not_in_guild(self):
         """When the DB knows a user the guild doesn't, no difference is found."""
-        self.bot.api_client.get.return_value = [fake_user(), fake_user(id=63, in_guild=False)]
+        self.bot.api_client.get.return_value = fake_page(fake_user(), fake_user(id=63, in_guild=False))
         guild = self.get_guild(fake_user())
 
         actual_diff = await self.syncer._get_diff(guild)
@@ -119,6 +131,26 @@ class UserSyncerDiffTests(unittest.IsolatedAsyncioTestCase):
 
         self.assertEqual(actual_diff, expected_diff)
 
+    async def test_diff_for_users_on_multiple_pages(self):
+        """Every page of users should be fetched and compared."""
+        new_user = fake_user(id=99, name="new")
+        updated_user = fake_user(id=55, name="updated")
+
+        self.bot.api_client.get.side_effect = [
+            fake_page(fake_user(), next_page_no=2),
+            fake_page(fake_user(id=55), fake_user(id=63, in_guild=False)),
+        ]
+        guild = self.get_guild(fake_user(), new_user, updated_user)
+
+        actual_diff = await self.syncer._get_diff(guild)
+        expected_diff = ({_User(**new_user)}, {_User(**updated_user)}, None)
+
+        self.assertEqual(actual_diff, expected_diff)
+        self.bot.api_client.get.assert_has_calls([
+            mock.call("bot/users", params={"page": 1}),
+            mock.call("bot/users", params={"page": 2}),
+        ])
+
 
 class UserSyncerSyncTests(unittest.IsolatedAsyncioTestCase):
     """Tests for the API requests that sync users."""
@@ -128,31 +160,42 @@ class UserSyncerSyncTests(unittest.IsolatedAsyncioTestCase):
         self.syncer = UserSyncer(self.bot)
 
     async def test_sync_created_users(self):
-        """Only POST requests should be made with the correct payload."""
+        """Only POST requests should be made, with the users in bulk."""
         users = [fake_user(id=111), fake_user(id=222)]
 
         user_tuples = {_User(**user) for user in users}
         diff = _Diff(user_tuples, set(), None)
         await self.syncer._sync(diff)
 
-        calls = [mock.call("bot/users", json=user) for user in users]
-        self.bot.api_client.post.assert_has_calls(calls, any_order=True)
-        self.assertEqual(self.bot.api_client.post.call_count, len(users))
+        self.bot.api_client.post.assert_called_once()
+        self.assertEqual(self.bot.api_client.post.call_args[0], ("bot/users",))
+        self.assertCountEqual(self.bot.api_client.post.call_args[1]["json"], users)
 
-        self.bot.api_client.put.assert_not_called()
+        self.bot.api_client.patch.assert_not_called()
         self.bot.api_client.delete.assert_not_called()
 
     async def test_sync_updated_users(self):
-        """Only PUT requests should be made with the correct payload."""
+        """Only PATCH requests should be made to the bulk endpoint with the correct payload."""
         users = [fake_user(id=111), fake_user(id=222)]
 
         user_tuples = {_User(**user) for user in users}
         diff = _Diff(set(), user_tuples, None)
         await self.syncer._sync(diff)
 
-        calls = [mock.call(f"bot/users/{user['id']}", json=user) for user in users]
-        self.bot.api_client.put.assert_has_calls(calls, any_order=True)
-        self.assertEqual(self.bot.api_client.put.call_count, len(users))
+        self.bot.api_client.patch.assert_called_once()
+        self.assertEqual(self.bot.api_client.patch.call_args[0], ("bot/users/bulk_patch",))
+        self.assertCountEqual(self.bot.api_client.patch.call_args[1]["json"], users)
 
         self.bot.api_client.post.assert_not_called()
         self.bot.api_client.delete.assert_not_called()
+
+    @mock.patch.object(constants.Sync, "chunk_size", new=2)
+    async def test_sync_users_in_chunks(self):
+        """Users should be sent in chunks no larger than the configured chunk size."""
+        users = {_User(**fake_user(id=id_)) for id_ in range(5)}
+        await self.syncer._sync(_Diff(users, set(), None))
+
+        chunks = [call[1]["json"] for call in self.bot.api_client.post.call_args_list]
+        self.assertCountEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertCountEqual([user["id"] for chunk in chunks for user in chunk], range(5))
+        self.assertEqual(self.syncer._synced, 5)
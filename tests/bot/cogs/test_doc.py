@@ -0,0 +1,190 @@
+import asyncio
+import unittest
+import zlib
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bot.cogs import doc
+from tests.helpers import MockBot
+
+PAGE = """
+<html><body>
+<div class="section" id="module-lemon">
+<h1>lemon<a class="headerlink" href="#module-lemon">¶</a></h1>
+<p>Tools for <code>lemons</code>.</p>
+<dl class="function">
+<dt id="lemon.squeeze">lemon.squeeze(<em>lemon</em>)<a class="headerlink" href="#lemon.squeeze">¶</a></dt>
+<dt id="lemon.squeeze_all">lemon.squeeze_all(<em>*lemons</em>)</dt>
+<dd><p>Squeeze some lemons.</p></dd>
+</dl>
+<dl class="class">
+<dt id="lemon.Lemon">class lemon.Lemon<a class="reference internal" href="#"><span>[source]</span></a></dt>
+<dd><p>A lemon.</p></dd>
+<dt id="lemon.Lime">class lemon.Lime</dt>
+</dl>
+</div>
+</body></html>
+"""
+
+INVENTORY = b"""\
+# Sphinx inventory version 2
+# Project: Lemon Tools
+# Version: 1.0
+# The remainder of this file is compressed using zlib.
+""" + zlib.compress(b"""\
+lemon py:module 0 lemon.html#module-$ -
+lemon.squeeze py:function 1 lemon.html#$ -
+""")
+
+
+class ParsePageTests(unittest.TestCase):
+    """Tests for extracting symbols from documentation pages."""
+
+    def test_symbols_are_extracted(self):
+        """The signatures and description of every requested symbol should be extracted."""
+        symbols = doc.parse_page(PAGE, ("lemon.squeeze", "lemon.Lemon", "module-lemon", "lemon.pear"))
+
+        self.assertEqual(
+            symbols["lemon.squeeze"],
+            (["lemon.squeeze(lemon)", "lemon.squeeze_all(*lemons)"], "<dd><p>Squeeze some lemons.</p></dd>")
+        )
+        self.assertEqual(symbols["lemon.Lemon"], (["class lemon.Lemon"], "<dd><p>A lemon.</p></dd>"))
+        self.assertEqual(symbols["module-lemon"], (None, "\n<p>Tools for <code>lemons</code>.</p>\n"))
+        self.assertIsNone(symbols["lemon.pear"])
+
+
+class PageCacheTests(unittest.TestCase):
+    """Tests for the cache of parsed documentation pages."""
+
+    def test_least_recently_used_pages_are_evicted(self):
+        """Pages should be evicted in least recently used order once the cache is too large."""
+        cache = doc.PageCache(max_size=10)
+        cache.set("a", {"x": ([], "12345")})
+        cache.set("b", {"x": ([], "12345")})
+        cache.get("a")
+        cache.set("c", {"x": (["1"], "2"), "y": None})
+
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertEqual(cache.size, 7)
+
+    @patch("bot.cogs.doc.time.monotonic")
+    def test_expired_pages_are_not_returned(self, monotonic):
+        """A page should expire once its TTL has passed."""
+        cache = doc.PageCache(ttl=10)
+        monotonic.return_value = 100
+        cache.set("a", {})
+
+        monotonic.return_value = 109
+        self.assertEqual(cache.get("a"), {})
+
+        monotonic.return_value = 110
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+
+class DocPageTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for looking up symbols with the page cache."""
+
+    async def asyncSetUp(self):  # noqa: N802
+        self.bot = MockBot()
+        self.cog = doc.Doc(self.bot)
+        # Pages are parsed in the executor of the running loop.
+        self.bot.loop = asyncio.get_running_loop()
+        self.cog._fetch_page = AsyncMock(return_value=PAGE)
+
+        for symbol in ("lemon.squeeze", "lemon.Lemon"):
+            url = f"https://lemon.docs/lemon.html#{symbol}"
+            self.cog.inventories[symbol] = url
+            self.cog._add_page_symbol(url)
+
+    async def test_page_is_fetched_once_for_its_symbols(self):
+        """Looking up several symbols on the same page, even concurrently, should only fetch it once."""
+        squeeze, lemon = await asyncio.gather(
+            self.cog.get_symbol_html("lemon.squeeze"), self.cog.get_symbol_html("lemon.Lemon")
+        )
+        self.assertEqual(lemon, (["class lemon.Lemon"], "<dd><p>A lemon.</p></dd>"))
+        self.assertEqual(squeeze[1], "<dd><p>Squeeze some lemons.</p></dd>")
+
+        await self.cog.get_symbol_html("lemon.squeeze")
+        self.cog._fetch_page.assert_awaited_once_with("https://lemon.docs/lemon.html")
+
+    async def test_unknown_symbol(self):
+        """Symbols which aren't in the inventories, or link to a whole page, should return None."""
+        self.cog.inventories["lemon"] = "https://lemon.docs/lemon.html"
+
+        self.assertIsNone(await self.cog.get_symbol_html("lemon.pear"))
+        self.assertIsNone(await self.cog.get_symbol_html("lemon"))
+        self.cog._fetch_page.assert_not_awaited()
+
+
+class InventoryTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for fetching and persisting intersphinx inventories."""
+
+    async def asyncSetUp(self):  # noqa: N802
+        self.bot = MockBot()
+        self.cog = doc.Doc(self.bot)
+        self.bot.loop = asyncio.get_running_loop()
+        self.cog.inventory_cache = MagicMock(
+            set=AsyncMock(),
+            delete_many=AsyncMock(),
+            keys=AsyncMock(return_value=[]),
+            to_dict=AsyncMock(return_value={}),
+        )
+
+        self.response = MagicMock(status=200, headers={"ETag": '"abc"'}, read=AsyncMock(return_value=INVENTORY))
+        self.bot.http_session = MagicMock()
+        self.bot.http_session.get.return_value.__aenter__.return_value = self.response
+
+    def test_parse_inventory(self):
+        """The project name and the relative URLs of the symbols should be parsed from an inventory."""
+        project, groups = doc.parse_inventory(INVENTORY)
+
+        self.assertEqual(project, "Lemon Tools")
+        self.assertEqual(groups, {
+            "py:module": {"lemon": "lemon.html#module-lemon"},
+            "py:function": {"lemon.squeeze": "lemon.html#lemon.squeeze"},
+        })
+
+    def test_encoded_inventory_can_be_decoded(self):
+        """An inventory should be the same after being encoded and decoded."""
+        inventory = doc.Inventory("url", "base_url", None, "date", "Lemon", {"py:module": {"lemon": "lemon.html"}})
+        self.assertEqual(doc.decode_inventory(doc.encode_inventory(inventory)), inventory)
+
+    async def test_downloaded_inventory_is_persisted(self):
+        """A downloaded inventory should be persisted along with its validators."""
+        inventory = await self.cog._fetch_inventory("lemon", "https://lemon.docs/", "https://lemon.docs/objects.inv")
+
+        self.assertEqual(inventory.etag, '"abc"')
+        self.assertIsNone(inventory.last_modified)
+        self.assertEqual(inventory.groups["py:function"], {"lemon.squeeze": "lemon.html#lemon.squeeze"})
+        self.assertEqual(self.bot.http_session.get.call_args[1]["headers"], {})
+
+        self.cog.inventory_cache.set.assert_awaited_once_with("lemon", doc.encode_inventory(inventory))
+
+    async def test_unchanged_inventory_is_not_downloaded(self):
+        """The current inventory should be revalidated, and reused if the server says it's unchanged."""
+        current = doc.Inventory("https://lemon.docs/objects.inv", "https://lemon.docs/", '"abc"', "date", "Lemon", {})
+        self.cog.package_inventories["lemon"] = current
+        self.response.status = 304
+
+        inventory = await self.cog._fetch_inventory("lemon", "https://lemon.docs/", "https://lemon.docs/objects.inv")
+
+        self.assertIs(inventory, current)
+        self.assertEqual(
+            self.bot.http_session.get.call_args[1]["headers"],
+            {"If-None-Match": '"abc"', "If-Modified-Since": "date"}
+        )
+        self.response.read.assert_not_awaited()
+        self.cog.inventory_cache.set.assert_not_awaited()
+
+    async def test_cached_inventories_are_loaded(self):
+        """The symbols of the inventories persisted in Redis should be available after loading them."""
+        project, groups = doc.parse_inventory(INVENTORY)
+        inventory = doc.Inventory("https://lemon.docs/objects.inv", "https://lemon.docs/", None, None, project, groups)
+        self.cog.inventory_cache.to_dict.return_value = {"lemon": doc.encode_inventory(inventory)}
+
+        await self.cog.load_inventory_cache()
+
+        self.assertEqual(self.cog.base_urls, {"lemon": "https://lemon.docs/"})
+        self.assertEqual(self.cog.inventories["lemon.squeeze"], "https://lemon.docs/lemon.html#lemon.squeeze")
+        self.assertEqual(self.cog.page_symbols["https://lemon.docs/lemon.html"], {"module-lemon", "lemon.squeeze"})
@@ -0,0 +1,102 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bot.cogs.filtering import Filtering
+from bot.utils.message_analysis import analyse
+from tests.helpers import MockBot
+
+GUILD_RESPONSE = {
+    "guild": {"id": "1234", "name": "Lemon Lovers", "icon": "abc"},
+    "approximate_member_count": 10,
+    "approximate_presence_count": 5,
+}
+
+
+class InviteResolutionTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for caching and coalescing invite lookups."""
+
+    def setUp(self):
+        self.bot = MockBot()
+        self.cog = Filtering(self.bot)
+        self.cog.invite_cache = MagicMock(get=AsyncMock(return_value=None), set=AsyncMock(), delete=AsyncMock())
+
+        self.responses = {}
+        self.statuses = {}
+        self.bot.http_session.get = AsyncMock(side_effect=self.get_invite)
+
+    async def get_invite(self, url, **_kwargs):
+        """Return a response for the invite at the end of `url`, after giving other lookups a chance to run."""
+        await asyncio.sleep(0)
+        invite = url.rsplit("/", 1)[1]
+        status = self.statuses.get(invite, 200 if "guild" in self.responses[invite] else 404)
+        return MagicMock(status=status, json=AsyncMock(return_value=self.responses[invite]))
+
+    async def test_resolved_invites_are_cached(self):
+        """Invites are only requested from the API once while they are cached."""
+        self.responses["lemon"] = GUILD_RESPONSE
+
+        first = await self.cog.resolve_invite("lemon")
+        second = await self.cog.resolve_invite("lemon")
+
+        self.assertEqual(first, second)
+        self.assertEqual(first["id"], 1234)
+        self.assertEqual(first["icon"], "https://cdn.discordapp.com/icons/1234/abc.png?size=512")
+        self.bot.http_session.get.assert_awaited_once()
+        self.cog.invite_cache.set.assert_awaited_once()
+
+    async def test_invalid_invites_expire_with_negative_ttl(self):
+        """Invalid invites are cached as None until the negative TTL passes."""
+        self.responses["lemon"] = {"code": 10006}
+
+        with patch("bot.cogs.filtering.Filter", new=MagicMock(invite_negative_cache_ttl=-1)):
+            self.assertIsNone(await self.cog.resolve_invite("lemon"))
+            self.assertIsNone(await self.cog.resolve_invite("lemon"))
+
+        self.assertEqual(self.bot.http_session.get.await_count, 2)
+
+    async def test_failed_lookups_are_not_cached(self):
+        """Rate limits and server errors are treated as invalid invites, but neither cached nor persisted."""
+        self.responses["lemon"] = {"message": "You are being rate limited.", "retry_after": 5}
+        self.statuses["lemon"] = 429
+        self.assertIsNone(await self.cog.resolve_invite("lemon"))
+
+        self.statuses["lemon"] = 503
+        self.assertIsNone(await self.cog.resolve_invite("lemon"))
+
+        self.responses["lemon"] = GUILD_RESPONSE
+        del self.statuses["lemon"]
+        self.assertEqual((await self.cog.resolve_invite("lemon"))["id"], 1234)
+
+        self.assertEqual(self.bot.http_session.get.await_count, 3)
+        self.cog.invite_cache.set.assert_awaited_once()
+
+    async def test_concurrent_lookups_are_coalesced(self):
+        """Concurrent lookups of the same invite share a single request."""
+        self.responses["lemon"] = GUILD_RESPONSE
+
+        results = await asyncio.gather(*(self.cog.resolve_invite("lemon") for _ in range(5)))
+
+        self.assertEqual(len({id(result) for result in results}), 1)
+        self.bot.http_session.get.assert_awaited_once()
+        self.assertDictEqual(self.cog.invite_lookups, {})
+
+    async def test_persisted_invites_are_used(self):
+        """Invites persisted in Redis are not requested from the API."""
+        self.cog.invite_cache.get.return_value = '{"expires": 1e12, "guild": null}'
+
+        self.assertIsNone(await self.cog.resolve_invite("lemon"))
+        self.bot.http_session.get.assert_not_awaited()
+
+    async def test_has_invites_resolves_each_invite_once(self):
+        """Every distinct invite in a message is resolved, and unwhitelisted ones are reported."""
+        self.responses["lemon"] = GUILD_RESPONSE
+        self.responses["python"] = {
+            **GUILD_RESPONSE,
+            "guild": {"id": "267624335836053506", "name": "Python", "icon": "x"}
+        }
+
+        result = await self.cog._has_invites(analyse("discord.gg/lemon discord.gg/python discord.gg/lemon"))
+
+        self.assertListEqual(list(result), ["lemon"])
+        self.assertEqual(self.bot.http_session.get.await_count, 2)
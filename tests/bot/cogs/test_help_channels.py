@@ -0,0 +1,125 @@
+import json
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import discord
+
+from bot import constants
+from bot.cogs import help_channels
+from tests.helpers import MockBot, MockGuild, MockMember, MockMessage, MockRole, MockTextChannel
+
+
+class LastMessageTrackingTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for tracking the last message of help channels from events."""
+
+    def setUp(self):
+        self.bot = MockBot(user=MockMember(id=99))
+        self.cog = help_channels.HelpChannels(self.bot)
+        self.cog.last_message_cache = MagicMock(set=AsyncMock(), delete=AsyncMock(), to_dict=AsyncMock())
+
+        self.channel = MockTextChannel(id=1)
+        self.channel.history = MagicMock()
+        self.channel.history.return_value.next = AsyncMock()
+
+    def make_message(self, id_: int, description: str = None) -> MockMessage:
+        """Return a message in the test channel sent by the bot if `description` is given for its embed."""
+        author = self.bot.user if description else MockMember(id=42)
+        embeds = [discord.Embed(description=description)] if description else []
+        return MockMessage(
+            id=id_, channel=self.channel, author=author, embeds=embeds, created_at=datetime(2020, 1, 1)
+        )
+
+    async def test_recorded_message_is_used_without_fetching_history(self):
+        """A recorded last message should be returned without fetching the channel's history."""
+        await self.cog.record_last_message(self.make_message(10, help_channels.AVAILABLE_MSG))
+
+        last_message = await self.cog.get_last_message(self.channel)
+
+        self.channel.history.assert_not_called()
+        self.assertEqual(last_message.id, 10)
+        self.assertEqual(last_message.created_at, 1577836800.0)
+        self.assertTrue(await self.cog.is_empty(self.channel))
+        self.cog.last_message_cache.set.assert_awaited_once_with(1, json.dumps(last_message))
+
+    async def test_older_message_does_not_replace_newer_one(self):
+        """Recording a message older than the known last message should be ignored."""
+        await self.cog.record_last_message(self.make_message(10))
+        await self.cog.record_last_message(self.make_message(5, help_channels.DORMANT_MSG))
+
+        self.assertEqual(self.cog.last_messages[self.channel.id].id, 10)
+        self.assertIsNone(self.cog.last_messages[self.channel.id].embed)
+
+    async def test_deleting_last_message_falls_back_to_history(self):
+        """After the last message is deleted, the channel's history should be fetched once."""
+        await self.cog.record_last_message(self.make_message(10))
+        await self.cog.forget_last_message(self.channel.id, {9})
+        self.assertIn(self.channel.id, self.cog.last_messages)
+
+        await self.cog.forget_last_message(self.channel.id, {10})
+        self.cog.last_message_cache.delete.assert_awaited_once_with(self.channel.id)
+
+        self.channel.history.return_value.next.return_value = self.make_message(8, help_channels.DORMANT_MSG)
+        last_message = await self.cog.get_last_message(self.channel)
+        await self.cog.get_last_message(self.channel)
+
+        self.channel.history.assert_called_once_with(limit=1)
+        self.assertEqual(last_message.id, 8)
+        self.assertEqual(last_message.embed, "dormant")
+
+    async def test_empty_channel_is_remembered(self):
+        """A channel without messages should only have its history fetched once."""
+        self.channel.history.return_value.next.side_effect = discord.NoMoreItems()
+
+        self.assertIsNone(await self.cog.get_last_message(self.channel))
+        self.assertIsNone(await self.cog.get_idle_time(self.channel))
+        self.channel.history.assert_called_once_with(limit=1)
+
+
+class CooldownTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for rescheduling the cooldowns of claimants from the persisted tasks."""
+
+    def setUp(self):
+        self.bot = MockBot()
+        self.cog = help_channels.HelpChannels(self.bot)
+        self.cog.schedule_task = MagicMock()
+        self.cog.discard_persisted_task = MagicMock()
+        self.cog.remove_cooldown_role = AsyncMock()
+
+        self.role = MockRole(id=constants.Roles.help_cooldown)
+        self.claimant = MockMember(id=2, roles=[self.role])
+        self.unpersisted_claimant = MockMember(id=3, roles=[self.role])
+        self.former_claimant = MockMember(id=4)
+        self.role.members = [self.claimant, self.unpersisted_claimant]
+
+        members = {member.id: member for member in (self.claimant, self.unpersisted_claimant, self.former_claimant)}
+        self.guild = MockGuild(get_member=members.get, get_role=MagicMock(return_value=self.role))
+        self.bot.get_guild.return_value = self.guild
+
+        self.cog.get_category_channels = MagicMock(return_value=[MockTextChannel(id=1)])
+        self.cog.get_persisted_tasks = AsyncMock(return_value={1: 1010, 2: 1060, 4: 1000, 5: 1000})
+
+    @patch("bot.cogs.help_channels.time.time", return_value=1000)
+    async def test_cooldowns_are_rescheduled(self, _):
+        """Persisted cooldowns of claimants are rescheduled, and other claimants' cooldowns are ended."""
+        await self.cog.init_cooldowns()
+
+        self.cog.schedule_task.assert_called_once()
+        task_id, data = self.cog.schedule_task.call_args.args
+        self.assertEqual(task_id, self.claimant.id)
+        self.assertEqual(data.wait_time, 60)
+
+        self.assertListEqual([call.args[0] for call in self.cog.discard_persisted_task.call_args_list], [4, 5])
+        self.cog.remove_cooldown_role.assert_awaited_once_with(self.unpersisted_claimant)
+
+    async def test_cooldowns_are_ended_when_redis_fails(self):
+        """Failing to get the persisted cooldowns shouldn't raise, and should end every claimant's cooldown."""
+        self.cog.get_persisted_tasks.side_effect = ConnectionRefusedError
+
+        with self.assertLogs("bot.cogs.help_channels", "ERROR"):
+            await self.cog.init_cooldowns()
+        self.cog.schedule_task.assert_not_called()
+        self.assertListEqual(
+            [call.args[0] for call in self.cog.remove_cooldown_role.await_args_list],
+            [self.claimant, self.unpersisted_claimant]
+        )
@@ -0,0 +1,68 @@
+import unittest
+from datetime import datetime, timedelta
+
+from bot.rules import burst
+from bot.rules.incremental import RuleWindow
+from tests.helpers import MockMessage
+
+
+class RuleWindowTests(unittest.TestCase):
+    """Tests the running totals kept by `RuleWindow`."""
+
+    def setUp(self):
+        self.window = RuleWindow(burst.rule, {"max": 2, "interval": 10})
+        self.now = datetime.utcnow()
+
+    def make_msg(self, message_id: int, author: str, age: float = 0) -> MockMessage:
+        """Create a message by `author` which was sent `age` seconds ago."""
+        return MockMessage(id=message_id, author=author, created_at=self.now - timedelta(seconds=age))
+
+    def test_evaluate_uses_totals_of_last_author(self):
+        """Only the totals of the author of the last message are checked."""
+        authors = ("bob", "alice", "bob", "bob")
+        messages = [self.make_msg(message_id, author) for message_id, author in enumerate(authors)]
+        for message in messages:
+            self.window.insert(message)
+
+        self.assertIsNone(self.window.evaluate(messages[1]))
+        self.assertTupleEqual(
+            self.window.evaluate(messages[3]),
+            ("sent 3 messages in 10s", ("bob",), (messages[3], messages[2], messages[0]))
+        )
+
+    def test_insert_ignores_known_messages(self):
+        """Inserting the same message twice only counts it once."""
+        message = self.make_msg(1, "bob")
+        self.window.insert(message)
+        self.window.insert(message)
+
+        self.assertEqual(len(self.window), 1)
+
+    def test_expired_messages_are_subtracted(self):
+        """Messages older than the interval no longer count towards the totals."""
+        for message_id in range(3):
+            self.window.insert(self.make_msg(message_id, "bob", age=20), evict=False)
+        last_message = self.make_msg(3, "bob")
+        self.window.insert(last_message)
+
+        self.assertEqual(len(self.window), 1)
+        self.assertIsNone(self.window.evaluate(last_message))
+
+    def test_removed_messages_are_subtracted(self):
+        """Removed messages no longer count towards the totals."""
+        messages = [self.make_msg(message_id, "bob") for message_id in range(3)]
+        for message in messages:
+            self.window.insert(message)
+        self.window.remove([0])
+
+        self.assertIsNone(self.window.evaluate(messages[-1]))
+
+    def test_update_measures_message_again(self):
+        """Updating a message moves it to the totals of its new group."""
+        message = self.make_msg(1, "bob")
+        self.window.insert(message)
+        message.author = "alice"
+        self.window.update(message)
+
+        self.assertIsNone(self.window._totals.get("bob"))
+        self.assertListEqual(self.window._totals["alice"], [1])
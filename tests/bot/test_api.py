@@ -1,5 +1,8 @@
+import asyncio
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock, call, patch
+
+import aiohttp
 
 from bot import api
 
@@ -72,3 +75,183 @@ class APIClientTests(unittest.IsolatedAsyncioTestCase):
             response_text=text_data
         )
         self.assertEqual(str(error), f"Status: {self.error_api_response.status} Response: {text_data}")
+
+
+class GetPagesTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for fetching every page of a paginated endpoint."""
+
+    def setUp(self):
+        self.client = MagicMock(spec=api.APIClient)
+
+    async def collect(self) -> list:
+        """Return the pages yielded by `APIClient.get_pages`."""
+        return [page async for page in api.APIClient.get_pages(self.client, "bot/lemons", params={"ripe": "true"})]
+
+    async def test_pages_are_followed(self):
+        """Every page should be fetched in order, following the next page numbers."""
+        self.client.get = AsyncMock(side_effect=[
+            {"results": [1, 2], "next_page_no": 2},
+            {"results": [3], "next_page_no": None},
+        ])
+
+        self.assertListEqual(await self.collect(), [[1, 2], [3]])
+        self.assertListEqual(self.client.get.call_args_list, [
+            call("bot/lemons", params={"ripe": "true", "page": 1}),
+            call("bot/lemons", params={"ripe": "true", "page": 2}),
+        ])
+
+    async def test_unpaginated_endpoint(self):
+        """A response which isn't paginated should be yielded as a single page."""
+        self.client.get = AsyncMock(return_value=[1, 2, 3])
+        self.assertListEqual(await self.collect(), [[1, 2, 3]])
+
+    async def test_prefetched_page_is_cancelled_when_closed(self):
+        """Closing the generator early should cancel the request for the next page."""
+        cancelled = asyncio.Event()
+
+        async def get(endpoint: str, params: dict) -> dict:
+            if params["page"] == 2:
+                try:
+                    await asyncio.Event().wait()
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+            return {"results": [params["page"]], "next_page_no": params["page"] + 1}
+
+        self.client.get = get
+        pages = api.APIClient.get_pages(self.client, "bot/lemons")
+        self.assertListEqual(await pages.__anext__(), [1])
+        await asyncio.sleep(0)
+        await pages.aclose()
+
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+
+class RequestTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for sending requests through the scheduler and retrying them."""
+
+    async def asyncSetUp(self):  # noqa: N802
+        self.client = api.APIClient(loop=asyncio.get_running_loop(), stats=MagicMock())
+        await self.client._creation_task
+        await self.client.session.close()
+        self.client.session = MagicMock()
+
+    def respond(self, *responses: MagicMock) -> None:
+        """Reply to the requests with the `responses` in order."""
+        contexts = []
+        for response in responses:
+            context = MagicMock()
+            context.__aenter__.return_value = response
+            contexts.append(context)
+        self.client.session.request.side_effect = contexts
+
+    @staticmethod
+    def response(status: int, method: str = "GET", **headers) -> MagicMock:
+        """Return a response of the `status` to a request of the `method`."""
+        return MagicMock(status=status, method=method, headers=headers, json=AsyncMock(return_value={"lemon": 1}))
+
+    @patch("bot.api.asyncio.sleep")
+    async def test_retry_after_is_honoured(self, sleep):
+        """Requests refused with 429 should be retried after the delay of their Retry-After header."""
+        self.respond(self.response(429, "POST", **{"Retry-After": "2.5"}), self.response(201, "POST"))
+
+        self.assertDictEqual(await self.client.post("bot/lemons", json={}), {"lemon": 1})
+        sleep.assert_awaited_once_with(2.5)
+        self.client.stats.incr.assert_any_call("api.bot.lemons.post.429")
+        self.client.stats.incr.assert_any_call("api.bot.lemons.post.retries")
+
+    @patch("bot.api.asyncio.sleep")
+    async def test_server_errors_are_retried_with_backoff(self, sleep):
+        """Idempotent requests failing with server errors should be retried after growing random delays."""
+        self.respond(self.response(503), self.response(502), self.response(200))
+
+        with patch("bot.api.random.uniform", side_effect=lambda low, high: high):
+            await self.client.get("bot/lemons/1")
+        self.assertListEqual(sleep.await_args_list, [call(0.5), call(1.0)])
+        self.client.stats.timing.assert_any_call("api.bot.lemons.detail.get", unittest.mock.ANY)
+
+    @patch("bot.api.asyncio.sleep")
+    async def test_unsafe_requests_are_not_retried(self, sleep):
+        """Non-idempotent requests failing with server errors, and requests out of retries, should raise."""
+        self.respond(self.response(503, "POST"))
+        with self.assertRaises(api.ResponseCodeError):
+            await self.client.post("bot/lemons")
+
+        self.respond(*[self.response(503)] * 4)
+        with self.assertRaises(api.ResponseCodeError):
+            await self.client.get("bot/lemons")
+        self.assertEqual(sleep.await_count, 3)
+
+    @patch("bot.api.asyncio.sleep")
+    async def test_unsent_requests_are_retried(self, sleep):
+        """Requests whose connection couldn't be made should be retried whatever their method."""
+        refused = aiohttp.ClientConnectorError(MagicMock(), OSError(111, "Connection refused"))
+        self.respond(self.response(201, "POST"))
+        self.client.session.request.side_effect = [refused, *self.client.session.request.side_effect]
+
+        self.assertDictEqual(await self.client.post("bot/lemons"), {"lemon": 1})
+        sleep.assert_awaited_once()
+
+        self.client.session.request.side_effect = [aiohttp.ServerDisconnectedError()]
+        with self.assertRaises(aiohttp.ServerDisconnectedError):
+            await self.client.post("bot/lemons")
+
+    async def test_no_content(self):
+        """Responses without content should return None."""
+        self.respond(self.response(204, "DELETE"))
+        self.assertIsNone(await self.client.delete("bot/lemons/1"))
+
+
+class RequestSchedulerTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for limiting the concurrency of requests by their priority."""
+
+    def setUp(self):
+        self.scheduler = api.RequestScheduler(max_concurrency=2, max_background=1)
+        self.sent = []
+
+    async def send(self, name: str, priority: api.Priority, done: asyncio.Event) -> None:
+        """Hold a slot of `priority` until `done` is set."""
+        async with self.scheduler.slot(priority):
+            self.sent.append(name)
+            await done.wait()
+
+    async def test_interactive_requests_go_first(self):
+        """Waiting interactive requests should be sent before background ones, which have fewer slots."""
+        done = asyncio.Event()
+        tasks = [
+            asyncio.create_task(self.send("background 1", api.Priority.BACKGROUND, done)),
+            asyncio.create_task(self.send("background 2", api.Priority.BACKGROUND, done)),
+            asyncio.create_task(self.send("interactive 1", api.Priority.INTERACTIVE, done)),
+            asyncio.create_task(self.send("interactive 2", api.Priority.INTERACTIVE, done)),
+        ]
+        await asyncio.sleep(0)
+        self.assertListEqual(self.sent, ["background 1", "interactive 1"])
+
+        done.set()
+        await asyncio.gather(*tasks)
+        self.assertListEqual(self.sent, ["background 1", "interactive 1", "interactive 2", "background 2"])
+
+    async def test_cancelled_waiters_free_their_slots(self):
+        """Requests cancelled while waiting should neither be sent nor keep a slot."""
+        done = asyncio.Event()
+        first = asyncio.create_task(self.send("first", api.Priority.BACKGROUND, done))
+        cancelled = asyncio.create_task(self.send("cancelled", api.Priority.BACKGROUND, done))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        done.set()
+        await first
+        await self.send("last", api.Priority.BACKGROUND, done)
+        self.assertListEqual(self.sent, ["first", "last"])
+
+    async def test_background_requests_context(self):
+        """Requests made in `background_requests` and the tasks it creates should be background requests."""
+        self.assertIs(api._priority.get(), api.Priority.INTERACTIVE)
+        with api.background_requests():
+            self.assertIs(await asyncio.create_task(self.priority()), api.Priority.BACKGROUND)
+        self.assertIs(api._priority.get(), api.Priority.INTERACTIVE)
+
+    @staticmethod
+    async def priority() -> api.Priority:
+        """Return the priority of the requests of the current task."""
+        return api._priority.get()
@@ -0,0 +1,56 @@
+import unittest
+from unittest.mock import MagicMock
+
+from bot.async_stats import AsyncStatsClient
+
+
+class AsyncStatsClientTests(unittest.TestCase):
+    """Tests for the buffered statsd client."""
+
+    def setUp(self):
+        self.loop = MagicMock()
+        self.client = AsyncStatsClient(self.loop, "localhost", 8125, prefix="bot", max_udp_size=64)
+        self.client._transport = MagicMock()
+
+    def sent_datagrams(self):
+        """Return the datagrams sent by the client, decoded."""
+        return [call[0][0].decode("ascii") for call in self.client._transport.sendto.call_args_list]
+
+    def test_metrics_are_buffered_until_flushed(self):
+        """Metrics should only be sent on a flush, in a single datagram, which is only scheduled once."""
+        self.client.gauge("lemons", 3)
+        self.client.timing("lemonade", 2)
+
+        self.client._transport.sendto.assert_not_called()
+        self.loop.call_later.assert_called_once_with(1, self.client.flush)
+
+        self.client.flush()
+        self.assertListEqual(self.sent_datagrams(), ["bot.lemons:3|g\nbot.lemonade:2.000000|ms"])
+
+    def test_counters_are_summed(self):
+        """Unsampled increments of the same stat should be sent as a single line."""
+        self.client.incr("lemons")
+        self.client.incr("lemons", 4)
+        self.client.decr("limes")
+        self.client.incr("limes")
+
+        self.client.flush()
+        self.assertListEqual(self.sent_datagrams(), ["bot.lemons:5|c"])
+
+    def test_full_buffer_is_sent(self):
+        """The buffer should be sent as soon as the next metric doesn't fit in a datagram."""
+        for index in range(5):
+            self.client.gauge(f"lemon_{index}", 123456)
+
+        datagrams = self.sent_datagrams()
+        self.assertListEqual(datagrams, ["\n".join(f"bot.lemon_{index}:123456|g" for index in range(3))])
+
+        self.client.flush()
+        datagrams = self.sent_datagrams()
+        self.assertEqual(len(datagrams), 2)
+        self.assertTrue(all(len(datagram) <= 64 for datagram in datagrams))
+
+    def test_flush_without_metrics_sends_nothing(self):
+        """Flushing an empty buffer should not send an empty datagram."""
+        self.client.flush()
+        self.client._transport.sendto.assert_not_called()
@@ -0,0 +1,81 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import fakeredis.aioredis
+
+from bot import redis_session
+from tests.helpers import MockBot
+
+
+class RedisSessionTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for timing out and timing the commands of the Redis session."""
+
+    async def asyncSetUp(self):  # noqa: N802
+        self.session = await fakeredis.aioredis.create_redis_pool(commands_factory=redis_session.RedisSession)
+        self.session.stats = MagicMock()
+        self.session.command_timeout = 1
+
+    async def test_commands_are_timed(self):
+        """The latency of commands should be sent to stats by command."""
+        await self.session.set("lemon", 1)
+        self.assertEqual(await self.session.get("lemon"), b"1")
+
+        commands = [timing.args[0] for timing in self.session.stats.timing.call_args_list]
+        self.assertListEqual(commands, ["redis.commands.set", "redis.commands.get"])
+
+    async def test_pipelined_commands_are_not_timed(self):
+        """Commands queued in a pipeline shouldn't be timed or timed out from when they're queued."""
+        with patch.object(redis_session.RedisSession, "stats", self.session.stats):
+            pipeline = self.session.pipeline()
+            pipeline.set("lemon", 1)
+            pipeline.get("lemon")
+            self.assertListEqual(await pipeline.execute(), [True, b"1"])
+
+        self.session.stats.timing.assert_not_called()
+
+    async def test_commands_time_out(self):
+        """Commands without a reply within the timeout should raise a timeout error."""
+        self.session.command_timeout = 0.01
+        with patch.object(self.session.connection, "execute", return_value=asyncio.Future()):
+            with self.assertRaises(asyncio.TimeoutError):
+                await self.session.get("lemon")
+
+
+class RedisHealthCheckTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for pinging Redis and switching to the degraded mode while it's unreachable."""
+
+    def setUp(self):
+        self.bot = MockBot()
+        self.bot.redis_closed = False
+        self.bot.redis_degraded = False
+        self.bot.redis_session.ping = AsyncMock(side_effect=[OSError, asyncio.TimeoutError, OSError, b"PONG"])
+        self.health_check = redis_session.RedisHealthCheck(self.bot, interval=30)
+
+    async def run_health_check(self, pings: int) -> list:
+        """Run the health check for `pings` pings and return the delays it slept for."""
+        delays = []
+
+        async def sleep(delay: float) -> None:
+            delays.append(delay)
+            if len(delays) == pings:
+                self.bot.redis_closed = True
+
+        with patch("bot.redis_session.asyncio.sleep", side_effect=sleep):
+            await self.health_check.run()
+        return delays
+
+    async def test_failed_pings_are_retried_with_backoff(self):
+        """Failed pings should be retried after increasing delays, and successful ones after the interval."""
+        self.assertListEqual(await self.run_health_check(4), [1, 2, 4, 30])
+        self.bot.stats.incr.assert_called_with("redis.health_check.failures")
+        self.bot.stats.gauge.assert_any_call("redis.pool.max", self.bot.redis_session.connection.maxsize)
+
+    async def test_degraded_while_unreachable(self):
+        """The bot should be degraded from the first failed ping until a ping succeeds."""
+        await self.run_health_check(1)
+        self.assertIs(self.bot.redis_degraded, True)
+
+        self.bot.redis_closed = False
+        self.assertListEqual(await self.run_health_check(3), [1, 2, 30])
+        self.assertIs(self.bot.redis_degraded, False)
@@ -0,0 +1,124 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock, call
+
+from bot import timers
+
+
+class TimerQueueTests(unittest.TestCase):
+    """Tests for running callbacks from the timer queue."""
+
+    def setUp(self):
+        self.now = 0.0
+        self.loop = MagicMock()
+        self.loop.time.side_effect = lambda: self.now
+        self.loop.call_at.side_effect = lambda when, callback: MagicMock(spec=asyncio.TimerHandle, when=lambda: when)
+        self.stats = MagicMock()
+        self.queue = timers.TimerQueue(self.loop, self.stats)
+
+    def advance(self, seconds: float) -> None:
+        """Advance the loop's time by `seconds` and run the queue's handle as the loop would."""
+        self.now += seconds
+        self.queue._run_due_timers()
+
+    def test_callbacks_run_in_order_of_time(self):
+        """Due callbacks should run in order of their times, and ones scheduled for the same time in order."""
+        callback = MagicMock()
+        self.queue.call_later(3, callback, "c")
+        self.queue.call_later(1, callback, "a")
+        self.queue.call_later(1, callback, "b")
+        self.queue.call_later(-5, callback, "now")
+
+        self.advance(2)
+        self.assertListEqual(callback.call_args_list, [call("now"), call("a"), call("b")])
+        self.assertEqual(len(self.queue), 1)
+
+        self.advance(1)
+        callback.assert_called_with("c")
+        self.assertEqual(len(self.queue), 0)
+
+    def test_handle_is_scheduled_for_earliest_timer(self):
+        """Only one handle should be scheduled on the loop, for the time of the earliest timer."""
+        self.queue.call_later(10, MagicMock())
+        self.queue.call_later(20, MagicMock())
+        self.queue.call_later(5, MagicMock())
+
+        self.assertEqual(self.loop.call_at.call_count, 2)
+        self.loop.call_at.assert_called_with(5, self.queue._run_due_timers)
+        self.assertEqual(self.queue._handle.when(), 5)
+
+        self.advance(5)
+        self.loop.call_at.assert_called_with(10, self.queue._run_due_timers)
+
+    def test_cancelled_timers_do_not_run(self):
+        """Cancelled timers shouldn't run, and cancelling a timer which already ran should do nothing."""
+        callback = MagicMock()
+        ran = self.queue.call_later(1, callback, "ran")
+        cancelled = self.queue.call_later(1, callback, "cancelled")
+        cancelled.cancel()
+        cancelled.cancel()
+        self.assertEqual(len(self.queue), 1)
+
+        self.advance(1)
+        ran.cancel()
+
+        callback.assert_called_once_with("ran")
+        self.assertFalse(ran.cancelled)
+        self.assertEqual(len(self.queue), 0)
+
+    def test_cancelled_timers_are_compacted(self):
+        """The heap should be rebuilt without cancelled timers once they make up over half of it."""
+        scheduled = [self.queue.call_later(i, MagicMock()) for i in range(timers.MIN_COMPACT_SIZE * 2)]
+        for timer in scheduled[:timers.MIN_COMPACT_SIZE]:
+            timer.cancel()
+        self.assertEqual(len(self.queue._heap), timers.MIN_COMPACT_SIZE * 2)
+
+        scheduled[-1].cancel()
+        self.assertEqual(len(self.queue._heap), timers.MIN_COMPACT_SIZE - 1)
+        self.assertEqual(len(self.queue), timers.MIN_COMPACT_SIZE - 1)
+
+    def test_errors_do_not_stop_other_timers(self):
+        """An exception raised by a callback should be logged without stopping the other due timers."""
+        callback = MagicMock()
+        self.queue.call_later(1, MagicMock(side_effect=ValueError))
+        self.queue.call_later(1, callback)
+
+        with self.assertLogs(timers.log, "ERROR"):
+            self.advance(1)
+        callback.assert_called_once()
+
+    def test_stats(self):
+        """The lateness of timers and the number of pending timers should be sent to stats."""
+        self.queue.call_later(1, MagicMock())
+        self.queue.call_later(5, MagicMock())
+
+        self.advance(1.5)
+        self.stats.timing.assert_called_once_with("timers.lateness", 500)
+        self.stats.gauge.assert_called_once_with("timers.pending", 1)
+
+    def test_close(self):
+        """Closing should cancel the handle and every pending timer."""
+        timer = self.queue.call_later(1, MagicMock())
+        handle = self.queue._handle
+        self.queue.close()
+
+        handle.cancel.assert_called_once()
+        self.assertTrue(timer.cancelled)
+        self.assertEqual(len(self.queue), 0)
+
+
+class TimerQueueLoopTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the timer queue on a running event loop."""
+
+    async def test_callbacks_run_on_loop(self):
+        """Callbacks should be run by the loop once they're due."""
+        queue = timers.TimerQueue(asyncio.get_running_loop())
+        done = asyncio.Event()
+        results = []
+
+        queue.call_later(0.02, done.set)
+        queue.call_later(0.01, results.append, "first")
+
+        await asyncio.wait_for(done.wait(), 1)
+        self.assertListEqual(results, ["first"])
+        queue.close()
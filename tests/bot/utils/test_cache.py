@@ -0,0 +1,116 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bot.utils.cache import async_cache
+
+
+class Lemonade:
+    """A class with a cached method which counts its calls."""
+
+    def __init__(self):
+        self.bot = MagicMock()
+        self.calls = 0
+
+    @async_cache(max_size=2, ttl=10)
+    async def squeeze(self, lemons: int, *, sugar: dict = None) -> int:
+        self.calls += 1
+        await asyncio.sleep(0)
+        return lemons if lemons >= 0 else None
+
+
+class AsyncCacheTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the async cache decorator."""
+
+    def setUp(self):
+        Lemonade.squeeze.clear()
+        self.lemonade = Lemonade()
+
+    async def test_results_are_cached(self):
+        """Calls with the same arguments should only call the function once, and report a hit."""
+        self.assertEqual(await self.lemonade.squeeze(1, sugar={"cubes": 2}), 1)
+        self.assertEqual(await self.lemonade.squeeze(1, sugar={"cubes": 2}), 1)
+        self.assertEqual(await self.lemonade.squeeze(1), 1)
+
+        self.assertEqual(self.lemonade.calls, 2)
+        self.lemonade.bot.stats.incr.assert_any_call("cache.Lemonade.squeeze.hits")
+
+    async def test_concurrent_calls_are_coalesced(self):
+        """Concurrent calls with the same arguments should share a single call of the function."""
+        results = await asyncio.gather(*(self.lemonade.squeeze(3) for _ in range(5)))
+
+        self.assertEqual(results, [3] * 5)
+        self.assertEqual(self.lemonade.calls, 1)
+        self.lemonade.bot.stats.incr.assert_any_call("cache.Lemonade.squeeze.coalesced")
+
+    async def test_least_recently_used_result_is_evicted(self):
+        """Once the cache is full, the least recently used result should be evicted."""
+        await self.lemonade.squeeze(1)
+        await self.lemonade.squeeze(2)
+        await self.lemonade.squeeze(1)
+        await self.lemonade.squeeze(3)
+
+        self.assertEqual(len(Lemonade.squeeze), 2)
+        await self.lemonade.squeeze(1)
+        self.assertEqual(self.lemonade.calls, 3)
+        await self.lemonade.squeeze(2)
+        self.assertEqual(self.lemonade.calls, 4)
+        self.lemonade.bot.stats.incr.assert_any_call("cache.Lemonade.squeeze.evictions")
+
+    @patch("bot.utils.cache.time.monotonic")
+    async def test_expired_results_are_not_used(self, monotonic):
+        """Results should only be used until their TTL has passed."""
+        monotonic.return_value = 100
+        await self.lemonade.squeeze(1)
+
+        monotonic.return_value = 109
+        await self.lemonade.squeeze(1)
+        self.assertEqual(self.lemonade.calls, 1)
+
+        monotonic.return_value = 110
+        await self.lemonade.squeeze(1)
+        self.assertEqual(self.lemonade.calls, 2)
+
+    async def test_none_and_exceptions_are_not_cached(self):
+        """Results which are None and exceptions should not be cached."""
+        self.assertIsNone(await self.lemonade.squeeze(-1))
+        self.assertIsNone(await self.lemonade.squeeze(-1))
+        self.assertEqual(self.lemonade.calls, 2)
+
+        pour = AsyncMock(side_effect=[ValueError, 5])
+
+        @async_cache()
+        async def cached_pour() -> int:
+            return await pour()
+
+        with self.assertRaises(ValueError):
+            await cached_pour()
+        self.assertEqual(await cached_pour(), 5)
+        self.assertEqual(await cached_pour(), 5)
+        self.assertEqual(pour.await_count, 2)
+
+    async def test_invalidate(self):
+        """Invalidating a result should only remove that result from the cache."""
+        await self.lemonade.squeeze(1)
+        await self.lemonade.squeeze(2)
+
+        self.assertTrue(self.lemonade.squeeze.invalidate(1))
+        self.assertFalse(self.lemonade.squeeze.invalidate(1))
+
+        await self.lemonade.squeeze(1)
+        await self.lemonade.squeeze(2)
+        self.assertEqual(self.lemonade.calls, 3)
+        self.lemonade.bot.stats.gauge.assert_called_with("cache.Lemonade.squeeze.size", 2)
+
+    async def test_pending_calls_are_not_cached_after_clear(self):
+        """Calls still pending when the cache is cleared shouldn't cache their results, nor be joined by new calls."""
+        pending = asyncio.ensure_future(self.lemonade.squeeze(1))
+        await asyncio.sleep(0)
+        self.lemonade.squeeze.clear()
+
+        self.assertEqual(await asyncio.gather(pending, self.lemonade.squeeze(1)), [1, 1])
+        self.assertEqual(self.lemonade.calls, 2)
+        self.assertEqual(len(Lemonade.squeeze), 1)
+
+        await self.lemonade.squeeze(1)
+        self.assertEqual(self.lemonade.calls, 2)
@@ -0,0 +1,35 @@
+import unittest
+
+from bot.utils.message_analysis import analyse, expand_spoilers
+
+
+class MessageAnalysisTests(unittest.TestCase):
+    """Tests for the shared message content analysis."""
+
+    def test_analysis_is_shared_for_same_content(self):
+        """The same content always gives the same analysis instance."""
+        self.assertIs(analyse("lemon"), analyse("lemon"))
+        self.assertIsNot(analyse("lemon"), analyse("lemonade"))
+
+    def test_expand_spoilers(self):
+        """Spoilers are expanded into all of their interpretations."""
+        self.assertEqual(expand_spoilers("a||b||c"), "ac||b||a||b||c")
+        self.assertEqual(analyse("a||b||c").expanded_content, "ac||b||a||b||c")
+        self.assertEqual(analyse("abc").expanded_content, "abc")
+
+    def test_derived_facts(self):
+        """The facts derived from the content match what each consumer expects."""
+        analysis = analyse(
+            "see https://pydis.com and discord.gg/python\n\n"
+            "MTIz.DN9R_A.xyz <:ducky:574951975574175744>\n"
+            "https://discordapp.com/api/webhooks/123/abc"
+        )
+
+        self.assertEqual(analysis.urls, ["https://pydis.com", "https://discordapp.com/api/webhooks/123/abc"])
+        self.assertEqual(analysis.invite_codes, ["python"])
+        self.assertIn("MTIz.DN9R_A.xyz", analysis.token_candidates)
+        self.assertEqual(analysis.webhook_url[1], "https://discordapp.com/api/webhooks/123/")
+        self.assertEqual(analysis.line_count, 4)
+        self.assertEqual(analysis.newline_groups, [2, 1])
+        self.assertEqual(analysis.discord_emoji_count, 1)
+        self.assertFalse(analysis.has_zalgo)
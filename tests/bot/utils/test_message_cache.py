@@ -0,0 +1,70 @@
+import unittest
+from datetime import datetime, timedelta
+
+from bot.utils.message_cache import MessageWindowCache
+from tests.helpers import MockMessage, MockTextChannel
+
+
+class MessageWindowCacheTests(unittest.TestCase):
+    """Tests for the `MessageWindowCache` used by the antispam cog."""
+
+    def setUp(self):
+        self.cache = MessageWindowCache(max_age=10)
+        self.channel = MockTextChannel(id=1)
+        self.now = datetime.utcnow()
+
+    def make_msg(self, message_id: int, age: float) -> MockMessage:
+        """Create a message in the test channel which was sent `age` seconds ago."""
+        return MockMessage(
+            id=message_id,
+            channel=self.channel,
+            created_at=self.now - timedelta(seconds=age)
+        )
+
+    def test_channel_is_cold_until_primed(self):
+        """A channel is only warm once it has been primed."""
+        self.assertFalse(self.cache.is_warm(self.channel.id))
+        self.cache.prime(self.channel.id, [])
+        self.assertTrue(self.cache.is_warm(self.channel.id))
+
+    def test_get_recent_returns_newest_first_within_interval(self):
+        """`get_recent` returns the messages sent within the interval, newest first."""
+        messages = [self.make_msg(1, 8), self.make_msg(2, 4), self.make_msg(3, 1)]
+        for message in messages:
+            self.cache.append(message)
+
+        self.assertListEqual(self.cache.get_recent(self.channel.id, 5, now=self.now), messages[:0:-1])
+
+    def test_append_evicts_expired_messages(self):
+        """Appending a message evicts messages older than `max_age`."""
+        self.cache.prime(self.channel.id, [self.make_msg(1, 20)])
+        evicted = self.cache.append(self.make_msg(2, 0))
+
+        self.assertEqual(evicted, 1)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_prime_merges_without_duplicates(self):
+        """Priming merges with already cached messages and ignores duplicates."""
+        first, second = self.make_msg(1, 2), self.make_msg(2, 1)
+        self.cache.append(second)
+        self.cache.prime(self.channel.id, [first, second])
+        self.cache.append(second)
+
+        self.assertListEqual(self.cache.get_recent(self.channel.id, 10, now=self.now), [second, first])
+
+    def test_remove_drops_messages(self):
+        """Removed messages are no longer returned."""
+        first, second = self.make_msg(1, 2), self.make_msg(2, 1)
+        self.cache.append(first)
+        self.cache.append(second)
+        self.cache.remove(self.channel.id, [second.id])
+
+        self.assertListEqual(self.cache.get_recent(self.channel.id, 10, now=self.now), [first])
+
+    def test_clear_makes_channels_cold(self):
+        """Clearing the cache drops all messages and makes every channel cold."""
+        self.cache.append(self.make_msg(1, 0))
+        self.cache.clear()
+
+        self.assertFalse(self.cache.is_warm(self.channel.id))
+        self.assertEqual(len(self.cache), 0)
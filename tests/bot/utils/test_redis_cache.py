@@ -1,10 +1,13 @@
 import asyncio
+import math
 import unittest
+import unittest.mock
+from datetime import datetime
 
 import fakeredis.aioredis
 
 from bot.utils import RedisCache
-from bot.utils.redis_cache import NoBotInstanceError, NoNamespaceError, NoParentInstanceError
+from bot.utils.redis_cache import InvalidationListener, NoBotInstanceError, NoNamespaceError, NoParentInstanceError
 from tests import helpers
 
 
@@ -18,8 +21,7 @@ class RedisCacheTests(unittest.IsolatedAsyncioTestCase):
 
         # Okay, so this is necessary so that we can create a clean new
         # class for every test method, and we want that because it will
-        # ensure we get a fresh loop, which is necessary for test_increment_lock
-        # to be able to pass.
+        # ensure we get a fresh loop for every test.
         class DummyCog:
             """A dummy cog, for dummies."""
 
@@ -110,6 +112,18 @@ class RedisCacheTests(unittest.IsolatedAsyncioTestCase):
         # If these are equal now, everything works fine.
         self.assertSequenceEqual(test_cases, redis_items)
 
+    async def test_items_in_batches(self):
+        """Test that iterating over .items with async for fetches the items in batches."""
+        items = {f"lemon {i}": i for i in range(25)}
+        await self.cog.redis.update(items)
+
+        redis = self.bot.redis_session
+        with unittest.mock.patch.object(redis, "hscan", wraps=redis.hscan) as hscan:
+            scanned = {key: value async for key, value in self.cog.redis.items(batch_size=10)}
+
+        self.assertDictEqual(scanned, items)
+        self.assertEqual(hscan.call_count, 3)
+
     async def test_length(self):
         """Test that we can get the correct .length from the RedisDict."""
         await self.cog.redis.set('one', 1)
@@ -120,6 +134,12 @@ class RedisCacheTests(unittest.IsolatedAsyncioTestCase):
         await self.cog.redis.set('four', 4)
         self.assertEqual(await self.cog.redis.length(), 4)
 
+    async def test_keys(self):
+        """Test that .keys returns the keys of the cache with their types."""
+        await self.cog.redis.set('one', 1)
+        await self.cog.redis.set(2, 'two')
+        self.assertCountEqual(await self.cog.redis.keys(), ['one', 2])
+
     async def test_to_dict(self):
         """Test that the .to_dict method returns a workable dictionary copy."""
         copy = await self.cog.redis.to_dict()
@@ -160,6 +180,48 @@ class RedisCacheTests(unittest.IsolatedAsyncioTestCase):
         }
         self.assertDictEqual(await self.cog.redis.to_dict(), result)
 
+    async def test_get_many_and_delete_many(self):
+        """Test that several items can be got and deleted at once."""
+        await self.cog.redis.update({"lemon": 1, "lime": 2.5, "orange": "yes"})
+
+        self.assertDictEqual(await self.cog.redis.get_many(["lemon", "lime", "grape"]), {"lemon": 1, "lime": 2.5})
+        self.assertDictEqual(await self.cog.redis.get_many([]), {})
+
+        self.assertEqual(await self.cog.redis.delete_many(["lemon", "orange", "grape"]), 2)
+        self.assertEqual(await self.cog.redis.delete_many([]), 0)
+        self.assertDictEqual(await self.cog.redis.to_dict(), {"lime": 2.5})
+
+    async def test_pipeline(self):
+        """Test that commands queued in a pipeline are sent in one round trip when it's left."""
+        await self.cog.redis.set("lemon", 1)
+
+        patch_multi_exec = unittest.mock.patch.object(
+            self.bot.redis_session, "multi_exec", wraps=self.bot.redis_session.multi_exec
+        )
+        with patch_multi_exec as multi_exec:
+            async with self.cog.redis.pipeline() as pipeline:
+                pipeline.set("lime", 2)
+                popped = pipeline.pop("lemon")
+                found = pipeline.get_many(["lemon", "lime"])
+                contained = pipeline.contains("lime")
+                default = pipeline.get("grape", "sour")
+                self.assertFalse(popped.done())
+
+        multi_exec.assert_called_once()
+        self.assertEqual(popped.result(), 1)
+        self.assertDictEqual(found.result(), {"lime": 2})
+        self.assertIs(contained.result(), True)
+        self.assertEqual(default.result(), "sour")
+
+    async def test_pipeline_discarded_on_error(self):
+        """Test that the commands queued in a pipeline aren't sent if an exception is raised in it."""
+        with self.assertRaises(ValueError):
+            async with self.cog.redis.pipeline(transaction=False) as pipeline:
+                pipeline.set("lemon", 1)
+                raise ValueError
+
+        self.assertEqual(await self.cog.redis.length(), 0)
+
     def test_typestring_conversion(self):
         """Test the typestring-related helper functions."""
         conversion_tests = (
@@ -181,6 +243,57 @@ class RedisCacheTests(unittest.IsolatedAsyncioTestCase):
             self.cog.redis._value_to_typestring(["internet"])
             self.cog.redis._value_from_typestring("o|firedog")
 
+    async def test_binary_values(self):
+        """Test that caches with binary values store structured values."""
+        class BinaryCog:
+            cache = RedisCache(binary=True)
+
+            def __init__(self, bot: helpers.MockBot):
+                self.bot = bot
+
+        cache = BinaryCog(self.bot).cache
+        lemon = {"juice": [1.5, b"\x00pulp"], "picked": datetime(2020, 5, 1, 12, 30), 12: None}
+        await cache.set("lemon", lemon)
+        await cache.update({"lime": [1, "2"], "grape": True})
+
+        self.assertDictEqual(await cache.get("lemon"), lemon)
+        self.assertDictEqual(await cache.to_dict(), {"lemon": lemon, "lime": [1, "2"], "grape": True})
+        with self.assertRaises(TypeError):
+            await cache.increment("grape")
+
+    async def test_items_expire(self):
+        """Test that items of caches with a TTL are deleted once they expire, unless they're set again."""
+        class ExpiringCog:
+            cache = RedisCache(ttl=60)
+
+            def __init__(self, bot: helpers.MockBot):
+                self.bot = bot
+
+        cache = ExpiringCog(self.bot).cache
+        with unittest.mock.patch("bot.utils.redis_cache.time.time", return_value=1000):
+            await cache.set("lemon", 1)
+            await cache.set("lime", 2, ttl=math.inf)
+            await cache.update({"grape": 3, "apple": 4}, ttl=10)
+            async with cache.pipeline() as pipeline:
+                pipeline.set("pear", 5, ttl=100)
+
+        with unittest.mock.patch("bot.utils.redis_cache.time.time", return_value=1030):
+            await cache.set("apple", 4)
+            self.assertEqual(await cache._sweep(), 1)
+        self.assertDictEqual(await cache.to_dict(), {"lemon": 1, "lime": 2, "apple": 4, "pear": 5})
+
+        with unittest.mock.patch("bot.utils.redis_cache.time.time", return_value=1095):
+            self.assertEqual(await cache._sweep(), 2)
+        self.assertDictEqual(await cache.to_dict(), {"lime": 2, "pear": 5})
+
+        await cache.clear()
+        self.assertFalse(await self.bot.redis_session.exists(cache._expiries_key))
+
+    async def test_ttl_requires_expiring_cache(self):
+        """Test that items of caches without a TTL can't be given one."""
+        with self.assertRaises(ValueError):
+            await self.cog.redis.set("lemon", 1, ttl=60)
+
     async def test_increment_decrement(self):
         """Test .increment and .decrement methods."""
         await self.cog.redis.set("entropic", 5)
@@ -223,7 +336,7 @@ class RedisCacheTests(unittest.IsolatedAsyncioTestCase):
         with self.assertRaises(TypeError):
             await self.cog.redis.increment("stringthing")
 
-    async def test_increment_lock(self):
+    async def test_increment_concurrently(self):
         """Test that we can't produce a race condition in .increment."""
         await self.cog.redis.set("test_key", 0)
         tasks = []
@@ -240,6 +353,44 @@ class RedisCacheTests(unittest.IsolatedAsyncioTestCase):
         value = await self.cog.redis.get("test_key")
         self.assertEqual(value, 100)
 
+    async def test_increment_keeps_precision(self):
+        """Test that incrementing doesn't lose the precision of ints or floats."""
+        await self.cog.redis.set("big", 2**52)
+        await self.cog.redis.set("small", 0.1)
+
+        await self.cog.redis.increment("big")
+        await self.cog.redis.increment("small", 0.2)
+        self.assertEqual(await self.cog.redis.get("big"), 2**52 + 1)
+        self.assertEqual(await self.cog.redis.get("small"), 0.1 + 0.2)
+
+    async def test_increment_big_ints_exactly(self):
+        """Test that ints beyond the precision of doubles are incremented exactly."""
+        cases = (
+            (2**63 - 1, 1),
+            (2**53, 2**53 + 1),
+            (-(2**64), 1),
+            (10**30, -(10**30) - 7),
+            (-(10**20), -(10**20) + 1),
+            (999, 1),
+            (5, -5),
+            (0, -(2**70)),
+        )
+
+        for value, amount in cases:
+            with self.subTest(value=value, amount=amount):
+                await self.cog.redis.set("huge", value)
+                await self.cog.redis.increment("huge", amount)
+                self.assertEqual(await self.cog.redis.get("huge"), value + amount)
+
+    async def test_increment_loads_script(self):
+        """Test that .increment sends the script in full if Redis hasn't cached it."""
+        await self.cog.redis.set("lemons", 1)
+        await self.bot.redis_session.script_flush()
+
+        await self.cog.redis.increment("lemons")
+        await self.cog.redis.increment("lemons")
+        self.assertEqual(await self.cog.redis.get("lemons"), 3)
+
     async def test_exceptions_raised(self):
         """Testing that the various RuntimeErrors are reachable."""
         class MyCog:
@@ -261,3 +412,88 @@ class RedisCacheTests(unittest.IsolatedAsyncioTestCase):
         # Raises "You must access the RedisCache instance through the cog instance"
         with self.assertRaises(NoParentInstanceError):
             await MyCog.cache.get("afraid")
+
+
+class NearCacheTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for keeping the values of a RedisCache in memory."""
+
+    async def asyncSetUp(self):  # noqa: N802
+        server = fakeredis.FakeServer()
+        self.cache = await self.make_cache(server)
+        # The cache of another bot process using the same Redis server.
+        self.other_cache = await self.make_cache(server)
+
+    async def make_cache(self, server: fakeredis.FakeServer) -> RedisCache:
+        """Return a near cached RedisCache of a new bot, once it's subscribed to invalidations."""
+        bot = helpers.MockBot()
+        bot.loop = asyncio.get_running_loop()
+        bot.redis_closed = False
+        bot.redis_degraded = False
+        bot.redis_ready = asyncio.Event()
+        bot.redis_ready.set()
+        bot.redis_session = await fakeredis.aioredis.create_redis_pool(server)
+
+        class NearCog:
+            cache = RedisCache(near_cache_size=2)
+
+            def __init__(self, bot: helpers.MockBot):
+                self.bot = bot
+
+        cache = NearCog(bot).cache
+        await cache.length()
+        while not cache._invalidations.subscribed:
+            await asyncio.sleep(0)
+
+        self.addCleanup(InvalidationListener.for_bot(bot).task.cancel)
+        return cache
+
+    async def test_values_are_read_from_memory(self):
+        """Values which were read or written recently, or known not to exist, should be got without Redis."""
+        await self.cache.set("lemon", 1)
+        redis = self.cache.bot.redis_session
+        with unittest.mock.patch.object(redis, "hget", wraps=redis.hget) as hget:
+            self.assertEqual(await self.cache.get("lemon"), 1)
+            self.assertIsNone(await self.cache.get("lime"))
+            self.assertIsNone(await self.cache.get("lime"))
+            self.assertIs(await self.cache.contains("lime"), False)
+
+        hget.assert_called_once()
+        self.cache.bot.stats.incr.assert_any_call("cache.NearCog.cache.hits")
+        self.cache.bot.stats.incr.assert_any_call("cache.NearCog.cache.misses")
+
+    async def test_writes_invalidate_other_processes(self):
+        """Values written in another process should be invalidated in the near cache."""
+        await self.cache.update({"lemon": 1, "lime": 2})
+
+        await self.other_cache.set("lemon", 3)
+        async with self.other_cache.pipeline() as pipeline:
+            pipeline.delete("lime")
+
+        while self.cache._near_cache:
+            await asyncio.sleep(0)
+
+        self.assertEqual(await self.cache.get("lemon"), 3)
+        self.assertIsNone(await self.cache.get("lime"))
+
+    async def test_least_recently_used_and_expired_values_are_evicted(self):
+        """Only the most recently used values should be kept, until they expire."""
+        await self.cache.update({"lemon": 1, "lime": 2, "grape": 3})
+        await self.cache.get("lime")
+        self.assertListEqual(list(self.cache._near_cache), ["s|grape", "s|lime"])
+
+        with unittest.mock.patch("bot.utils.redis_cache.time.monotonic", return_value=float("inf")):
+            await self.cache.get("lime")
+        self.cache.bot.stats.incr.assert_called_with("cache.NearCog.cache.misses")
+
+    async def test_stale_values_are_served_while_degraded(self):
+        """Expired values should still be got without Redis while it's unreachable."""
+        await self.cache.set("lemon", 1)
+        self.cache.bot.redis_degraded = True
+        self.cache.bot.redis_session.hget = unittest.mock.AsyncMock(side_effect=asyncio.TimeoutError)
+
+        with unittest.mock.patch("bot.utils.redis_cache.time.monotonic", return_value=float("inf")):
+            self.assertEqual(await self.cache.get("lemon"), 1)
+            with self.assertRaises(asyncio.TimeoutError):
+                await self.cache.get("lime")
+
+        self.cache.bot.stats.incr.assert_any_call("cache.NearCog.cache.stale_hits")
@@ -0,0 +1,43 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from bot.utils import redis_codec
+
+
+class RedisCodecTests(unittest.TestCase):
+    """Tests for encoding the values of caches with binary values."""
+
+    def test_values_are_decoded_as_they_were_encoded(self):
+        """Values should be decoded to what they were before being encoded, except tuples which become lists."""
+        values = (
+            None,
+            True,
+            -2**63,
+            0.1,
+            "lemon",
+            b"\x00\xff",
+            {"list": [1, "two", 3.0], 123456789012345678: {"nested": None}},
+            datetime(2020, 5, 1, 12, 30, 15, 123456),
+            datetime(1912, 1, 1),
+            datetime(2020, 5, 1, 12, tzinfo=timezone.utc),
+        )
+        for value in values:
+            with self.subTest(value=value):
+                self.assertEqual(redis_codec.decode(redis_codec.encode(value)), value)
+
+        self.assertListEqual(redis_codec.decode(redis_codec.encode(("a", 1))), ["a", 1])
+
+    def test_aware_datetimes_are_decoded_in_utc(self):
+        """Aware datetimes should be decoded as the same time in UTC."""
+        value = datetime(2020, 5, 1, 12, tzinfo=timezone(timedelta(hours=2)))
+        decoded = redis_codec.decode(redis_codec.encode(value))
+
+        self.assertEqual(decoded, value)
+        self.assertIs(decoded.tzinfo, timezone.utc)
+
+    def test_unsupported_types_raise(self):
+        """Encoding a value of an unsupported type should raise a TypeError, without breaking later encodings."""
+        with self.assertRaises(TypeError):
+            redis_codec.encode(["lemon", object()])
+
+        self.assertEqual(redis_codec.decode(redis_codec.encode("lime")), "lime")
@@ -0,0 +1,88 @@
+import asyncio
+import math
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import fakeredis.aioredis
+
+from bot.timers import TimerQueue
+from bot.utils.scheduling import Scheduler
+from tests.helpers import MockBot
+
+
+class Juicer(Scheduler):
+    """A scheduler which persists its tasks and squeezes lemons when they're due."""
+
+    persist_tasks = True
+
+    def __init__(self, bot: MockBot):
+        super().__init__()
+        self.bot = bot
+        self.squeeze = AsyncMock()
+
+    def _task_delay(self, delay: float) -> float:
+        return delay
+
+    async def _scheduled_task(self, delay: float) -> None:
+        await self.squeeze(delay)
+
+
+class PersistedTasksTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for persisting the due times of scheduled tasks in Redis."""
+
+    async def asyncSetUp(self):  # noqa: N802
+        self.bot = MockBot()
+        self.bot.loop = asyncio.get_running_loop()
+        self.bot.timers = TimerQueue(self.bot.loop)
+        self.bot.redis_session = await fakeredis.aioredis.create_redis_pool()
+        await self.bot.redis_session.flushall()
+
+        self.juicer = Juicer(self.bot)
+
+    async def asyncTearDown(self):  # noqa: N802
+        self.bot.timers.close()
+
+    async def persisted(self, until: float = math.inf) -> dict:
+        """Wait for the pending writes, then return the persisted tasks of a new scheduler."""
+        while self.juicer._persist_writer is not None:
+            await asyncio.sleep(0)
+        return await Juicer(self.bot).get_persisted_tasks(until)
+
+    @patch("bot.utils.scheduling.time.time", return_value=1000)
+    async def test_scheduled_tasks_are_persisted(self, _):
+        """Scheduled tasks should be persisted with their due times until they're cancelled."""
+        self.juicer.schedule_task(1, 60)
+        self.juicer.schedule_task("lemon", 120)
+        self.assertDictEqual(await self.persisted(), {1: 1060, "lemon": 1120})
+        self.assertDictEqual(await self.persisted(until=1100), {1: 1060})
+
+        self.juicer.cancel_task(1)
+        self.assertDictEqual(await self.persisted(), {"lemon": 1120})
+
+    async def test_changes_are_coalesced(self):
+        """Several changes to the tasks before they're written should be written in one transaction."""
+        with patch.object(self.bot.redis_session, "multi_exec", wraps=self.bot.redis_session.multi_exec) as multi:
+            for task_id in range(5):
+                self.juicer.schedule_task(task_id, 60)
+            self.juicer.cancel_task(0)
+
+            self.assertSetEqual(set(await self.juicer.get_persisted_tasks()), {1, 2, 3, 4})
+            self.assertSetEqual(set(await self.persisted()), {1, 2, 3, 4})
+        multi.assert_called_once()
+
+    async def test_done_tasks_are_removed(self):
+        """Tasks should no longer be persisted once they're done."""
+        self.juicer.schedule_task(1, 0)
+        await asyncio.sleep(0.01)
+
+        self.juicer.squeeze.assert_awaited_once_with(0)
+        self.assertDictEqual(await self.persisted(), {})
+
+    async def test_cancel_all_keeps_persisted_tasks(self):
+        """Unscheduling every task, as when the cog is unloaded, should keep the persisted tasks."""
+        self.juicer.schedule_task(1, 60)
+        await self.persisted()
+
+        self.juicer.cancel_all()
+        self.assertSetEqual(set(await self.persisted()), {1})
+        self.assertEqual(len(self.bot.timers), 0)
@@ -0,0 +1,71 @@
+import time
+import unittest
+
+from bot.utils.symbol_index import SymbolIndex
+
+SYMBOLS = (
+    "asyncio",
+    "asyncio.gather",
+    "asyncio.gather_all",
+    "asyncio.Task",
+    "asyncio.wait",
+    "trio.gather",
+    "pathlib.Path",
+    "pathlib.Path.resolve",
+    "os.path.join",
+    "str.join",
+)
+
+
+class SymbolIndexTests(unittest.TestCase):
+    """Tests for suggesting and completing symbols."""
+
+    def setUp(self):
+        self.index = SymbolIndex(SYMBOLS)
+
+    def test_complete(self):
+        """Symbols or their last components starting with the prefix should be returned, shortest first."""
+        test_cases = (
+            ("asyncio.ga", ["asyncio.gather", "asyncio.gather_all"]),
+            ("ASYNCIO.T", ["asyncio.Task"]),
+            ("gat", ["trio.gather", "asyncio.gather", "asyncio.gather_all"]),
+            ("asyncio.x", []),
+        )
+
+        for prefix, expected in test_cases:
+            with self.subTest(prefix=prefix):
+                self.assertListEqual(self.index.complete(prefix), expected)
+
+    def test_suggest_corrects_typos(self):
+        """A typo in any component should be corrected, preferring symbols with the query's other components."""
+        test_cases = (
+            ("asyncio.gahter", "asyncio.gather"),  # Swapped characters
+            ("asynco.gather", "asyncio.gather"),  # Missing character
+            ("asyncio.gathher", "asyncio.gather"),  # Extra character
+            ("os.path.jion", "os.path.join"),
+            ("pathlib.resolve", "pathlib.Path.resolve"),  # Missing component
+            ("ASYNCIO.TASK", "asyncio.Task"),
+        )
+
+        for query, expected in test_cases:
+            with self.subTest(query=query):
+                self.assertEqual(self.index.suggest(query)[0], expected)
+
+    def test_suggest_excludes_query(self):
+        """The query itself should not be suggested, and unrelated queries should have no suggestions."""
+        self.assertNotIn("asyncio.gather", self.index.suggest("asyncio.gather"))
+        self.assertListEqual(self.index.suggest("lemon.squeeze"), [])
+
+    def test_suggest_limit(self):
+        """No more suggestions than the limit should be returned."""
+        self.assertEqual(len(self.index.suggest("asyncio.", limit=2)), 2)
+
+    def test_suggest_many_components(self):
+        """Queries with many or empty components should be answered quickly, ignoring the empty components."""
+        for query in ("." * 2000, "gather" + "." * 50, ".".join(["asyncio"] * 500), ".".join(["asycnio"] * 12)):
+            with self.subTest(query=query[:20]):
+                start = time.perf_counter()
+                self.index.suggest(query)
+                self.assertLess(time.perf_counter() - start, 0.5)
+
+        self.assertEqual(self.index.suggest("asycnio..gahter")[0], "asyncio.gather")
@@ -0,0 +1,78 @@
+import re
+import unittest
+
+from bot.constants import Filter
+from bot.utils.watchlist import WatchlistEntry, WatchlistMatcher
+
+
+class WatchlistMatcherTests(unittest.TestCase):
+    """Tests for the combined watchlist matcher."""
+
+    def setUp(self):
+        self.matcher = WatchlistMatcher(["suicide", "ki+ke+s*"], ["卐", "cuck(?!oo+)"])
+
+    def test_matches_like_individual_patterns(self):
+        """The matcher finds a match exactly when one of the configured patterns would."""
+        patterns = [re.compile(fr'\b{expression}\b', flags=re.IGNORECASE) for expression in Filter.word_watchlist]
+        patterns += [re.compile(expression, flags=re.IGNORECASE) for expression in Filter.token_watchlist]
+        matcher = WatchlistMatcher(Filter.word_watchlist, Filter.token_watchlist)
+
+        texts = (
+            "", "hello there", "Suicide", "suicides", "anti-suicide", "cuckoo clock", "CUCK",
+            "卐", "a卍b", "retarded", "shemale_", "kill yourself", "tarte tatin",
+        )
+        for text in texts:
+            with self.subTest(text=text):
+                expected = any(pattern.search(text) for pattern in patterns)
+                self.assertEqual(matcher.search(text) is not None, expected)
+
+    def test_matches_unicode_case_like_individual_patterns(self):
+        """Characters whose case mappings aren't a single character match like they do with `re.IGNORECASE`."""
+        texts = ("KİKe", "kıke", "SUİCİDE", "ſuicide", "cuckſ", "ǅ")
+        for text in texts:
+            with self.subTest(text=text):
+                expected = any(
+                    re.search(entry.pattern, text, flags=re.IGNORECASE) for entry in self.matcher.entries
+                )
+                self.assertEqual(self.matcher.search(text) is not None, expected)
+
+    def test_reports_matched_entry(self):
+        """Matches report the entry they belong to and where they are."""
+        match = self.matcher.search("that was SUICIDE, really")
+
+        self.assertEqual(match.entry, WatchlistEntry("suicide", True))
+        self.assertEqual(match.text, "SUICIDE")
+        self.assertEqual((match.start, match.end), (9, 16))
+
+    def test_word_entries_respect_word_boundaries(self):
+        """Literal word entries only match whole words, token entries match anywhere."""
+        self.assertIsNone(self.matcher.search("suicides"))
+        self.assertIsNotNone(self.matcher.search("a卐b"))
+
+    def test_findall_returns_one_match_per_entry(self):
+        """`findall` returns the first match of every matching entry."""
+        matches = self.matcher.findall("kikes suicide cuck suicide")
+
+        self.assertListEqual(
+            [match.entry.expression for match in matches],
+            ["ki+ke+s*", "suicide", "cuck(?!oo+)"]
+        )
+
+    def test_expressions_without_literal_prefix(self):
+        """Expressions which don't start with literal text are still matched."""
+        matcher = WatchlistMatcher(["[sz]uicide", "lem(?:on|me)"], ["a?pple"])
+
+        self.assertEqual(matcher.search("zuicide").text, "zuicide")
+        self.assertEqual(matcher.search("lemme go").text, "lemme")
+        self.assertEqual(matcher.search("pineapple").text, "apple")
+        self.assertIsNone(matcher.search("zuicides"))
+
+    def test_update_adds_and_removes_entries(self):
+        """Updating the watchlists changes which entries can match."""
+        self.matcher.update(["suicide", "lemon"], [])
+        self.assertIsNotNone(self.matcher.search("a lemon"))
+        self.assertIsNone(self.matcher.search("cuck"))
+
+        self.matcher.update(["lemon"], [])
+        self.assertIsNone(self.matcher.search("suicide"))
+        self.assertIsNotNone(self.matcher.search("LEMON"))